@@ -1,6 +1,7 @@
 from django.contrib import admin
 from django import forms
-from arsoft.web.crashupload.models import CrashDumpProject, CrashDumpSetting, CrashDumpState, CrashDumpModel
+from django.utils import timezone
+from arsoft.web.crashupload.models import CrashDumpProject, CrashDumpSetting, CrashDumpState, CrashDumpModel, CrashDumpJob, CrashSignature
 
 class CrashDumpSettingForm(forms.ModelForm):
     class Meta:
@@ -60,8 +61,25 @@ class CrashDumpModelAdmin(admin.ModelAdmin):
             ]
     form = CrashDumpModelForm
 
+@admin.action(description='Retry selected jobs')
+def retry_job(modeladmin, request, queryset):
+    queryset.update(state=CrashDumpJob.STATE_PENDING, runAfter=timezone.now(), attempts=0)
+
+class CrashDumpJobAdmin(admin.ModelAdmin):
+    list_display = ('crash', 'kind', 'state', 'attempts', 'created', 'runAfter', 'finished')
+    list_filter = ('kind', 'state')
+    fields = ['crash', 'kind', 'state', 'payload', 'attempts', 'lastError', 'runAfter', 'started', 'finished']
+    readonly_fields = ['crash']
+    actions = [retry_job]
+
+class CrashSignatureAdmin(admin.ModelAdmin):
+    list_display = ('signature', 'count', 'firstSeen', 'lastSeen')
+    fields = ['signature', 'signatureHash', 'count', 'firstSeen', 'lastSeen']
+    readonly_fields = ['signatureHash']
+
 admin.site.register(CrashDumpSetting, CrashDumpSettingAdmin)
 admin.site.register(CrashDumpState, CrashDumpStateAdmin)
 admin.site.register(CrashDumpProject, CrashDumpProjectAdmin)
 admin.site.register(CrashDumpModel, CrashDumpModelAdmin)
-
+admin.site.register(CrashDumpJob, CrashDumpJobAdmin)
+admin.site.register(CrashSignature, CrashSignatureAdmin)
@@ -0,0 +1,208 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import os.path
+import time
+import logging
+from django.db import transaction
+from django.db.models import F
+from django.db.models.functions import Coalesce, Greatest, Least
+
+from crashdump.utils import format_stack_frame
+from crashdump.signature import compute_signature, signature_hash, exception_stackdump, frame_module
+from crashdump.minidump import MiniDump
+from crashdump.xmlreport import XMLReport
+
+from .models import CrashDumpSummary, CrashDumpFrame, CrashSignature
+
+logger = logging.getLogger('arsoft.web.crashupload')
+
+# increment when the summary gets new or changed data, crashdump_backfill
+# re-analyzes all crashes with an older summary
+SUMMARY_VERSION = 4
+# number of frames of the faulting thread stored in the database
+SUMMARY_TOP_FRAMES = 10
+
+def _db_int(value):
+    # store unsigned 64-bit values (addresses) in a signed 64-bit column
+    if value is None:
+        return None
+    value = int(value) & 0xffffffffffffffff
+    return value - (1 << 64) if value >= (1 << 63) else value
+
+def _lines(items):
+    return '\n'.join([str(i) for i in items]) if items else None
+
+def _file_size(filename):
+    try:
+        return os.path.getsize(filename) if filename else 0
+    except OSError:
+        return 0
+
+def get_report_files(crash):
+    """
+    Returns a dict with the absolute paths of the XML report, the minidump and
+    the coredump of the given crash (None if not accessible) and the file names
+    stored in the database.
+    """
+    from .views import _get_dump_filename
+    ret = {'xmlfile': None, 'xmlfile_from_db': None, 'minidumpfile': None, 'minidumpfile_from_db': None, 'coredumpfile': None }
+    if crash.has_minidump:
+        ret['xmlfile_from_db'] = crash.minidumpReportXMLFile
+        ret['xmlfile'] = _get_dump_filename(crash, crash.minidumpReportXMLFile)
+        ret['minidumpfile_from_db'] = crash.minidumpFile
+        ret['minidumpfile'] = _get_dump_filename(crash, crash.minidumpFile)
+    elif crash.has_coredump:
+        ret['xmlfile_from_db'] = crash.coredumpReportXMLFile
+        ret['xmlfile'] = _get_dump_filename(crash, crash.coredumpReportXMLFile)
+        ret['coredumpfile'] = _get_dump_filename(crash, crash.coredumpFile)
+    return ret
+
+def _fill_from_report(summary, report, crash):
+    """
+    Fill the summary from the report and returns the frames to store and
+    the signature of the crash.
+    """
+    frames = []
+    signature_frames = []
+    summary.sections = ','.join([f for f in report.fields if getattr(report, f)])
+    summary.platformType = report.platform_type
+    summary.is64Bit = report.is_64_bit
+
+    exception = report.exception
+    if exception is not None:
+        summary.exceptionCode = _db_int(exception.code)
+        summary.exceptionAddress = _db_int(exception.address)
+        summary.exceptionThreadId = _db_int(exception.threadid)
+        try:
+            name = exception.name
+            summary.exceptionName = name[:128] if name else None
+        except (TypeError, ValueError):
+            summary.exceptionName = None
+    summary.isAssertion = report.assertion is not None
+    summary.moduleCount = len(report.modules)
+    summary.threadCount = len(report.threads)
+
+    simplified_info = report.simplified_info
+    if simplified_info is not None:
+        summary.firstUsefulModules = _lines(simplified_info.first_useful_modules)
+        summary.firstUsefulFunctions = _lines(simplified_info.first_useful_functions)
+        summary.missingDebugSymbols = _lines(simplified_info.missing_debug_symbols)
+
+    system_info = report.fast_protect_system_info
+    if system_info is not None:
+        summary.crashHostName = system_info.fqdn[:256] if system_info.fqdn else None
+        summary.crashUserName = system_info.username[:256] if system_info.username else None
+
+    stackdump = exception_stackdump(report)
+    if stackdump is not None:
+        frame_modules = [frame_module(report, frm) for frm in stackdump.callstack]
+        signature_frames = [(module, frm.function) for (frm, (module, module_base)) in zip(stackdump.callstack, frame_modules)]
+        if stackdump.top is not None:
+            summary.topFrame = str(format_stack_frame(stackdump.top))[:1024]
+        for (frm, (module, module_base)) in zip(stackdump.callstack[:SUMMARY_TOP_FRAMES], frame_modules):
+            frames.append(CrashDumpFrame(crash=crash, num=frm.num, threadId=_db_int(stackdump.threadid),
+                                         addr=_db_int(frm.addr), module=module[:256] if module else None, moduleBase=_db_int(module_base),
+                                         function=frm.function[:1024] if frm.function else None, funcoff=_db_int(frm.funcoff),
+                                         source=frm.source[:1024] if frm.source else None, line=frm.line))
+    signature = compute_signature(signature_frames, simplified_info.first_useful_functions if simplified_info is not None else None)
+    return frames, signature
+
+def _update_signature(summary, signature, old_signature_id, crash):
+    """
+    Assign the signature to the summary and update the counters of the
+    signature table incrementally.
+    """
+    timestamp = crash.crashtimestamp or crash.reporttimestamp
+    if signature is not None:
+        sig, created = CrashSignature.objects.get_or_create(signatureHash=signature_hash(signature),
+                            defaults={'signature': signature, 'firstSeen': timestamp, 'lastSeen': timestamp})
+        summary.signature = sig
+    else:
+        summary.signature = None
+    if summary.signature_id == old_signature_id:
+        # re-analysis of the crash without change of the signature
+        return
+    if old_signature_id is not None:
+        CrashSignature.objects.filter(id=old_signature_id).update(count=F('count') - 1)
+    if summary.signature_id is not None:
+        kwargs = {'count': F('count') + 1}
+        if timestamp is not None:
+            # Least/Greatest return NULL for a NULL column on some databases
+            kwargs['firstSeen'] = Least(Coalesce(F('firstSeen'), timestamp), timestamp)
+            kwargs['lastSeen'] = Greatest(Coalesce(F('lastSeen'), timestamp), timestamp)
+        CrashSignature.objects.filter(id=summary.signature_id).update(**kwargs)
+
+def analyze_crash(crash):
+    """
+    Parse the reports of the given crash once and store the summary and the
+    top frames of the faulting thread in the database.
+    """
+    files = get_report_files(crash)
+    try:
+        summary = CrashDumpSummary.objects.get(crash=crash)
+    except CrashDumpSummary.DoesNotExist:
+        summary = CrashDumpSummary(crash=crash)
+    old_signature_id = summary.signature_id
+    # reset all data from a previous analysis
+    for f in CrashDumpSummary._meta.concrete_fields:
+        if f.name not in ('id', 'crash'):
+            setattr(summary, f.attname, f.get_default())
+    summary.version = SUMMARY_VERSION
+    frames = []
+    signature = None
+
+    start = time.time()
+    minidumpfile = files['minidumpfile']
+    if minidumpfile:
+        summary.minidumpFileSize = _file_size(minidumpfile)
+        try:
+            MiniDump.read_header(minidumpfile)
+        except (OSError, ValueError) as e:
+            summary.minidumpError = str(e)
+    elif files['minidumpfile_from_db']:
+        summary.minidumpError = "Minidump file %s not accessible" % files['minidumpfile_from_db']
+    else:
+        summary.minidumpError = "No minidump file available"
+    summary.coredumpFileSize = _file_size(files['coredumpfile'])
+
+    xmlfile = files['xmlfile']
+    if xmlfile:
+        summary.xmlFileSize = _file_size(xmlfile)
+        try:
+            report = XMLReport(xmlfile)
+            frames, signature = _fill_from_report(summary, report, crash)
+        except XMLReport.XMLReportException as e:
+            summary.xmlError = str(e)
+        else:
+            # the detail pages load the sections from the sidecar cache
+            # instead of parsing the XML again
+            try:
+                report.write_cache()
+            except OSError as e:
+                logger.warning('Unable to write report cache for crash %s: %s' % (crash.crashid, e))
+    elif files['xmlfile_from_db']:
+        summary.xmlError = 'XML file %s not accessible' % files['xmlfile_from_db']
+    else:
+        summary.xmlError = 'No XML file available'
+    summary.parseTime = time.time() - start
+
+    with transaction.atomic():
+        _update_signature(summary, signature, old_signature_id, crash)
+        summary.save()
+        CrashDumpFrame.objects.filter(crash=crash).delete()
+        CrashDumpFrame.objects.bulk_create(frames)
+    logger.info('Analyzed crash %s in %.3fs' % (crash.crashid, summary.parseTime))
+    return summary
+
+def get_crash_summary(crash, analyze=True):
+    """
+    Returns the stored summary of the crash, crashes which have not been
+    analyzed yet are analyzed right away or None is returned if analyze
+    is False.
+    """
+    try:
+        return crash.summary
+    except CrashDumpSummary.DoesNotExist:
+        return analyze_crash(crash) if analyze else None
@@ -0,0 +1,102 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import logging
+import traceback
+from datetime import timedelta
+from django.db import connection
+from django.db.models import F, Count, Min
+from django.utils import timezone
+
+from .models import CrashDumpJob
+from .analysis import analyze_crash
+
+logger = logging.getLogger('arsoft.web.crashupload')
+
+class CrashDumpJobError(Exception):
+    pass
+
+def _run_issue_link(job):
+    from .views import crash_get_or_create_issue_link
+    payload = job.get_payload()
+    link_obj, error = crash_get_or_create_issue_link(None, job.crash, issue=payload.get('issue'), crash_url=payload.get('crash_url'))
+    if error:
+        raise CrashDumpJobError(str(error))
+    return link_obj
+
+def _run_analyze(job):
+    summary = analyze_crash(job.crash)
+    if summary.xmlError and job.crash.has_minidump and job.crash.minidumpReportXMLFile:
+        # the report has been uploaded but can not be read, retry later
+        raise CrashDumpJobError(summary.xmlError)
+    return summary
+
+JOB_HANDLERS = {
+    CrashDumpJob.KIND_ISSUE_LINK: _run_issue_link,
+    CrashDumpJob.KIND_ANALYZE: _run_analyze,
+}
+
+def claim_job():
+    """
+    Atomically take the next due job from the queue. Returns None if
+    there is no pending job.
+    """
+    now = timezone.now()
+    candidates = CrashDumpJob.objects.filter(state=CrashDumpJob.STATE_PENDING, runAfter__lte=now).order_by('runAfter', 'id').values_list('id', flat=True)[:16]
+    for job_id in candidates:
+        # only one worker wins the update of a pending job
+        n = CrashDumpJob.objects.filter(id=job_id, state=CrashDumpJob.STATE_PENDING).update(
+                state=CrashDumpJob.STATE_RUNNING, started=now, attempts=F('attempts') + 1)
+        if n == 1:
+            return CrashDumpJob.objects.select_related('crash').get(id=job_id)
+    return None
+
+def run_job(job, max_attempts=5, retry_delay=60):
+    """
+    Execute the given (claimed) job and record the result. Failed jobs are
+    re-queued with an exponential back-off until max_attempts is reached.
+    """
+    handler = JOB_HANDLERS.get(job.kind)
+    try:
+        if handler is None:
+            raise CrashDumpJobError('Unknown job kind %s' % job.kind)
+        handler(job)
+        job.state = CrashDumpJob.STATE_DONE
+        job.lastError = None
+        job.finished = timezone.now()
+        logger.info('Job %i (%s) for crash %s done' % (job.id, job.kind, job.crash.crashid))
+    except Exception as ex:
+        job.lastError = '%s\n%s' % (ex, traceback.format_exc())
+        if job.attempts >= max_attempts:
+            job.state = CrashDumpJob.STATE_FAILED
+            job.finished = timezone.now()
+            logger.error('Job %i (%s) for crash %s failed: %s' % (job.id, job.kind, job.crash.crashid, ex))
+        else:
+            job.state = CrashDumpJob.STATE_PENDING
+            job.runAfter = timezone.now() + timedelta(seconds=retry_delay * (2 ** (job.attempts - 1)))
+            logger.warning('Job %i (%s) for crash %s failed, retry at %s: %s' % (job.id, job.kind, job.crash.crashid, job.runAfter, ex))
+    finally:
+        job.save(update_fields=['state', 'lastError', 'runAfter', 'finished'])
+        # jobs run in worker threads, each of them holds its own connection
+        connection.close()
+    return job.state
+
+def requeue_stale_jobs(timeout):
+    """
+    Put jobs back into the queue which are marked as running for longer
+    than timeout seconds, e.g. because the worker has been killed.
+    """
+    limit = timezone.now() - timedelta(seconds=timeout)
+    return CrashDumpJob.objects.filter(state=CrashDumpJob.STATE_RUNNING, started__lt=limit).update(state=CrashDumpJob.STATE_PENDING)
+
+def job_backlog():
+    """
+    Returns a list of (kind, state, count, oldest) tuples describing the
+    current queue.
+    """
+    ret = []
+    q = CrashDumpJob.objects.values('kind', 'state').annotate(count=Count('id'), oldest=Min('created')).order_by('kind', 'state')
+    for item in q:
+        ret.append( (item['kind'], item['state'], item['count'], item['oldest']) )
+    return ret
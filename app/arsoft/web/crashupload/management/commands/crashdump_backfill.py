@@ -0,0 +1,43 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+
+from arsoft.web.crashupload.models import CrashDumpModel, CrashDumpJob
+from arsoft.web.crashupload.analysis import analyze_crash, SUMMARY_VERSION
+
+class Command(BaseCommand):
+    help = 'Create the crash summaries for crashes without an (up to date) summary'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', dest='all', action='store_true', help='re-analyze all crashes')
+        parser.add_argument('--queue', dest='queue', action='store_true', help='queue analyze jobs for the crashdump_worker instead of analyzing the crashes directly')
+        parser.add_argument('--limit', dest='limit', type=int, default=None, help='maximum number of crashes to process')
+
+    def handle(self, *args, **options):
+        q = CrashDumpModel.objects.all()
+        if not options['all']:
+            q = q.filter(Q(summary__isnull=True) | Q(summary__version__lt=SUMMARY_VERSION))
+        q = q.order_by('id')
+        if options['limit']:
+            q = q[:options['limit']]
+
+        num = 0
+        num_errors = 0
+        for crash in q.iterator():
+            if options['queue']:
+                CrashDumpJob.enqueue(crash, CrashDumpJob.KIND_ANALYZE)
+            else:
+                summary = analyze_crash(crash)
+                if summary.xmlError:
+                    num_errors += 1
+                    self.stderr.write('Crash %s: %s' % (crash.crashid, summary.xmlError))
+            num += 1
+            if options['verbosity'] > 1:
+                self.stdout.write('Crash %s' % crash.crashid)
+        if options['queue']:
+            self.stdout.write('Queued %i crashes for analysis' % num)
+        else:
+            self.stdout.write('Analyzed %i crashes, %i with errors' % (num, num_errors))
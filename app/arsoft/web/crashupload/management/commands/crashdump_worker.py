@@ -0,0 +1,60 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from arsoft.web.crashupload.jobs import claim_job, run_job, requeue_stale_jobs, job_backlog
+
+class Command(BaseCommand):
+    help = 'Process the queued jobs (issue linking, report analysis) of uploaded crashes'
+
+    def add_arguments(self, parser):
+        parser.add_argument('-j', '--jobs', dest='num_jobs', type=int, default=2, help='number of jobs to run concurrently')
+        parser.add_argument('--max-attempts', dest='max_attempts', type=int, default=5, help='number of attempts before a job is marked as failed')
+        parser.add_argument('--retry-delay', dest='retry_delay', type=int, default=60, help='initial delay in seconds before a failed job is retried')
+        parser.add_argument('--poll-interval', dest='poll_interval', type=float, default=5.0, help='seconds to wait for new jobs when the queue is empty')
+        parser.add_argument('--stale-timeout', dest='stale_timeout', type=int, default=3600, help='re-queue jobs which are running for longer than this number of seconds')
+        parser.add_argument('--once', dest='once', action='store_true', help='process all due jobs and exit')
+        parser.add_argument('--status', dest='status', action='store_true', help='show the job backlog and exit')
+
+    def _show_status(self):
+        now = timezone.now()
+        backlog = job_backlog()
+        if not backlog:
+            self.stdout.write('No jobs')
+        for kind, state, count, oldest in backlog:
+            self.stdout.write('%-12s %-8s %6i  oldest %s (%is ago)' % (kind, state, count, oldest, (now - oldest).total_seconds()))
+
+    def handle(self, *args, **options):
+        if options['status']:
+            self._show_status()
+            return
+
+        num_jobs = max(1, options['num_jobs'])
+        n = requeue_stale_jobs(options['stale_timeout'])
+        if n:
+            self.stdout.write('Re-queued %i stale jobs' % n)
+
+        running = set()
+        with ThreadPoolExecutor(max_workers=num_jobs) as executor:
+            try:
+                while True:
+                    # only claim as many jobs as can be executed right now,
+                    # everything else stays visible in the queue
+                    while len(running) < num_jobs:
+                        job = claim_job()
+                        if job is None:
+                            break
+                        running.add(executor.submit(run_job, job, max_attempts=options['max_attempts'], retry_delay=options['retry_delay']))
+                    if not running:
+                        if options['once']:
+                            break
+                        time.sleep(options['poll_interval'])
+                        continue
+                    done, running = wait(running, timeout=options['poll_interval'], return_when=FIRST_COMPLETED)
+            except KeyboardInterrupt:
+                self.stdout.write('Waiting for %i running jobs' % len(running))
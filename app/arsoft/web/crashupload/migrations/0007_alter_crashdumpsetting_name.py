@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-18 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crashupload', '0006_crashdumpsetting'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='crashdumpsetting',
+            name='name',
+            field=models.CharField(choices=[('issue_title', 'issue_title'), ('issue_description', 'issue_description'), ('issue_labels', 'issue_labels'), ('max_upload_size', 'max_upload_size'), ('upload_disabled', 'upload_disabled')], help_text='Name', max_length=64, unique=True, verbose_name='Name'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.17 on 2026-10-18 11:24
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crashupload', '0007_alter_crashdumpsetting_name'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrashDumpJob',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('issue_link', 'Issue link'), ('analyze', 'Report analysis')], help_text='kind of work to be done for the crash', max_length=16, verbose_name='Kind')),
+                ('state', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', help_text='processing state of the job', max_length=16, verbose_name='State')),
+                ('payload', models.TextField(help_text='JSON encoded parameters of the job', max_length=65536, null=True, verbose_name='Payload')),
+                ('attempts', models.IntegerField(default=0, help_text='number of times the job has been started', verbose_name='Attempts')),
+                ('lastError', models.TextField(help_text='error of the last failed attempt', max_length=8192, null=True, verbose_name='Last error')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+                ('runAfter', models.DateTimeField(default=django.utils.timezone.now, help_text='earliest time to (re-)run the job', verbose_name='Run after')),
+                ('started', models.DateTimeField(help_text='start time of the last attempt', null=True, verbose_name='Started')),
+                ('finished', models.DateTimeField(help_text='time the job has been finished', null=True, verbose_name='Finished')),
+                ('crash', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='crashupload.crashdumpmodel')),
+            ],
+            options={
+                'verbose_name': 'Crash job',
+                'verbose_name_plural': 'Crash jobs',
+                'indexes': [models.Index(fields=['state', 'runAfter'], name='crashupload_state_003412_idx')],
+            },
+        ),
+    ]
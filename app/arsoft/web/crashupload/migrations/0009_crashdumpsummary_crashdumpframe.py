@@ -0,0 +1,71 @@
+# Generated by Django 4.2.17 on 2026-10-18 11:27
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crashupload', '0008_crashdumpjob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrashDumpSummary',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('version', models.IntegerField(default=0, help_text='version of the analysis which created this summary', verbose_name='Version')),
+                ('analyzed', models.DateTimeField(auto_now=True, help_text='time of the last analysis', verbose_name='Analyzed')),
+                ('parseTime', models.FloatField(default=0, help_text='time in seconds needed to parse the report', verbose_name='Parse time')),
+                ('xmlError', models.TextField(help_text='error while reading the XML report', max_length=4096, null=True, verbose_name='XML error')),
+                ('minidumpError', models.TextField(help_text='error while reading the minidump', max_length=4096, null=True, verbose_name='Minidump error')),
+                ('xmlFileSize', models.BigIntegerField(default=0, help_text='size of the XML report', verbose_name='XML file size')),
+                ('minidumpFileSize', models.BigIntegerField(default=0, help_text='size of the minidump file', verbose_name='Minidump file size')),
+                ('coredumpFileSize', models.BigIntegerField(default=0, help_text='size of the coredump file', verbose_name='Coredump file size')),
+                ('sections', models.CharField(default='', help_text='comma separated list of the sections available in the report', max_length=512, verbose_name='Sections')),
+                ('platformType', models.CharField(help_text='platform type from the report', max_length=32, null=True, verbose_name='Platform type')),
+                ('is64Bit', models.BooleanField(help_text='crashed process is a 64-bit process', null=True, verbose_name='64-Bit')),
+                ('exceptionCode', models.BigIntegerField(db_index=True, help_text='exception code or signal number', null=True, verbose_name='Exception code')),
+                ('exceptionAddress', models.BigIntegerField(db_index=True, help_text='address of the exception', null=True, verbose_name='Exception address')),
+                ('exceptionName', models.CharField(help_text='name of the exception code', max_length=128, null=True, verbose_name='Exception name')),
+                ('exceptionThreadId', models.BigIntegerField(help_text='id of the faulting thread', null=True, verbose_name='Exception thread')),
+                ('isAssertion', models.BooleanField(default=False, help_text='crash has been caused by an assertion', verbose_name='Assertion')),
+                ('topFrame', models.CharField(help_text='top stack frame of the faulting thread', max_length=1024, null=True, verbose_name='Top frame')),
+                ('moduleCount', models.IntegerField(default=0, help_text='number of loaded modules', verbose_name='Modules')),
+                ('threadCount', models.IntegerField(default=0, help_text='number of threads', verbose_name='Threads')),
+                ('firstUsefulModules', models.TextField(help_text='first useful modules, one per line', max_length=8192, null=True, verbose_name='Involved modules')),
+                ('firstUsefulFunctions', models.TextField(help_text='first useful functions, one per line', max_length=16384, null=True, verbose_name='Involved functions')),
+                ('missingDebugSymbols', models.TextField(help_text='modules without debug symbols, one per line', max_length=16384, null=True, verbose_name='Missing symbols')),
+                ('crashHostName', models.CharField(help_text='full qualified host name from the report', max_length=256, null=True, verbose_name='Crash FQDN')),
+                ('crashUserName', models.CharField(help_text='username from the report', max_length=256, null=True, verbose_name='Crash user')),
+                ('crash', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='summary', to='crashupload.crashdumpmodel')),
+            ],
+            options={
+                'verbose_name': 'Crash summary',
+                'verbose_name_plural': 'Crash summaries',
+            },
+        ),
+        migrations.CreateModel(
+            name='CrashDumpFrame',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('num', models.IntegerField(help_text='position of the frame on the stack', verbose_name='Number')),
+                ('threadId', models.BigIntegerField(help_text='id of the thread', verbose_name='Thread')),
+                ('addr', models.BigIntegerField(help_text='instruction address', verbose_name='Address')),
+                ('module', models.CharField(db_index=True, help_text='name of the module', max_length=256, null=True, verbose_name='Module')),
+                ('moduleBase', models.BigIntegerField(help_text='base address of the module', null=True, verbose_name='Module base')),
+                ('function', models.CharField(help_text='name of the function', max_length=1024, null=True, verbose_name='Function')),
+                ('funcoff', models.BigIntegerField(help_text='offset within the function', null=True, verbose_name='Function offset')),
+                ('source', models.CharField(help_text='source file', max_length=1024, null=True, verbose_name='Source')),
+                ('line', models.IntegerField(help_text='line within the source file', null=True, verbose_name='Line')),
+                ('crash', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='frames', to='crashupload.crashdumpmodel')),
+            ],
+            options={
+                'verbose_name': 'Crash stack frame',
+                'verbose_name_plural': 'Crash stack frames',
+                'ordering': ['crash', 'num'],
+                'indexes': [models.Index(fields=['crash', 'num'], name='crashupload_crash_i_6e2e45_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,34 @@
+# Generated by Django 4.2.17 on 2026-10-18 11:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crashupload', '0009_crashdumpsummary_crashdumpframe'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CrashSignature',
+            fields=[
+                ('id', models.AutoField(primary_key=True, serialize=False)),
+                ('signature', models.TextField(help_text='normalized top frames of the crashing thread', max_length=8192, verbose_name='Signature')),
+                ('signatureHash', models.CharField(help_text='SHA1 of the signature', max_length=40, unique=True, verbose_name='Signature hash')),
+                ('count', models.IntegerField(db_index=True, default=0, help_text='number of crashes with this signature', verbose_name='Count')),
+                ('firstSeen', models.DateTimeField(help_text='timestamp of the first crash with this signature', null=True, verbose_name='First seen')),
+                ('lastSeen', models.DateTimeField(db_index=True, help_text='timestamp of the last crash with this signature', null=True, verbose_name='Last seen')),
+            ],
+            options={
+                'verbose_name': 'Crash signature',
+                'verbose_name_plural': 'Crash signatures',
+            },
+        ),
+        migrations.AddField(
+            model_name='crashdumpsummary',
+            name='signature',
+            field=models.ForeignKey(help_text='signature of the crash', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='summaries', to='crashupload.crashsignature'),
+        ),
+    ]
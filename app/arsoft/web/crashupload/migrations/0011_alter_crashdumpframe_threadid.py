@@ -0,0 +1,18 @@
+# Generated by Django 4.2.17 on 2026-10-18 12:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('crashupload', '0010_crashsignature_crashdumpsummary_signature'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='crashdumpframe',
+            name='threadId',
+            field=models.BigIntegerField(help_text='id of the thread', null=True, verbose_name='Thread'),
+        ),
+    ]
@@ -1,7 +1,12 @@
 from pickle import NONE
 from crashdump.utils import format_os_version_short, get_os_version_number, get_os_build_number
 from django.db import models, migrations
+from django.db.models import F
+from django.db.models.signals import post_delete
+from django.dispatch import receiver
 from django.urls import reverse
+from django.utils import timezone
+import json
 
 CRASHDUMP_VERSION = '0.9.1'
 
@@ -316,6 +321,161 @@ class CrashDumpLink(models.Model):
     def __str__(self):
         return '%s, %s' % (self.crash, self.name)
 
+class CrashSignature(models.Model):
+    id = models.AutoField(primary_key=True)
+    signature = models.TextField('Signature', max_length=8192, help_text='normalized top frames of the crashing thread')
+    signatureHash = models.CharField('Signature hash', max_length=40, unique=True, help_text='SHA1 of the signature')
+    count = models.IntegerField('Count', default=0, db_index=True, help_text='number of crashes with this signature')
+    firstSeen = models.DateTimeField('First seen', null=True, help_text='timestamp of the first crash with this signature')
+    lastSeen = models.DateTimeField('Last seen', null=True, db_index=True, help_text='timestamp of the last crash with this signature')
+
+    class Meta:
+        verbose_name = "Crash signature"
+        verbose_name_plural = "Crash signatures"
+
+    def __str__(self):
+        return '%s (%i)' % (self.signature, self.count)
+
+class CrashDumpSummary(models.Model):
+    id = models.AutoField(primary_key=True)
+    crash = models.OneToOneField(CrashDumpModel, on_delete=models.CASCADE, related_name='summary')
+    version = models.IntegerField('Version', default=0, help_text='version of the analysis which created this summary')
+    analyzed = models.DateTimeField('Analyzed', auto_now=True, help_text='time of the last analysis')
+    parseTime = models.FloatField('Parse time', default=0, help_text='time in seconds needed to parse the report')
+
+    xmlError = models.TextField('XML error', max_length=4096, null=True, help_text='error while reading the XML report')
+    minidumpError = models.TextField('Minidump error', max_length=4096, null=True, help_text='error while reading the minidump')
+    xmlFileSize = models.BigIntegerField('XML file size', default=0, help_text='size of the XML report')
+    minidumpFileSize = models.BigIntegerField('Minidump file size', default=0, help_text='size of the minidump file')
+    coredumpFileSize = models.BigIntegerField('Coredump file size', default=0, help_text='size of the coredump file')
+    sections = models.CharField('Sections', max_length=512, default='', help_text='comma separated list of the sections available in the report')
+
+    platformType = models.CharField('Platform type', max_length=32, null=True, help_text='platform type from the report')
+    is64Bit = models.BooleanField('64-Bit', null=True, help_text='crashed process is a 64-bit process')
+    exceptionCode = models.BigIntegerField('Exception code', null=True, db_index=True, help_text='exception code or signal number')
+    exceptionAddress = models.BigIntegerField('Exception address', null=True, db_index=True, help_text='address of the exception')
+    exceptionName = models.CharField('Exception name', max_length=128, null=True, help_text='name of the exception code')
+    exceptionThreadId = models.BigIntegerField('Exception thread', null=True, help_text='id of the faulting thread')
+    isAssertion = models.BooleanField('Assertion', default=False, help_text='crash has been caused by an assertion')
+    topFrame = models.CharField('Top frame', max_length=1024, null=True, help_text='top stack frame of the faulting thread')
+    moduleCount = models.IntegerField('Modules', default=0, help_text='number of loaded modules')
+    threadCount = models.IntegerField('Threads', default=0, help_text='number of threads')
+    firstUsefulModules = models.TextField('Involved modules', max_length=8192, null=True, help_text='first useful modules, one per line')
+    firstUsefulFunctions = models.TextField('Involved functions', max_length=16384, null=True, help_text='first useful functions, one per line')
+    missingDebugSymbols = models.TextField('Missing symbols', max_length=16384, null=True, help_text='modules without debug symbols, one per line')
+    crashHostName = models.CharField('Crash FQDN', max_length=256, null=True, help_text='full qualified host name from the report')
+    crashUserName = models.CharField('Crash user', max_length=256, null=True, help_text='username from the report')
+    signature = models.ForeignKey(CrashSignature, on_delete=models.SET_NULL, null=True, related_name='summaries', help_text='signature of the crash')
+
+    class Meta:
+        verbose_name = "Crash summary"
+        verbose_name_plural = "Crash summaries"
+
+    @staticmethod
+    def _unsigned(value):
+        # addresses are stored as signed 64-bit integers
+        return value & 0xffffffffffffffff if value is not None else None
+
+    exception_address = property(lambda self: CrashDumpSummary._unsigned(self.exceptionAddress))
+    exception_code = property(lambda self: CrashDumpSummary._unsigned(self.exceptionCode))
+    sections_list = property(lambda self: self.sections.split(',') if self.sections else [])
+    first_useful_modules = property(lambda self: self.firstUsefulModules.splitlines() if self.firstUsefulModules else [])
+    first_useful_functions = property(lambda self: self.firstUsefulFunctions.splitlines() if self.firstUsefulFunctions else [])
+    missing_debug_symbols = property(lambda self: self.missingDebugSymbols.splitlines() if self.missingDebugSymbols else [])
+
+    def __str__(self):
+        return '%s, %s' % (self.crash, self.exceptionName)
+
+@receiver(post_delete, sender=CrashDumpSummary)
+def _summary_deleted(sender, instance, **kwargs):
+    # the summary is deleted together with its crash, keep the counter of
+    # the signature in sync
+    if instance.signature_id is not None:
+        CrashSignature.objects.filter(id=instance.signature_id).update(count=F('count') - 1)
+
+class CrashDumpFrame(models.Model):
+    id = models.AutoField(primary_key=True)
+    crash = models.ForeignKey(CrashDumpModel, on_delete=models.CASCADE, related_name='frames')
+    num = models.IntegerField('Number', help_text='position of the frame on the stack')
+    threadId = models.BigIntegerField('Thread', null=True, help_text='id of the thread')
+    addr = models.BigIntegerField('Address', help_text='instruction address')
+    module = models.CharField('Module', max_length=256, null=True, db_index=True, help_text='name of the module')
+    moduleBase = models.BigIntegerField('Module base', null=True, help_text='base address of the module')
+    function = models.CharField('Function', max_length=1024, null=True, help_text='name of the function')
+    funcoff = models.BigIntegerField('Function offset', null=True, help_text='offset within the function')
+    source = models.CharField('Source', max_length=1024, null=True, help_text='source file')
+    line = models.IntegerField('Line', null=True, help_text='line within the source file')
+
+    class Meta:
+        verbose_name = "Crash stack frame"
+        verbose_name_plural = "Crash stack frames"
+        ordering = ['crash', 'num']
+        indexes = [
+            models.Index(fields=['crash', 'num']),
+        ]
+
+    address = property(lambda self: CrashDumpSummary._unsigned(self.addr))
+    module_base = property(lambda self: CrashDumpSummary._unsigned(self.moduleBase))
+
+    def __str__(self):
+        return '%s, #%i %s' % (self.crash, self.num, self.function)
+
+class CrashDumpJob(models.Model):
+    id = models.AutoField(primary_key=True)
+    crash = models.ForeignKey(CrashDumpModel, on_delete=models.CASCADE)
+
+    KIND_ISSUE_LINK = 'issue_link'
+    KIND_ANALYZE = 'analyze'
+    KINDS = (
+        (KIND_ISSUE_LINK, 'Issue link'),
+        (KIND_ANALYZE, 'Report analysis'),
+    )
+    kind = models.CharField('Kind', max_length=16, choices=KINDS, help_text='kind of work to be done for the crash')
+
+    STATE_PENDING = 'pending'
+    STATE_RUNNING = 'running'
+    STATE_DONE = 'done'
+    STATE_FAILED = 'failed'
+    STATES = (
+        (STATE_PENDING, 'Pending'),
+        (STATE_RUNNING, 'Running'),
+        (STATE_DONE, 'Done'),
+        (STATE_FAILED, 'Failed'),
+    )
+    state = models.CharField('State', max_length=16, choices=STATES, default=STATE_PENDING, help_text='processing state of the job')
+    payload = models.TextField('Payload', max_length=65536, null=True, help_text='JSON encoded parameters of the job')
+    attempts = models.IntegerField('Attempts', default=0, help_text='number of times the job has been started')
+    lastError = models.TextField('Last error', max_length=8192, null=True, help_text='error of the last failed attempt')
+    created = models.DateTimeField('Created', auto_now_add=True)
+    runAfter = models.DateTimeField('Run after', default=timezone.now, help_text='earliest time to (re-)run the job')
+    started = models.DateTimeField('Started', null=True, help_text='start time of the last attempt')
+    finished = models.DateTimeField('Finished', null=True, help_text='time the job has been finished')
+
+    class Meta:
+        verbose_name = "Crash job"
+        verbose_name_plural = "Crash jobs"
+        indexes = [
+            models.Index(fields=['state', 'runAfter']),
+        ]
+
+    @staticmethod
+    def enqueue(crash, kind, **kwargs):
+        """
+        Queue a new job for the given crash unless the same kind of work is
+        already waiting for it.
+        """
+        payload = json.dumps(kwargs) if kwargs else None
+        q = CrashDumpJob.objects.filter(crash=crash, kind=kind, state=CrashDumpJob.STATE_PENDING, payload=payload)
+        if q:
+            return q[0]
+        return CrashDumpJob.objects.create(crash=crash, kind=kind, payload=payload)
+
+    def get_payload(self):
+        return json.loads(self.payload) if self.payload else {}
+
+    def __str__(self):
+        return '%s, %s (%s)' % (self.crash, self.kind, self.state)
+
 
 def add_crashdump_states(apps, schema_editor):
     model = apps.get_model('crashupload', 'CrashDumpState')
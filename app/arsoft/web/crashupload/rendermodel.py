@@ -0,0 +1,93 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+from django.utils.safestring import SafeString
+
+from crashdump.utils import *
+
+# approximate memory used by a formatted row, used as the weight of the
+# model in the report cache
+RENDER_MODEL_ROW_SIZE = 1024
+
+class ReportRenderModel(object):
+    """
+    Pre-formatted rows of the thread list and of the stack dumps of a
+    report. Each row is a dict with the cell strings the templates used to
+    format with the crashupload_utils tags, so formatting is done once per
+    report instead of on every rendering. The formatted strings are safe,
+    like the output of the tags; plain values such as names are kept as
+    they are and escaped by the templates.
+    All rows are formatted when the model is created. The model keeps only
+    the rows and no section, since every entity of a section refers to the
+    whole report, which could then not be freed by the report cache.
+    Sections given as LazyReportSection are read right away.
+    """
+    def __init__(self, threads, stackdumps, module_index, bits):
+        sections = resolve_report_sections({'threads': threads, 'stackdumps': stackdumps, 'module_index': module_index})
+        self._thread_rows = ReportRenderModel._format_thread_rows(sections['threads'], sections['module_index'], bits)
+        self._stackdump_rows = []
+        self._frame_rows = {}
+        for stackdump in sections['stackdumps'] or []:
+            if not stackdump.simplified:
+                self._stackdump_rows.append({'threadid': stackdump.threadid,
+                                             'title': SafeString(format_thread(stackdump.thread))})
+                self._frame_rows[stackdump.threadid] = ReportRenderModel._format_frame_rows(stackdump, bits)
+
+    @property
+    def size(self):
+        num_rows = len(self._thread_rows) + len(self._stackdump_rows)
+        for rows in self._frame_rows.values():
+            num_rows += len(rows)
+        return num_rows * RENDER_MODEL_ROW_SIZE
+
+    @property
+    def thread_rows(self):
+        return self._thread_rows
+
+    @property
+    def stackdump_rows(self):
+        return self._stackdump_rows
+
+    def frame_rows(self, threadid):
+        """
+        Returns the rows of the call stack of the given thread or None if
+        the report has no stack dump of the thread.
+        """
+        return self._frame_rows.get(threadid)
+
+    @staticmethod
+    def _format_thread_rows(threads, module_index, bits):
+        ret = []
+        for thread in threads or []:
+            ret.append({'id': thread.id,
+                        'id_hex': SafeString(hex_format(thread.id)),
+                        'extra_info': SafeString(thread_extra_info(thread)),
+                        'name': thread.name,
+                        'location': SafeString(format_stack_frame(getattr(thread, 'location', None))),
+                        'memory': thread.memory,
+                        'memory_addr': SafeString(addr_format_bits(thread.memory, bits)) if thread.memory else None,
+                        'start_addr': SafeString(addr_format_bits(thread.start_addr, bits)),
+                        'start_module': SafeString(format_address_module(module_index, thread.start_addr)),
+                        'create_time': thread.create_time,
+                        'exit_time': thread.exit_time,
+                        'kernel_time': SafeString(format_milliseconds(thread.kernel_time)),
+                        'user_time': SafeString(format_milliseconds(thread.user_time)),
+                        'cpu_affinity': SafeString(hex_format(thread.cpu_affinity)),
+                        })
+        return ret
+
+    @staticmethod
+    def _format_frame_rows(stackdump, bits):
+        ret = []
+        for frame in stackdump.callstack or []:
+            ret.append({'num': frame.num,
+                        'trust_level': SafeString(format_trust_level(frame.trust_level)),
+                        'addr': SafeString(addr_format_bits(frame.addr, bits)),
+                        'retaddr': SafeString(addr_format_bits(frame.retaddr, bits)) if frame.retaddr is not None else '',
+                        'params': SafeString(hex_format_bits(frame.params, bits)),
+                        'module': frame.module,
+                        'function': SafeString(format_function_plus_offset(frame.function, frame.funcoff)),
+                        'source': SafeString(format_source_line(frame.source, frame.line, frame.lineoff, frame.source_url)),
+                        })
+        return ret
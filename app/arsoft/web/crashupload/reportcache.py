@@ -0,0 +1,142 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import os
+import threading
+from collections import OrderedDict
+from django.conf import settings
+
+from crashdump.xmlreport import XMLReport
+from crashdump.systeminforeport import SystemInfoReport
+from .rendermodel import ReportRenderModel
+
+class ReportLRU(object):
+    """
+    Least recently used cache of parsed reports, bounded by the sum of the
+    sizes given for the cached objects (an estimate of the memory they use)
+    instead of the number of entries. The size of an object may be updated
+    with resize when it grows, e.g. when a report loads another section.
+    """
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._items = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key, value, size):
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._size -= old[1]
+            # objects larger than the whole cache are not kept at all
+            if size > self.max_size:
+                return
+            self._items[key] = (value, size)
+            self._size += size
+            while self._size > self.max_size:
+                k, (v, s) = self._items.popitem(last=False)
+                self._size -= s
+                self.evictions += 1
+
+    def resize(self, key, size):
+        with self._lock:
+            item = self._items.get(key)
+            if item is None or item[1] == size:
+                return
+            self._items[key] = (item[0], size)
+            self._size += size - item[1]
+            # an object grown beyond the whole cache is evicted itself
+            if size > self.max_size:
+                del self._items[key]
+                self._size -= size
+                self.evictions += 1
+            while self._size > self.max_size:
+                k, (v, s) = self._items.popitem(last=False)
+                self._size -= s
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def stats(self):
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                    'entries': len(self._items), 'size': self._size, 'max_size': self.max_size}
+
+report_cache = ReportLRU(getattr(settings, 'REPORT_CACHE_SIZE', 64 * 1024 * 1024))
+
+def _file_key(filename):
+    st = os.stat(filename)
+    return st.st_size, st.st_mtime_ns
+
+def get_xml_report(crash, xmlfile, fields=None):
+    """
+    Returns the XMLReport of the given crash from the cache or opens it.
+    The cached report loads the sections not given in fields on first
+    access. Raises XMLReport.XMLReportException like XMLReport.
+    """
+    try:
+        size, mtime = _file_key(xmlfile)
+    except OSError:
+        return XMLReport(xmlfile, fields=fields)
+    key = ('xmlreport', crash.crashid, xmlfile, size, mtime)
+    ret = report_cache.get(key)
+    if ret is None:
+        ret = XMLReport(xmlfile, fields=fields)
+        # the report is charged with its estimated memory, which grows
+        # with every section it loads
+        ret.size_changed = lambda size: report_cache.resize(key, size)
+        report_cache.put(key, ret, ret.size)
+    return ret
+
+def get_system_info_report(crash, xmlreport):
+    """
+    Returns the SystemInfoReport of the given XMLReport of the crash from
+    the cache or parses it.
+    """
+    try:
+        size, mtime = _file_key(xmlreport.filename)
+    except (OSError, TypeError):
+        return SystemInfoReport(xmlreport=xmlreport)
+    key = ('sysinfo', crash.crashid, xmlreport.filename, size, mtime)
+    ret = report_cache.get(key)
+    if ret is None:
+        ret = SystemInfoReport(xmlreport=xmlreport)
+        report_cache.put(key, ret, len(ret.text) if ret.text else 0)
+    return ret
+
+def get_render_model(crash, context):
+    """
+    Returns the ReportRenderModel of the report in the given template
+    context from the cache or creates it. Only the models of XML reports
+    are cached.
+    """
+    xmlreport = context.get('xmlreport')
+    bits = context['bits']
+    try:
+        size, mtime = _file_key(xmlreport.filename)
+        key = ('rendermodel', crash.crashid, xmlreport.filename, size, mtime, bits)
+    except (OSError, AttributeError, TypeError):
+        key = None
+    ret = report_cache.get(key) if key is not None else None
+    if ret is None:
+        ret = ReportRenderModel(context.get('threads'), context.get('stackdumps'), context.get('module_index'), bits)
+        if key is not None:
+            report_cache.put(key, ret, ret.size)
+    return ret
@@ -109,6 +109,14 @@ MIGRATE_DB_DATABASE = os.getenv('MIGRATE_DB_DATABASE', 'trac')
 MIGRATE_DB_USER = os.getenv('MIGRATE_DB_USER', 'root')
 MIGRATE_DB_PASSWORD = os.getenv('MIGRATE_DB_PASSWORD', 'pass')
 
+# size of the parsed reports kept in memory by each worker process, in bytes
+# of report data; 0 disables the cache
+REPORT_CACHE_SIZE = safe_int(os.getenv('REPORT_CACHE_SIZE'), 64 * 1024 * 1024)
+
+# seconds the browsers may use the crash pages and downloads without asking
+# the server again; afterwards they are revalidated with their ETag
+CRASH_PAGE_MAX_AGE = safe_int(os.getenv('CRASH_PAGE_MAX_AGE'), 0)
+
 OIDC_RP_CLIENT_ID = os.getenv('OIDC_RP_CLIENT_ID', '')
 OIDC_RP_CLIENT_SECRET = os.getenv('OIDC_RP_CLIENT_SECRET', '')
 
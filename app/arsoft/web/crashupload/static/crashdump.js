@@ -1,18 +1,64 @@
 function crashbox_expand(e) {
-    if ($(this).is(e.target)) {
-        var url = window.location.href;
-        var path = window.location.pathname;
-        var target_url = (path + '/').replace('//', '/') + this.id.replace(/___/g, '/');
-        console.log(this.id + ' load ' + target_url);
-        var xx = $(this).children('div#placeholder');
-        xx.load(target_url, function() {
-            $(".collapse").on('show.bs.collapse', crashbox_expand);
-            }
-        );
+    // nested boxes of a loaded section trigger the event of their parents too
+    if (!$(this).is(e.target)) {
+        return;
     }
+    var box = $(this);
+    // each section is only requested once, while it is opened the first
+    // time; sections opened at the same time load in parallel
+    if (box.data('loaded')) {
+        return;
+    }
+    box.data('loaded', true);
+    var path = window.location.pathname;
+    var target_url = (path + '/').replace('//', '/') + this.id.replace(/___/g, '/');
+    box.children('div#placeholder').load(target_url, function(response, status) {
+        if (status == 'error') {
+            // try again when the section is opened the next time
+            box.data('loaded', false);
+        }
+    });
+}
+function memory_block_load_more(block) {
+    var url = block.attr('data-next-url');
+    if (!url || block.data('loading')) {
+        return;
+    }
+    block.data('loading', true);
+    $.getJSON(url, {'format': 'json'}, function(data) {
+        block.find('pre.hexdump-offset').append(document.createTextNode('\r\n' + data.raw_offset));
+        block.find('pre.hexdump-hex').append(document.createTextNode('\r\n' + data.raw_hex));
+        block.find('pre.hexdump-ascii').append(document.createTextNode('\r\n' + data.raw_ascii));
+        if (data.next_url) {
+            block.attr('data-next-url', data.next_url);
+        }
+        else {
+            block.removeAttr('data-next-url');
+            block.find('div.memory_block_more').remove();
+        }
+        block.data('loading', false);
+    }).fail(function() {
+        block.data('loading', false);
+    });
+}
+function memory_block_scroll() {
+    // load the next part of all visible memory blocks which end close to
+    // the bottom of the window
+    var limit = $(window).scrollTop() + $(window).height() + 200;
+    $('div.memory_block[data-next-url]:visible').each(function() {
+        var block = $(this);
+        if (block.offset().top + block.outerHeight() < limit) {
+            memory_block_load_more(block);
+        }
+    });
 }
 function crashdump_docReady() {
     jQuery(document).ready(function($) {
-        $(".collapse").on('show.bs.collapse', crashbox_expand);
+        $(document).on('show.bs.collapse', '.collapse', crashbox_expand);
+        $(window).on('scroll', memory_block_scroll);
+        $(document).on('click', 'a.memory_block_more', function(e) {
+            e.preventDefault();
+            memory_block_load_more($(this).closest('div.memory_block'));
+        });
     });
 }
@@ -22,13 +22,15 @@ class CrashDumpModelTable(ColumnShiftTable):
                      'crashHostName', 'crashUserName', 
                      'reportHostName', 'reportUserName',
                      'productTargetVersion', 'productVersion', 
-                     'machine_os', 'buildType')
+                     'machine_os', 'buildType',
+                     'exception', 'top_frame')
         attrs = {"class": "crashlist table-sortable"}        
         hide_fields_by_default = [
             'reporttimestamp',
             'reportHostName', 'reportUserName',
             'applicationFile', 
             'productVersion', 
+            'top_frame',
         ]
 
     id = tables.LinkColumn("crash_details", kwargs={"pk": tables.A("id")})
@@ -37,6 +39,8 @@ class CrashDumpModelTable(ColumnShiftTable):
     reporttimestamp = tables.DateTimeColumn(format = settings.SHORT_DATETIME_FORMAT)
 
     productTargetVersion = tables.Column(accessor='productTargetVersion', verbose_name='Version')   
+    exception = tables.Column(accessor='summary__exceptionName', verbose_name='Exception')
+    top_frame = tables.Column(accessor='summary__topFrame', verbose_name='Location')
 
     #productVersionNum = VersionNumberColumn(accessor='productVersion')   
     #productTargetVersionNum = VersionNumberColumn(accessor='productTargetVersion')   
@@ -0,0 +1,292 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import os
+import gc
+import shutil
+import weakref
+import tempfile
+
+from django.contrib.auth.models import User
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from .models import CrashDumpProject, CrashDumpState, CrashDumpModel, CrashDumpJob, CrashDumpLink
+from .reportcache import ReportLRU, report_cache
+from .analysis import analyze_crash
+from .rendermodel import ReportRenderModel
+from crashdump.xmlreport import XMLReport
+
+CRASH_ID = '12345678-1234-1234-1234-123456789abc'
+
+REPORT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<crash_dump>
+<uuid type="uuid">12345678-1234-1234-1234-123456789abc</uuid>
+<application type="QString">C:/Program Files/App/app.exe</application>
+<system_info>
+<platform_type type="QString">Windows NT</platform_type>
+<cpu_type type="QString">AMD64</cpu_type>
+<number_of_cpus type="int">8</number_of_cpus>
+</system_info>
+<modules>
+<module>
+<base type="uint">7ff700000000</base>
+<size type="uint">80000</size>
+<name type="QString">C:/Program Files/App/app.exe</name>
+</module>
+</modules>
+<threads>
+<thread>
+<id type="uint">1004</id>
+<name type="QString">main</name>
+<exception type="bool">true</exception>
+<start_addr type="uint">7ff700001000</start_addr>
+</thread>
+</threads>
+<memory_blocks>
+<memory_block>
+<num type="int">0</num>
+<base type="uint">10000000</base>
+<size type="uint">40</size>
+<memory type="QByteArray" encoding-type="base64">AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8gISIjJCUmJygpKissLS4vMDEyMzQ1Njc4OTo7PD0+Pw==</memory>
+</memory_block>
+</memory_blocks>
+<stackdumps>
+<stackdump threadid="0x1004" simplified="false" exception="true">
+<frame>
+<num type="int">0</num>
+<addr type="uint">7ff700001010</addr>
+<module type="QString">app.exe</module>
+<function type="QString">main</function>
+<funcoff type="uint">10</funcoff>
+</frame>
+</stackdump>
+</stackdumps>
+</crash_dump>
+"""
+
+class CrashPageConditionalTest(TestCase):
+    def setUp(self):
+        self._media_root = tempfile.mkdtemp()
+        self._settings = override_settings(MEDIA_ROOT=self._media_root)
+        self._settings.enable()
+        report_cache.clear()
+        xmlfile = 'dumpdata/%s/report.xml' % CRASH_ID
+        self.xmlfile = os.path.join(self._media_root, xmlfile)
+        os.makedirs(os.path.dirname(self.xmlfile))
+        with open(self.xmlfile, 'w') as f:
+            f.write(REPORT_XML)
+        state, created = CrashDumpState.objects.get_or_create(name='new')
+        self.crash = CrashDumpModel.objects.create(crashid=CRASH_ID, state=state, applicationName='app', applicationFile='app.exe',
+                                                   productCodeName='app', minidumpReportXMLFile=xmlfile)
+        User.objects.create_user('user', password='secret')
+        self.client.login(username='user', password='secret')
+
+    def tearDown(self):
+        report_cache.clear()
+        self._settings.disable()
+        shutil.rmtree(self._media_root)
+
+    def _url(self, page=None):
+        if page is None:
+            return reverse('crash_details', args=[self.crash.id])
+        return reverse('crash_details_view', kwargs={'pk': self.crash.id, 'page': page})
+
+    def test_not_modified(self):
+        for page in [None, 'modules']:
+            response = self.client.get(self._url(page))
+            self.assertEqual(response.status_code, 200)
+            etag = response['ETag']
+            self.assertTrue(etag.startswith('W/"'))
+            misses = report_cache.stats()['misses']
+            response = self.client.get(self._url(page), HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(response['ETag'], etag)
+            # the report is not opened for a 304
+            self.assertEqual(report_cache.stats()['misses'], misses)
+
+    def test_download(self):
+        url = reverse('crash_report', kwargs={'pk': self.crash.id, 'report_type': 'minidumpXMLReport', 'flag': 'raw'})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, REPORT_XML.encode('utf8'))
+        # the download is the unchanged file, so the ETag is strong
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('"'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        st = os.stat(self.xmlfile)
+        os.utime(self.xmlfile, (st.st_atime, st.st_mtime + 10))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_file_changed(self):
+        etag = self.client.get(self._url('modules'))['ETag']
+        st = os.stat(self.xmlfile)
+        os.utime(self.xmlfile, (st.st_atime, st.st_mtime + 10))
+        response = self.client.get(self._url('modules'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_overview_not_modified_since(self):
+        # the overview shows data from the database without a modification
+        # time, so it is not validated by Last-Modified
+        response = self.client.get(self._url())
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Last-Modified', response)
+        last_modified = self.client.get(self._url('modules'))['Last-Modified']
+        response = self.client.get(self._url(), HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 200)
+
+    def test_memory_block_window(self):
+        url = reverse('crash_details_memory_block', kwargs={'pk': self.crash.id, 'page': 'memory_block', 'param': str(0x10000000),
+                                                            'offset': 16, 'length': 16})
+        response = self.client.get(url, {'format': 'json'})
+        self.assertEqual(response.status_code, 200)
+        window = response.json()
+        self.assertEqual((window['base'], window['size'], window['offset'], window['length']), (0x10000000, 64, 16, 16))
+        self.assertEqual(window['next_url'], reverse('crash_details_memory_block', kwargs={'pk': self.crash.id, 'page': 'memory_block',
+                                                                                         'param': str(0x10000000), 'offset': 32, 'length': 16}))
+        # the first page of the block still uses the sub-page URL
+        url = reverse('crash_details_view_sub', kwargs={'pk': self.crash.id, 'page': 'memory_block', 'param': str(0x10000000)})
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+    def test_login_again(self):
+        # with a project the overview has the form to create an issue
+        CrashDumpProject.objects.create(name='App', description='App', codename='app')
+        response = self.client.get(self._url())
+        etag = response['ETag']
+        csrftoken = self.client.cookies['csrftoken'].value
+        self.client.post('/accounts/logout/')
+        self.client.post('/accounts/login/', {'username': 'user', 'password': 'secret'})
+        self.assertNotEqual(self.client.cookies['csrftoken'].value, csrftoken)
+        # the page of the previous login has a CSRF token of the old secret
+        response = self.client.get(self._url(), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertContains(response, 'csrfmiddlewaretoken')
+
+class ReportLRUTest(SimpleTestCase):
+    def test_size_bound(self):
+        cache = ReportLRU(100)
+        cache.put('a', 'A', 40)
+        cache.put('b', 'B', 40)
+        self.assertEqual(cache.get('a'), 'A')
+        # b is the least recently used one
+        cache.put('c', 'C', 40)
+        self.assertIsNone(cache.get('b'))
+        self.assertEqual(cache.get('c'), 'C')
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['size'], stats['evictions']), (2, 80, 1))
+        # objects larger than the cache are not kept
+        cache.put('d', 'D', 200)
+        self.assertIsNone(cache.get('d'))
+        self.assertEqual(cache.stats()['size'], 80)
+
+    def test_resize(self):
+        cache = ReportLRU(100)
+        cache.put('a', 'A', 40)
+        cache.put('b', 'B', 40)
+        cache.resize('b', 50)
+        self.assertEqual(cache.stats()['size'], 90)
+        # growing b evicts the least recently used a
+        cache.resize('b', 70)
+        self.assertIsNone(cache.get('a'))
+        self.assertEqual(cache.get('b'), 'B')
+        self.assertEqual(cache.stats()['evictions'], 1)
+        # unknown keys are ignored
+        cache.resize('a', 10)
+        self.assertEqual(cache.stats()['size'], 70)
+        # b grows beyond the whole cache
+        cache.resize('b', 150)
+        self.assertIsNone(cache.get('b'))
+        stats = cache.stats()
+        self.assertEqual((stats['entries'], stats['size'], stats['evictions']), (0, 0, 2))
+
+class ReportRenderModelTest(SimpleTestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'report.xml')
+        with open(self.filename, 'w') as f:
+            f.write(REPORT_XML)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_rows(self):
+        report = XMLReport(self.filename)
+        model = ReportRenderModel(report.threads, report.stackdumps, report.module_index, 64)
+        self.assertEqual([row['name'] for row in model.thread_rows], ['main'])
+        self.assertEqual([row['threadid'] for row in model.stackdump_rows], [0x1004])
+        self.assertEqual([row['num'] for row in model.frame_rows(0x1004)], [0])
+        self.assertIsNone(model.frame_rows(0x1000))
+        self.assertEqual(model.size, 3 * 1024)
+
+    def test_no_report_kept(self):
+        # the cached model must not keep the report alive
+        report = XMLReport(self.filename)
+        model = ReportRenderModel(report.threads, report.stackdumps, report.module_index, 64)
+        ref = weakref.ref(report)
+        del report
+        gc.collect()
+        self.assertIsNone(ref())
+        self.assertEqual(len(model.frame_rows(0x1004)), 1)
+
+class AnalysisTest(TestCase):
+    def setUp(self):
+        self._media_root = tempfile.mkdtemp()
+        self._settings = override_settings(MEDIA_ROOT=self._media_root)
+        self._settings.enable()
+        state, created = CrashDumpState.objects.get_or_create(name='new')
+        xmlfile = 'dumpdata/%s/report.xml' % CRASH_ID
+        filename = os.path.join(self._media_root, xmlfile)
+        os.makedirs(os.path.dirname(filename))
+        # names longer than the database fields
+        xml = REPORT_XML.replace('<module type="QString">app.exe</module>', '<module type="QString">%s.exe</module>' % ('m' * 300))
+        xml = xml.replace('</crash_dump>', '<fast_protect_system_info>\n<fqdn type="QString">%s</fqdn>\n'
+                          '<username type="QString">%s</username>\n</fast_protect_system_info>\n</crash_dump>' % ('h' * 300, 'u' * 300))
+        with open(filename, 'w') as f:
+            f.write(xml)
+        self.crash = CrashDumpModel.objects.create(crashid=CRASH_ID, state=state, applicationName='app', applicationFile='app.exe',
+                                                   productCodeName='app', minidumpReportXMLFile=xmlfile)
+
+    def tearDown(self):
+        self._settings.disable()
+        shutil.rmtree(self._media_root)
+
+    def test_truncated(self):
+        summary = analyze_crash(self.crash)
+        self.assertIsNone(summary.xmlError)
+        summary.refresh_from_db()
+        self.assertEqual(summary.crashHostName, 'h' * 256)
+        self.assertEqual(summary.crashUserName, 'u' * 256)
+        self.assertEqual([frm.module for frm in self.crash.frames.all()], ['m' * 256])
+
+class SubmitTest(TestCase):
+    def setUp(self):
+        self._media_root = tempfile.mkdtemp()
+        self._settings = override_settings(MEDIA_ROOT=self._media_root)
+        self._settings.enable()
+        CrashDumpState.objects.get_or_create(name='new')
+
+    def tearDown(self):
+        self._settings.disable()
+        shutil.rmtree(self._media_root)
+
+    def test_issue_linked_by_worker(self):
+        # the issue tracker is not contacted during the upload, not even for
+        # the crash uploader
+        CrashDumpProject.objects.create(name='App', description='App', codename='app',
+                                        issueTrackerType=CrashDumpProject.GITLAB, issueTrackerUrl='http://gitlab.invalid')
+        response = self.client.post('/submit', {'id': CRASH_ID, 'applicationfile': 'app.exe', 'productcodename': 'app', 'cputype': '9',
+                                                'crashtimestamp': '2024-01-01T00:00:00', 'reporttimestamp': '2024-01-01T00:00:00',
+                                                'ticket': 'new', 'minidumpreportxml': SimpleUploadedFile('report.xml', REPORT_XML.encode('utf8'))},
+                                    HTTP_USER_AGENT='terra3d-crashuploader')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('Linked-Tickets', response)
+        crash = CrashDumpModel.objects.get(crashid=CRASH_ID)
+        self.assertTrue(CrashDumpJob.objects.filter(crash=crash, kind=CrashDumpJob.KIND_ISSUE_LINK).exists())
+        self.assertFalse(CrashDumpLink.objects.filter(crash=crash).exists())
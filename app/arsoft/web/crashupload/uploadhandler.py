@@ -0,0 +1,77 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import os
+import tempfile
+from django.conf import settings
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import UploadedFile, TemporaryUploadedFile
+from django.core.files.uploadhandler import FileUploadHandler
+
+# staging directory for incoming uploads, relative to the storage root. It
+# lives below dumpdata so the final move into dumpdata/<crashid>/ is a
+# rename within the same filesystem.
+UPLOAD_STAGING_DIR = 'dumpdata/.incoming'
+
+class StagedUploadedFile(TemporaryUploadedFile):
+    """
+    An uploaded file which has been streamed to disk into the staging
+    directory. Use commit() to move it to its final location.
+    """
+    def __init__(self, staging_dir, name, content_type, size, charset, content_type_extra=None):
+        _, ext = os.path.splitext(name)
+        file = tempfile.NamedTemporaryFile(suffix='.upload' + ext, dir=staging_dir)
+        UploadedFile.__init__(self, file, name, content_type, size, charset, content_type_extra)
+
+    def commit(self, item_name):
+        full_path = default_storage.path(item_name)
+        os.makedirs(os.path.dirname(full_path), exist_ok=True)
+        self.file.flush()
+        # atomic rename, replaces an existing file (force upload) in one step
+        os.replace(self.temporary_file_path(), full_path)
+        if settings.FILE_UPLOAD_PERMISSIONS is not None:
+            os.chmod(full_path, settings.FILE_UPLOAD_PERMISSIONS)
+        return full_path
+
+class CrashDumpUploadHandler(FileUploadHandler):
+    """
+    Upload handler that writes each chunk directly into the staging
+    directory next to the dump data, regardless of the file size, so the
+    uploaded dump files are never held in memory.
+    """
+    def new_file(self, *args, **kwargs):
+        super(CrashDumpUploadHandler, self).new_file(*args, **kwargs)
+        staging_dir = default_storage.path(UPLOAD_STAGING_DIR)
+        os.makedirs(staging_dir, exist_ok=True)
+        self.file = StagedUploadedFile(staging_dir, self.file_name, self.content_type, 0, self.charset, self.content_type_extra)
+
+    def receive_data_chunk(self, raw_data, start):
+        self.file.write(raw_data)
+
+    def file_complete(self, file_size):
+        self.file.seek(0)
+        self.file.size = file_size
+        return self.file
+
+    def upload_interrupted(self):
+        if hasattr(self, 'file'):
+            temp_location = self.file.temporary_file_path()
+            try:
+                self.file.close()
+                os.remove(temp_location)
+            except FileNotFoundError:
+                pass
+
+def store_uploaded_file(file, item_name, replace=False):
+    """
+    Store the given uploaded file as item_name in the default storage and
+    return the path of the stored file.
+    """
+    if isinstance(file, StagedUploadedFile):
+        return file.commit(item_name)
+    if replace and default_storage.exists(item_name):
+        default_storage.delete(item_name)
+    # stream any other uploaded file chunk by chunk into the storage
+    item_name = default_storage.save(item_name, file)
+    return default_storage.path(item_name)
@@ -10,7 +10,7 @@ from django.contrib.auth import views as auth_views
 from .views import CrashDumpListView, CrashDumpDetails, CrashDumpDetailsFromCrashId, \
     CrashDumpDetailsSub, CrashDumpSysInfo, CrashDumpReport, crashdump_new_link, \
         submit, submit_capabilities, submit_crashlist, \
-            crashdump_version, nav_items_context
+            crashdump_version, nav_items_context, CrashSignatureListView
 from .migrate import migrate
 
 # Uncomment the next two lines to enable the admin:
@@ -23,10 +23,13 @@ urlpatterns = [
     re_path(r'^list/application/(?P<application>[\w\-]+)$', CrashDumpListView.as_view(), name='list_filter_app'),
     re_path(r'^list/application/(?P<application>[\w\-]+)/(?P<state>[\w\-]+)$', CrashDumpListView.as_view(), name='list_filter_app_and_state'),
     re_path(r'^list/state/(?P<state>[\w\-]+)$', CrashDumpListView.as_view(), name='list_filter_state'),
+    re_path(r'^signatures$', CrashSignatureListView.as_view(), name='top_crashers'),
+    re_path(r'^signatures/application/(?P<application>[\w\-]+)$', CrashSignatureListView.as_view(), name='top_crashers_app'),
     re_path(r'^view/(?P<pk>\d+)$', CrashDumpDetails.as_view(), name='crash_details'),
     re_path(r'^view/(?P<pk>\d+)/newlink$', crashdump_new_link, name='crash_new_link'),
     re_path(r'^view/(?P<pk>\d+)/view/(?P<page>\w+)$', CrashDumpDetailsSub.as_view(), name='crash_details_view'),
     re_path(r'^view/(?P<pk>\d+)/view/(?P<page>\w+)/(?P<param>[0-9a-fA-F]+)$', CrashDumpDetailsSub.as_view(), name='crash_details_view_sub'),
+    re_path(r'^view/(?P<pk>\d+)/view/(?P<page>memory_block)/(?P<param>[0-9a-fA-F]+)/(?P<offset>\d+)/(?P<length>\d+)$', CrashDumpDetailsSub.as_view(), name='crash_details_memory_block'),
     re_path(r'^view/(?P<crashid>\b[0-9a-f]{8}\b-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-\b[0-9a-f]{12}\b)$', CrashDumpDetailsFromCrashId.as_view(), name='crash_details_crashid'),
     
     re_path(r'^sysinfo/(?P<pk>\d+)/?(?P<page>\w+)?$', CrashDumpSysInfo.as_view(), name='sysinfo_report'),
@@ -5,10 +5,10 @@ from django.template import RequestContext, loader
 from django.urls import reverse
 from django.core import serializers
 from django.core.files.storage import default_storage
-from django.core.files.base import ContentFile
 from django.http import HttpResponseRedirect, HttpResponse, Http404, JsonResponse, HttpResponseNotAllowed, HttpResponseForbidden
 from django.shortcuts import render, get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
+from django.middleware.csrf import get_token
 from django.views.generic.list import ListView
 from django.views.generic.edit import UpdateView
 from django.views.generic.detail import DetailView
@@ -20,20 +20,27 @@ from django_tables2.export.views import ExportMixin
 from django_filters.views import FilterView
 import django_filters
 from django.conf import settings
+from django.db.models import F, Count, Min, Max
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
 
 import os.path
+import hashlib
 from io import StringIO
 import logging
 import time
-from .models import CRASHDUMP_VERSION, CrashDumpProject, CrashDumpSetting, CrashDumpState, CrashDumpModel, CrashDumpLink, CrashDumpAttachment
+from .models import CRASHDUMP_VERSION, CrashDumpProject, CrashDumpSetting, CrashDumpState, CrashDumpModel, CrashDumpLink, CrashDumpAttachment, CrashDumpJob, CrashSignature
 from .tables import CrashDumpModelTable
 from .forms import UploadFileForm
+from .uploadhandler import CrashDumpUploadHandler, store_uploaded_file
+from .analysis import get_crash_summary
+from .reportcache import report_cache, get_xml_report, get_system_info_report, get_render_model
 from uuid import UUID
 from django.conf import settings as django_settings
 from pytz import UTC
 
 from crashdump.utils import *
-from crashdump.minidump import MiniDump
+from crashdump.minidump import MiniDump, MiniDumpWrapper
 from crashdump.xmlreport import XMLReport
 from crashdump.systeminforeport import SystemInfoReport
 
@@ -62,7 +69,124 @@ def nav_items_context():
     context['nav_items'] = nav_items
     return context
 
-def add_utils_to_context(context, crash=None):
+# size of the part of a memory block shown at once and loaded on scrolling
+MEMORY_BLOCK_WINDOW_SIZE = 4096
+MEMORY_BLOCK_MAX_WINDOW_SIZE = 65536
+
+# increment when the rendering of the crash pages changes, so browsers do
+# not keep pages of an older version
+CRASH_PAGE_VERSION = 1
+
+_crash_file_fields = ['minidumpFile', 'minidumpReportTextFile', 'minidumpReportXMLFile', 'minidumpReportHTMLFile',
+                      'coredumpFile', 'coredumpReportTextFile', 'coredumpReportXMLFile', 'coredumpReportHTMLFile',
+                      'gfxCapsFile']
+
+def _crash_validators(crash, extra=None):
+    """
+    Returns the ETag and the modification time (seconds since epoch) of the
+    responses for the given crash. Both are derived from the crash id and
+    the size and modification time of its files, which only change if the
+    crash is uploaded again with force. The ETag is weak since the pages
+    also show the parse time and the report cache counters of the request.
+    """
+    items = [CRASH_PAGE_VERSION, crash.id, crash.crashid]
+    last_modified = None
+    for f in _crash_file_fields:
+        filename = _get_dump_filename(crash, getattr(crash, f))
+        if filename is None:
+            continue
+        try:
+            st = os.stat(filename)
+        except OSError:
+            continue
+        items.append((f, st.st_size, st.st_mtime_ns))
+        if last_modified is None or st.st_mtime > last_modified:
+            last_modified = st.st_mtime
+    if extra:
+        items.extend(extra)
+    etag = 'W/"%s"' % hashlib.sha1(repr(items).encode('utf8')).hexdigest()
+    return etag, int(last_modified) if last_modified is not None else None
+
+def _file_validators(crash, filename):
+    """
+    Returns the strong ETag and the modification time (seconds since epoch)
+    of the download of the given file of the crash, (None, None) if the file
+    does not exist. The download is the unchanged file, so it is the same
+    for all requests as long as the file is.
+    """
+    if not filename or not default_storage.exists(filename):
+        return None, None
+    try:
+        st = os.stat(default_storage.path(filename))
+    except OSError:
+        return None, None
+    items = [crash.id, crash.crashid, filename, st.st_size, st.st_mtime_ns]
+    etag = '"%s"' % hashlib.sha1(repr(items).encode('utf8')).hexdigest()
+    return etag, int(st.st_mtime)
+
+class CrashDumpConditionalMixin(object):
+    """
+    Adds ETag, Last-Modified and Cache-Control headers to the responses of
+    a crash detail view and answers matching If-None-Match and
+    If-Modified-Since requests with 304 before the reports are parsed.
+    """
+    def get_validator_data(self):
+        """
+        Returns additional data the response depends on besides the files
+        of the crash.
+        """
+        # the pages show the name of the user and some depend on the
+        # query (error message, format of the memory block)
+        return [self.request.user.pk, self.request.GET.urlencode()]
+
+    def get_validators(self):
+        """
+        Returns the ETag and the modification time of the response, either
+        may be None.
+        """
+        return _crash_validators(self.object, self.get_validator_data())
+
+    def get(self, request, *args, **kwargs):
+        self.object = self.get_object()
+        etag, last_modified = self.get_validators()
+        response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+        if response is None:
+            context = self.get_context_data(object=self.object)
+            response = self.render_to_response(context)
+        if response.status_code in (200, 304):
+            if etag is not None:
+                response['ETag'] = etag
+            if last_modified is not None:
+                response['Last-Modified'] = http_date(last_modified)
+            # the views require a login, so only the browser may keep them
+            patch_cache_control(response, private=True, max_age=getattr(settings, 'CRASH_PAGE_MAX_AGE', 0))
+        return response
+
+def _memory_block_window(crash, memory_block, offset, length):
+    """
+    Returns the hexdump columns of the given byte range of the memory
+    block and the URL of the following range.
+    """
+    memory = memory_block.memory
+    size = len(memory) if memory is not None else 0
+    offset = min(max(offset, 0), size) & ~15
+    length = min(max(length, 16), MEMORY_BLOCK_MAX_WINDOW_SIZE)
+    start = offset // 16
+    stop = (offset + length + 15) // 16
+    if memory is not None:
+        raw_offset, raw_hex, raw_ascii = memory.hexdump.raw_columns(start, stop)
+    else:
+        raw_offset, raw_hex, raw_ascii = '', '', ''
+    next_offset = stop * 16 if stop * 16 < size else None
+    next_url = None
+    if next_offset is not None:
+        next_url = reverse('crash_details_memory_block', kwargs={'pk': crash.id, 'page': 'memory_block', 'param': str(memory_block.base),
+                                                                'offset': next_offset, 'length': length})
+    return {'base': memory_block.base, 'size': size, 'offset': offset, 'length': min(length, size - offset),
+            'next_offset': next_offset, 'next_url': next_url,
+            'raw_offset': raw_offset, 'raw_hex': raw_hex, 'raw_ascii': raw_ascii }
+
+def add_utils_to_context(context, crash=None, summary=None, fields=None, overview=False):
 
     if not 'error' in context:
         context['error'] = None
@@ -97,12 +221,16 @@ def add_utils_to_context(context, crash=None):
     context['format_thread'] = format_thread
     context['thread_extra_info'] = thread_extra_info
     context['format_stack_frame'] = format_stack_frame
+    context['format_address_module'] = format_address_module
     if crash is None:
         context['addr_format'] = addr_format
     else:
         context['addr_format'] = addr_format_64 if crash.is_64_bit else addr_format_32
         context['is_64_bit'] = crash.is_64_bit
         context['bits'] = 64 if crash.is_64_bit else 32
+        if overview:
+            _add_summary_to_context(context, crash, summary)
+            return
 
         xmlfile = None
         xmlfile_from_db = None
@@ -135,15 +263,14 @@ def add_utils_to_context(context, crash=None):
 
         for f in XMLReport._main_fields:
             context[f] = None
+        context['module_index'] = None
 
         start = time.time()
         if minidumpfile:
             try:
                 context['minidumpfile_size'] = os.path.getsize(minidumpfile)
-                context['minidumpfile'] = MiniDump(minidumpfile)
-            except (OSError, AssertionError) as e:
+            except OSError as e:
                 context['minidumpfile_error'] = str(e)
-                pass
         else:
             if minidumpfile_from_db:
                 context['minidumpfile_error'] = "Minidump file %s not accessible" % minidumpfile_from_db
@@ -154,31 +281,64 @@ def add_utils_to_context(context, crash=None):
                 context['coredumpfile_size'] = os.path.getsize(coredumpfile)
             except OSError:
                 pass
-        if xmlfile:
-            if os.path.isfile(xmlfile):
+        if xmlfile and os.path.isfile(xmlfile):
+            try:
+                xmlreport = get_xml_report(crash, xmlfile, fields=fields)
+                add_report_sections(context, xmlreport)
+                context['xmlreport'] = xmlreport
+                context['is_64_bit'] = xmlreport.is_64_bit
+            except XMLReport.XMLReportIOError as e:
+                context['xmlfile_error'] = str(e)
+        else:
+            # the minidump is only opened if there is no XML report
+            if minidumpfile:
                 try:
-                    xmlreport = XMLReport(xmlfile)
-                    for f in xmlreport.fields:
-                        context[f] = XMLReport.ProxyObject(xmlreport, f)
-                    context['xmlreport'] = xmlreport
-                    context['is_64_bit'] = xmlreport.is_64_bit
-                except XMLReport.XMLReportIOError as e:
-                    context['xmlfile_error'] = str(e)
-            else:
-                wrapper = MiniDumpWrapper(context['minidumpfile'])
-                for f in wrapper.fields:
-                    context[f] = MiniDumpWrapper.ProxyObject(wrapper, f)
-                context['xmlreport'] = None
+                    add_report_sections(context, MiniDumpWrapper(MiniDump(minidumpfile)))
+                except Exception as e:
+                    context['minidumpfile_error'] = str(e)
+            context['xmlreport'] = None
+            if xmlfile:
                 context['xmlfile_error'] = 'XML file %s does not exist' % xmlfile
-            end = time.time()
-            context['parsetime'] = end - start
-        else:
-            if xmlfile_from_db:
+            elif xmlfile_from_db:
                 context['xmlfile_error'] = 'XML file %s not accessible' % xmlfile_from_db
             else:
                 context['xmlfile_error'] = 'No XML file available'
+        end = time.time()
+        context['parsetime'] = end - start
         context['bits'] = 64 if context['is_64_bit'] else 32
         context['addr_format'] = addr_format_64 if context['is_64_bit'] else addr_format_32    
+        context['report_cache_stats'] = report_cache.stats()
+
+def _add_summary_to_context(context, crash, summary):
+    context['summary'] = summary
+    context['frames'] = crash.frames.all()
+    context['reporttextfile_size'] = 0
+    context['reporthtmlfile_size'] = 0
+    context['show_debug_info'] = True
+    context['dbtime'] = 0
+    if summary is None:
+        # not analyzed yet, offer all sections, the pages of the sections
+        # parse the report when they are opened
+        context['analysis_pending'] = True
+        context['sections'] = XMLReport._main_fields if crash.has_minidump or crash.has_coredump else []
+        context['xmlfile_error'] = None
+        context['minidumpfile_error'] = None
+        context['minidumpfile_size'] = 0
+        context['coredumpfile_size'] = 0
+        context['xmlfile_size'] = 0
+        context['parsetime'] = 0
+        return
+    context['sections'] = summary.sections_list
+    context['xmlfile_error'] = summary.xmlError
+    context['minidumpfile_error'] = summary.minidumpError
+    context['minidumpfile_size'] = summary.minidumpFileSize
+    context['coredumpfile_size'] = summary.coredumpFileSize
+    context['xmlfile_size'] = summary.xmlFileSize
+    context['parsetime'] = summary.parseTime
+    if summary.is64Bit is not None:
+        context['is_64_bit'] = summary.is64Bit
+        context['bits'] = 64 if summary.is64Bit else 32
+        context['addr_format'] = addr_format_64 if summary.is64Bit else addr_format_32
 
 class CrashDumpModelViewForm(forms.ModelForm):
     class Meta:
@@ -196,6 +356,8 @@ class CrashDumpFilter(django_filters.FilterSet):
     crashUserName = django_filters.CharFilter(lookup_expr='icontains', label='Crash User')
     buildType = django_filters.ChoiceFilter(choices=CrashDumpModel.BUILDTYPES, label='Build type')
 
+    signature = django_filters.NumberFilter(field_name='summary__signature', label='Signature')
+
     productTargetVersion = django_filters.ModelChoiceFilter(to_field_name='productTargetVersion',
         queryset=CrashDumpModel.objects.values_list('productTargetVersion', flat=True).distinct(), label='Version')    
 
@@ -260,6 +422,10 @@ class CrashDumpListView(LoginRequiredMixin, ExportMixin, SingleTableMixin, Filte
         add_utils_to_context(context)
         return context
 
+    def get_queryset(self):
+        # exception and top frame columns come from the stored summary
+        return super(CrashDumpListView, self).get_queryset().select_related('state', 'summary')
+
     # def get_queryset(self):
     #     if self.application and self.state:
     #         return self.model.objects.filter(applicationName=self.application, state=CrashDumpState.objects.get(name=self.state))
@@ -270,10 +436,64 @@ class CrashDumpListView(LoginRequiredMixin, ExportMixin, SingleTableMixin, Filte
     #     else:
     #         return super(CrashDumpListView, self).get_queryset()
 
-class CrashDumpDetails(LoginRequiredMixin, DetailView):
+class CrashSignatureListView(LoginRequiredMixin, ListView):
+    model = CrashSignature
+    template_name = 'top_crashers.html'
+    paginate_by = 50
+
+    def get_queryset(self):
+        application = self.kwargs.get('application')
+        if application:
+            # count only the crashes of the application, still a single
+            # grouped query over the summaries
+            q = CrashSignature.objects.filter(summaries__crash__applicationName=application)
+            q = q.annotate(num_crashes=Count('summaries'), first_seen=Min('summaries__crash__crashtimestamp'), last_seen=Max('summaries__crash__crashtimestamp'))
+        else:
+            # use the counters maintained on upload
+            q = CrashSignature.objects.filter(count__gt=0)
+            q = q.annotate(num_crashes=F('count'), first_seen=F('firstSeen'), last_seen=F('lastSeen'))
+        return q.order_by('-num_crashes', '-last_seen')
+
+    def get_context_data(self, **kwargs):
+        context = super(CrashSignatureListView, self).get_context_data(**kwargs)
+        context['application'] = self.kwargs.get('application')
+        add_utils_to_context(context)
+        return context
+
+class CrashDumpDetails(LoginRequiredMixin, CrashDumpConditionalMixin, DetailView):
     model = CrashDumpModel
     template_name = 'report.html'
 
+    def get_queryset(self):
+        return CrashDumpModel.objects.select_related('state', 'summary', 'summary__signature')
+
+    def get_validator_data(self):
+        # the overview shows data from the database which changes after the upload
+        ret = super(CrashDumpDetails, self).get_validator_data()
+        # the overview contains a CSRF token, which must not be kept after
+        # the CSRF secret has changed, e.g. after logging in again. The
+        # token is masked differently on each call, so use the secret it
+        # is derived from.
+        get_token(self.request)
+        ret.append(self.request.META.get('CSRF_COOKIE'))
+        ret.append(self.object.state_id)
+        summary = getattr(self.object, 'summary', None)
+        if summary is not None:
+            ret.extend([summary.version, summary.analyzed])
+            if summary.signature is not None:
+                ret.extend([summary.signature.id, summary.signature.count, summary.signature.lastSeen])
+        ret.append(list(CrashDumpLink.objects.filter(crash=self.object.id).values_list('id', flat=True)))
+        ret.append(list(CrashDumpAttachment.objects.filter(crash=self.object.id).values_list('id', flat=True)))
+        project = CrashDumpProject.findByCodename(self.object.productCodeName)
+        ret.append(project.id if project is not None else None)
+        return ret
+
+    def get_validators(self):
+        # the data from the database has no modification time, so the
+        # overview is only validated by the ETag
+        etag, last_modified = super(CrashDumpDetails, self).get_validators()
+        return etag, None
+
     def get_context_data(self, **kwargs):
         start = time.time()
 
@@ -295,7 +515,12 @@ class CrashDumpDetails(LoginRequiredMixin, DetailView):
         context['project'] = project
         context['links'] = links
         context['attachments'] = attachments
-        add_utils_to_context(context, crash=self.object)
+        # the overview only uses the database, the sections of the report
+        # are loaded by the browser when they are opened
+        summary = get_crash_summary(self.object, analyze=False)
+        if summary is None:
+            CrashDumpJob.enqueue(self.object, CrashDumpJob.KIND_ANALYZE)
+        add_utils_to_context(context, crash=self.object, summary=summary, overview=True)
         end = time.time()
         context['dbtime'] = end - start
         return context
@@ -310,7 +535,7 @@ def patch_url(url, params=None):
     url_parts[4] = urlencode(query)
     return urlunparse(url_parts)
 
-def crash_to_issue(request, obj, issue=None):
+def crash_to_issue(request, obj, issue=None, crash_url=None):
     error = None
     proj = None
     if obj is not None:
@@ -323,7 +548,8 @@ def crash_to_issue(request, obj, issue=None):
     else:
         error = 'Unable to find crash %s' % obj.id
     if proj:
-        crash_url = request.build_absolute_uri(obj.url)
+        if crash_url is None:
+            crash_url = request.build_absolute_uri(obj.url)
 
         default_description = """The crash [{crash.uuid}]({crash_url}) has been uploaded by **{crash.reportUserName}**
 from **{crash.reportHostName}** and linked to this ticket.
@@ -357,11 +583,11 @@ application was running as part of {crash.productName} ({crash.productCodeName})
         issue = None
     return issue, proj, error
 
-def crash_get_or_create_issue_link(request, obj, issue):
+def crash_get_or_create_issue_link(request, obj, issue=None, crash_url=None):
     link_obj = None
     error = None
     proj = None
-    issue, proj, error = crash_to_issue(request, obj, issue)
+    issue, proj, error = crash_to_issue(request, obj, issue, crash_url=crash_url)
     if proj:
         if proj.issueTrackerType == CrashDumpProject.GITLAB:
             existing_issue = None
@@ -412,7 +638,7 @@ class CrashDumpDetailsFromCrashId(RedirectView):
         obj = get_object_or_404(CrashDumpModel, crashid=kwargs['crashid'])
         return reverse('crash_details', args=[obj.id] )
 
-class CrashDumpDetailsSub(LoginRequiredMixin, DetailView):
+class CrashDumpDetailsSub(LoginRequiredMixin, CrashDumpConditionalMixin, DetailView):
     model = CrashDumpModel
     template_name = None
 
@@ -427,31 +653,45 @@ class CrashDumpDetailsSub(LoginRequiredMixin, DetailView):
 
     def get_context_data(self, **kwargs):
         context = super(CrashDumpDetailsSub, self).get_context_data(**kwargs)
-        add_utils_to_context(context, crash=self.object)
+        add_utils_to_context(context, crash=self.object, fields=report_page_fields.get(self.page))
         if self.page in ['sysinfo', 'sysinfo_ex',
-                            'fast_protect_version_info', 'exception', 'memory_blocks', 'memory_regions', 'modules', 'threads', 'stackdumps',
+                            'fast_protect_version_info', 'exception', 'memory_blocks', 'memory_regions', 'modules',
                             'file_info' ]:
             pass
+        elif self.page == 'threads':
+            context['thread_rows'] = get_render_model(self.object, context).thread_rows
+        elif self.page == 'stackdumps':
+            context['stackdump_rows'] = get_render_model(self.object, context).stackdump_rows
         elif self.page == 'memory_block':
             block_base = safe_get_as_int(self.param, 0)
-            memory_block = None
-            for b in context['memory_blocks']:
-                if b.base == block_base:
-                    memory_block = b
-                    break
+            xmlreport = context.get('xmlreport')
+            memory_block = xmlreport.memory_block_at(block_base) if xmlreport is not None else None
             memory = memory_block.memory if memory_block is not None else None
-            hexdump = memory.hexdump if memory is not None else None
-            context.update({'memory_block': memory_block, 'memory': memory, 'hexdump': hexdump, 'memory_block_base': block_base })
+            offset = safe_get_as_int(self.kwargs.get('offset') or 0, 0)
+            length = safe_get_as_int(self.kwargs.get('length') or MEMORY_BLOCK_WINDOW_SIZE, MEMORY_BLOCK_WINDOW_SIZE)
+            window = _memory_block_window(self.object, memory_block, offset, length) if memory_block is not None else None
+            context.update({'memory_block': memory_block, 'memory': memory, 'hexdump': window, 'memory_block_base': block_base })
         elif self.page == 'stackdump':
             threadid = safe_get_as_int(self.param, 0)
             stackdump = None
-            if threadid in context['stackdumps']:
-                stackdump = context['stackdumps'][threadid]
-            context.update({'stackdump': stackdump, 'threadid': threadid })
+            stackdumps = report_section(context, 'stackdumps')
+            frame_rows = None
+            if stackdumps is not None and threadid in stackdumps:
+                stackdump = stackdumps[threadid]
+                frame_rows = get_render_model(self.object, context).frame_rows(threadid)
+            context.update({'stackdump': stackdump, 'threadid': threadid, 'frame_rows': frame_rows })
 
         return context
 
-class CrashDumpSysInfo(LoginRequiredMixin, DetailView):
+    def render_to_response(self, context, **response_kwargs):
+        if self.page == 'memory_block' and self.request.GET.get('format') == 'json':
+            window = context['hexdump']
+            if window is None:
+                raise Http404("Memory block not found")
+            return JsonResponse(window)
+        return super(CrashDumpDetailsSub, self).render_to_response(context, **response_kwargs)
+
+class CrashDumpSysInfo(LoginRequiredMixin, CrashDumpConditionalMixin, DetailView):
     model = CrashDumpModel
     template_name = 'sysinfo_report.html'
 
@@ -466,13 +706,13 @@ class CrashDumpSysInfo(LoginRequiredMixin, DetailView):
     def get_context_data(self, **kwargs):
         start = time.time()
         context = super(CrashDumpSysInfo, self).get_context_data(**kwargs)
-        add_utils_to_context(context, crash=self.object)
+        add_utils_to_context(context, crash=self.object, fields=['system_info', 'fast_protect_system_info'])
         if 'xmlreport' in context:
             xmlfile = context['xmlreport']
             context['sysinfo_report'] = None
             if isinstance(xmlfile, XMLReport) or (isinstance(xmlfile, string) and os.path.isfile(xmlfile)):
                 try:
-                    context['sysinfo_report'] = SystemInfoReport(xmlreport=xmlfile)
+                    context['sysinfo_report'] = get_system_info_report(self.object, xmlfile)
                 except SystemInfoReport.SystemInfoReportException as e:
                     context['xmlfile_error'] = str(e)
             else:
@@ -482,7 +722,20 @@ class CrashDumpSysInfo(LoginRequiredMixin, DetailView):
         context['dbtime'] = end - start
         return context
 
-class CrashDumpReport(LoginRequiredMixin, DetailView):
+# file field of the crash for each report type of CrashDumpReport
+_report_type_fields = {
+    'minidumpTextReport': 'minidumpReportTextFile',
+    'minidumpXMLReport': 'minidumpReportXMLFile',
+    'minidumpHTMLReport': 'minidumpReportHTMLFile',
+    'minidump': 'minidumpFile',
+    'coredumpTextReport': 'coredumpReportTextFile',
+    'coredumpXMLReport': 'coredumpReportXMLFile',
+    'coredumpHTMLReport': 'coredumpReportHTMLFile',
+    'coredump': 'coredumpFile',
+    'gfxCaps': 'gfxCapsFile',
+}
+
+class CrashDumpReport(LoginRequiredMixin, CrashDumpConditionalMixin, DetailView):
     model = CrashDumpModel
     template_name = 'crashdumpmodel_report.html'
 
@@ -495,26 +748,18 @@ class CrashDumpReport(LoginRequiredMixin, DetailView):
         add_utils_to_context(context)
         return context
 
+    def _get_filename(self):
+        field = _report_type_fields.get(self.kwargs.get('report_type'))
+        return getattr(self.object, field) if field is not None else None
+
+    def get_validators(self):
+        # downloads are the unchanged file, all other flags render a page
+        if self.kwargs.get('flag') == 'raw':
+            return _file_validators(self.object, self._get_filename())
+        return super(CrashDumpReport, self).get_validators()
+
     def render_to_response(self, context, **response_kwargs):
-        filename = None
-        if context['report_type'] == 'minidumpTextReport':
-            filename = self.object.minidumpReportTextFile
-        elif context['report_type'] == 'minidumpXMLReport':
-            filename = self.object.minidumpReportXMLFile
-        elif context['report_type'] == 'minidumpHTMLReport':
-            filename = self.object.minidumpReportHTMLFile
-        elif context['report_type'] == 'minidump':
-            filename = self.object.minidumpFile
-        elif context['report_type'] == 'coredumpTextReport':
-            filename = self.object.coredumpReportTextFile
-        elif context['report_type'] == 'coredumpXMLReport':
-            filename = self.object.coredumpReportXMLFile
-        elif context['report_type'] == 'coredumpHTMLReport':
-            filename = self.object.coredumpReportHTMLFile
-        elif context['report_type'] == 'coredump':
-            filename = self.object.coredumpFile
-        elif context['report_type'] == 'gfxCaps':
-            filename = self.object.gfxCapsFile
+        filename = self._get_filename()
 
         if context['flag'] == 'raw':
             if filename is None:
@@ -554,7 +799,7 @@ class CrashDumpReport(LoginRequiredMixin, DetailView):
                     item_path = default_storage.path(filename)
 
                 if item_path:
-                    xmlreport = XMLReport(item_path)
+                    xmlreport = get_xml_report(self.object, item_path)
                     for f in xmlreport.fields:
                         context[f] = getattr(xmlreport, f)
                     context['content'] = str(xmlreport.fields)
@@ -603,14 +848,10 @@ def _store_dump_file(crashid, request, name):
     if file:
         force = bool(request.POST.get('force'))
         item_name = 'dumpdata/%s/%s' % (crashid, file.name)
-        if default_storage.exists(item_name):
-            if force:
-                default_storage.delete(item_name)
-                item_path = default_storage.save(item_name, ContentFile(file.read()))
-            else:
-                item_path = default_storage.path(item_name)
+        if default_storage.exists(item_name) and not force:
+            item_path = default_storage.path(item_name)
         else:
-            item_path = default_storage.save(item_name, ContentFile(file.read()))
+            item_path = store_uploaded_file(file, item_name, replace=force)
         ret = True
     else:
         item_name = None
@@ -619,7 +860,12 @@ def _store_dump_file(crashid, request, name):
 def _get_dump_filename(crashobj, filename):
     if not filename:
         return None
-    item_name = 'dumpdata/%s' % (filename)
+    # uploaded files are stored including the dumpdata prefix, migrated
+    # crashes only with <crashid>/<filename>
+    if filename.startswith('dumpdata/'):
+        item_name = filename
+    else:
+        item_name = 'dumpdata/%s' % (filename)
     if default_storage.exists(item_name):
         return default_storage.path(item_name)
     else:
@@ -648,6 +894,8 @@ def submit(request):
     error_message = None
 
     if request.method == 'POST':
+        # stream the dump files to disk, must be set before accessing POST/FILES
+        request.upload_handlers = [CrashDumpUploadHandler(request)]
         useragent = request.META.get('HTTP_USER_AGENT')
         if useragent:
             is_terra3d_crashuploader = True if 'terra3d-crashuploader' in useragent else False
@@ -792,6 +1040,11 @@ def submit(request):
                 return HttpResponse(str(ex), status=500, content_type="text/plain")
 
 
+            # issue linking and report analysis talk to external services and
+            # parse the reports, so both are left to the crashdump_worker for
+            # all clients. The Linked-Tickets header of the response lists
+            # the links which already exist, e.g. of a crash uploaded again.
+            crash_url = request.build_absolute_uri(db_entry.url)
             issue = None
             if ticket_str == 'no':
                 pass
@@ -810,19 +1063,19 @@ def submit(request):
                 issue = []
                 for tkt_id in ticket_ids:
                     issue.append( {'iid': tkt_id} )
-                link_obj, error = crash_get_or_create_issue_link(request, db_entry, issue=issue)
+                CrashDumpJob.enqueue(db_entry, CrashDumpJob.KIND_ISSUE_LINK, crash_url=crash_url, issue=issue)
             elif ticket_str == 'auto':
                 if not links:
-                    link_obj, error = crash_get_or_create_issue_link(request, db_entry, issue=issue)
+                    CrashDumpJob.enqueue(db_entry, CrashDumpJob.KIND_ISSUE_LINK, crash_url=crash_url, issue=issue)
             elif ticket_str == 'new':
-                link_obj, error = crash_get_or_create_issue_link(request, db_entry, issue=issue)
+                CrashDumpJob.enqueue(db_entry, CrashDumpJob.KIND_ISSUE_LINK, crash_url=crash_url, issue=issue)
+            CrashDumpJob.enqueue(db_entry, CrashDumpJob.KIND_ANALYZE)
 
 
         if is_terra3d_crashuploader:
             headers = {}
 
             if result:
-                crash_url = request.build_absolute_uri(db_entry.url)
                 headers['Crash-URL'] = crash_url
                 headers['CrashId'] = db_entry.uuid
 
@@ -105,3 +105,4 @@ register.tag('script_from_qlocale_script_enum', partial(do_tag_function_wrapper,
 register.tag('thread_extra_info', partial(do_tag_function_wrapper, thread_extra_info))
 register.tag('format_thread', partial(do_tag_function_wrapper, format_thread))
 register.tag('format_stack_frame', partial(do_tag_function_wrapper, format_stack_frame))
+register.tag('format_address_module', partial(do_tag_function_wrapper2, format_address_module))
@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+"""
+Compares the extraction of the entity fields of an XML report by one XPath
+evaluation per field and attribute (the extraction XMLReport used before)
+with the single pass over the children done by XMLReport._set_fields.
+
+    python3 benchmarks/bench_extract.py [--report file.xml] [--runs N]
+
+Without --report a synthetic report is generated, see gen_report.py for
+the options controlling its size. Both extractions must yield the same
+values, the script fails otherwise.
+"""
+
+import os
+import sys
+import time
+import base64
+import argparse
+import tempfile
+from lxml import etree
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from crashdump.xmlreport import XMLReport, HexDumpMemoryBlock
+import gen_report
+
+def xpath_node_value(node, child, default_value=None):
+    # field extraction of XMLReport._get_node_value before the single pass
+    # extraction
+    r = node.xpath(child + '/@type')
+    data_type = r[0] if r else None
+    if data_type == 'QStringList':
+        ret = [str(c) for c in node.xpath(child + '/item/text()')]
+    elif data_type == 'QVariantMap':
+        ret = {}
+        for item in node.xpath(child + '/item'):
+            r = item.xpath('@key')
+            item_key = str(r[0]) if r else None
+            r = item.xpath('@type')
+            item_data_type = str(r[0]) if r else None
+            r = item.xpath('text()')
+            item_value = r[0] if r else None
+            ret[item_key] = XMLReport._value_convert(item_value, item_data_type)
+    elif data_type == 'QByteArray':
+        r = node.xpath(child + '/@encoding-type')
+        encoding_type = r[0] if r else None
+        r = node.xpath(child + '/text()')
+        if r:
+            if encoding_type == 'base64':
+                ret = HexDumpMemoryBlock(base64.b64decode(r[0]))
+            else:
+                ret = HexDumpMemoryBlock(str(r[0]))
+        else:
+            ret = default_value
+    else:
+        r = node.xpath(child + '/text()')
+        ret = XMLReport._value_convert(r[0], data_type) if r else default_value
+    return ret
+
+class _Values(object):
+    # receives the fields extracted by XMLReport._set_fields
+    _owner = None
+
+def _plain(value):
+    if isinstance(value, HexDumpMemoryBlock):
+        return bytes(value.raw)
+    return value
+
+def extract_xpath(items, fields):
+    ret = []
+    for item in items:
+        values = {}
+        for f in fields:
+            f_xml, f_prop = f if isinstance(f, tuple) else (f, f)
+            values[f_prop] = xpath_node_value(item, f_xml)
+        ret.append(values)
+    return ret
+
+def extract_single_pass(items, fields):
+    ret = []
+    for item in items:
+        obj = _Values()
+        XMLReport._set_fields(obj, item, fields)
+        ret.append(obj.__dict__)
+    return ret
+
+# section, XPath of the entity elements, fields
+SECTIONS = [
+    ('modules', '/crash_dump/modules/module', XMLReport._module_fields),
+    ('threads', '/crash_dump/threads/thread', XMLReport._thread_fields),
+    ('memory_regions', '/crash_dump/memory_info/memory', XMLReport._memory_region_fields),
+    ('memory_blocks', '/crash_dump/memory_blocks/memory_block', XMLReport._memory_block_fields),
+    ('stackdumps', '/crash_dump/stackdumps/stackdump/frame', XMLReport._stack_frame_fields),
+]
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark the field extraction of XMLReport')
+    parser.add_argument('--report', help='XML report to use instead of a generated one')
+    parser.add_argument('--runs', type=int, default=5, help='number of runs, the average is shown')
+    gen_report.add_arguments(parser)
+    args = parser.parse_args()
+
+    tmpdir = None
+    filename = args.report
+    if filename is None:
+        tmpdir = tempfile.mkdtemp()
+        filename = os.path.join(tmpdir, 'report.xml')
+        gen_report.generate_from_args(filename, args)
+    try:
+        tree = etree.parse(filename)
+        print('%s: %.1f MB' % (filename, os.path.getsize(filename) / 1e6))
+        print('%-16s %8s %12s %12s %8s' % ('section', 'entities', 'xpath', 'single pass', 'speed-up'))
+        total_xpath = total_single = 0.0
+        for (name, path, fields) in SECTIONS:
+            items = tree.xpath(path)
+            t_xpath = t_single = 0.0
+            for i in range(args.runs):
+                start = time.perf_counter()
+                a = extract_xpath(items, fields)
+                t_xpath += time.perf_counter() - start
+                start = time.perf_counter()
+                b = extract_single_pass(items, fields)
+                t_single += time.perf_counter() - start
+            for (x, y) in zip(a, b):
+                x = dict([(k, _plain(v)) for (k, v) in x.items()])
+                y = dict([(k, _plain(v)) for (k, v) in y.items()])
+                if x != y:
+                    print('Different values in %s: %r != %r' % (name, x, y))
+                    return 1
+            t_xpath /= args.runs
+            t_single /= args.runs
+            total_xpath += t_xpath
+            total_single += t_single
+            print('%-16s %8i %9.1f ms %9.1f ms %7.1fx' % (name, len(items), t_xpath * 1000, t_single * 1000, t_xpath / t_single if t_single else 0))
+        print('%-16s %8s %9.1f ms %9.1f ms %7.1fx' % ('total', '', total_xpath * 1000, total_single * 1000, total_xpath / total_single if total_single else 0))
+    finally:
+        if tmpdir is not None:
+            os.unlink(filename)
+            os.rmdir(tmpdir)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
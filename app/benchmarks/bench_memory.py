@@ -0,0 +1,145 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+"""
+Compares the memory used by the loaded sections of an XML report with the
+fixed-layout entity classes and interned strings of XMLReport against
+entities storing their fields in a __dict__ per instance without interning
+(the entity model XMLReport used before).
+
+    python3 benchmarks/bench_memory.py [--report file.xml] [--runs N]
+
+Without --report a synthetic report is generated, see gen_report.py for
+the options controlling its size, e.g. --threads 1000 --frames 60 for a
+large report. Each model is measured in a fresh interpreter, once for the
+growth of the resident set size (RSS) and once for the memory allocated by
+Python objects as traced by tracemalloc. Both models must load the same
+number of entities, the script fails otherwise.
+"""
+
+import os
+import gc
+import sys
+import json
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+import gen_report
+
+# sections loaded by the benchmark; the memory blocks are left out since
+# their data is the same in both models
+SECTIONS = ['modules', 'threads', 'memory_regions', 'stackdumps']
+
+def _rss():
+    # current resident set size in bytes
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+def _release_memory():
+    gc.collect()
+    # return the memory freed by lxml to the system, so it is not counted
+    try:
+        import ctypes
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+def _use_dict_entities(xmlreport):
+    # replace the entity classes by twins without __slots__, which store
+    # their fields in the __dict__, and turn off the interning of strings
+    for name in dir(xmlreport.XMLReport):
+        cls = getattr(xmlreport.XMLReport, name)
+        if not isinstance(cls, xmlreport._EntityType) or '__slots__' not in cls.__dict__ or cls is xmlreport.XMLReport.XMLReportEntity:
+            continue
+        namespace = dict([(k, v) for (k, v) in cls.__dict__.items() if k not in cls.__slots__ and k not in ('__slots__', '__dict__', '__weakref__')])
+        twin = xmlreport._EntityType(cls.__name__, cls.__bases__, namespace)
+        twin.__qualname__ = cls.__qualname__
+        setattr(xmlreport.XMLReport, name, twin)
+    xmlreport.intern = lambda s: s
+
+def _count_entities(report):
+    ret = {}
+    for name in SECTIONS:
+        value = getattr(report, name)
+        if name == 'stackdumps':
+            ret[name] = sum([len(dump.callstack) for dump in value])
+        else:
+            ret[name] = len(value)
+    return ret
+
+def measure(filename, model, trace):
+    """
+    Loads the sections of the given report with the given entity model and
+    returns the memory used by them.
+    """
+    import crashdump.xmlreport as xmlreport
+    if model == 'dict':
+        _use_dict_entities(xmlreport)
+    if trace:
+        import tracemalloc
+        tracemalloc.start()
+    _release_memory()
+    before = tracemalloc.get_traced_memory()[0] if trace else _rss()
+    report = xmlreport.XMLReport(filename, fields=SECTIONS, use_cache=False)
+    counts = _count_entities(report)
+    # the XML elements of the sections have been dropped after extraction
+    report._xml = None
+    _release_memory()
+    after = tracemalloc.get_traced_memory()[0] if trace else _rss()
+    return {'size': after - before, 'entities': counts}
+
+def run_measure(filename, model, trace):
+    cmd = [sys.executable, os.path.abspath(__file__), '--measure', model, '--report', filename]
+    if trace:
+        cmd.append('--trace')
+    return json.loads(subprocess.check_output(cmd))
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark the memory used by the entities of XMLReport')
+    parser.add_argument('--report', help='XML report to use instead of a generated one')
+    parser.add_argument('--runs', type=int, default=3, help='number of runs, the minimum is shown')
+    parser.add_argument('--measure', choices=['slots', 'dict'], help=argparse.SUPPRESS)
+    parser.add_argument('--trace', action='store_true', help=argparse.SUPPRESS)
+    gen_report.add_arguments(parser)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.report, args.measure, args.trace)))
+        return 0
+
+    tmpdir = None
+    filename = args.report
+    if filename is None:
+        tmpdir = tempfile.mkdtemp()
+        filename = os.path.join(tmpdir, 'report.xml')
+        gen_report.generate_from_args(filename, args)
+    try:
+        print('%s: %.1f MB' % (filename, os.path.getsize(filename) / 1e6))
+        results = {}
+        entities = None
+        for model in ('dict', 'slots'):
+            for trace in (False, True):
+                values = [run_measure(filename, model, trace) for i in range(args.runs)]
+                results[(model, trace)] = min([v['size'] for v in values])
+                counts = values[0]['entities']
+                if model == 'slots' and counts != entities:
+                    print('Different entities loaded: %r != %r' % (entities, counts))
+                    return 1
+                entities = counts
+        print('entities: %s' % ', '.join(['%s=%i' % (k, entities[k]) for k in SECTIONS]))
+        print('%-10s %12s %12s %10s' % ('', '__dict__', '__slots__', 'reduction'))
+        for (label, trace) in (('RSS', False), ('traced', True)):
+            a = results[('dict', trace)]
+            b = results[('slots', trace)]
+            print('%-10s %9.1f MB %9.1f MB %9.0f%%' % (label, a / 1e6, b / 1e6, (1 - float(b) / a) * 100 if a else 0))
+    finally:
+        if tmpdir is not None:
+            os.unlink(filename)
+            os.rmdir(tmpdir)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,162 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+"""
+Compares the rendering of the stack dump and thread pages of the crash
+details with the report sections passed to the page as proxy objects
+forwarding each access to the section (the ProxyObject XMLReport used to
+have) and as LazyReportSection, which hands the real section to the page.
+The rows of the pages are formatted by a new ReportRenderModel on each
+rendering; the last column shows the rendering with the rows of a cached
+model, as done for all but the first request of a crash.
+
+    python3 benchmarks/bench_render.py [--report file.xml] [--runs N]
+
+Without --report a synthetic report is generated, see gen_report.py for
+the options controlling its size, e.g. --threads 400 --frames 120 for a
+report with thousands of frames. All sections are loaded before the
+measurement, so only the rendering is timed. stackdump.html is rendered
+once for each stack dump of the report. All variants must render the same
+output, the script fails otherwise.
+"""
+
+import os
+import sys
+import time
+import hashlib
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'arsoft.web.crashupload.settings')
+import django
+django.setup()
+from django.template import loader
+from crashdump.xmlreport import XMLReport
+from crashdump.utils import add_report_sections, report_section
+from arsoft.web.crashupload.rendermodel import ReportRenderModel
+from arsoft.web.crashupload.views import add_utils_to_context
+import gen_report
+
+class ProxySection(object):
+    # forwards every access to the section, as ProxyObject did
+    def __init__(self, report, field_name):
+        object.__setattr__(self, '_report', report)
+        object.__setattr__(self, '_field_name', field_name)
+        object.__setattr__(self, '_real_object', None)
+
+    def _real(self):
+        if self._real_object is None:
+            object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
+        return self._real_object
+
+    def __getattr__(self, key):
+        obj = self._real()
+        return getattr(obj, key) if obj is not None else None
+
+    def __iter__(self):
+        obj = self._real()
+        return iter(obj if obj is not None else [])
+
+    def __bool__(self):
+        return bool(self._real())
+
+    def __len__(self):
+        obj = self._real()
+        return len(obj) if hasattr(obj, '__len__') else 0
+
+    def __contains__(self, key):
+        obj = self._real()
+        return obj is not None and key in obj
+
+    def __getitem__(self, key):
+        return self._real()[key]
+
+def make_context(report, variant):
+    ret = {}
+    add_utils_to_context(ret)
+    ret['bits'] = 64 if report.is_64_bit else 32
+    if variant == 'proxy':
+        for f in report.fields:
+            ret[f] = ProxySection(report, f)
+        ret['module_index'] = ProxySection(report, 'module_index')
+    else:
+        add_report_sections(ret, report)
+    return ret
+
+def make_model(context):
+    return ReportRenderModel(context['threads'], context['stackdumps'], context['module_index'], context['bits'])
+
+def render(report, template, variant, model=None):
+    # fills the context like CrashDumpDetailsSub, the render model is built
+    # from the context unless a cached one is given
+    h = hashlib.md5()
+    context = make_context(report, variant)
+    if model is None:
+        model = make_model(context)
+    name = template.template.name
+    if name == 'stackdump.html':
+        stackdumps = report_section(context, 'stackdumps')
+        for row in model.stackdump_rows:
+            threadid = row['threadid']
+            page_context = dict(context)
+            page_context.update({'stackdump': stackdumps[threadid], 'threadid': threadid, 'frame_rows': model.frame_rows(threadid)})
+            h.update(template.render(page_context).encode('utf-8'))
+    else:
+        if name == 'threads.html':
+            context['thread_rows'] = model.thread_rows
+        else:
+            context['stackdump_rows'] = model.stackdump_rows
+        h.update(template.render(context).encode('utf-8'))
+    return h.hexdigest()
+
+VARIANTS = [('proxy', 'ProxyObject'), ('lazy', 'LazyReportSection'), ('cached', 'cached model')]
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmark the rendering of the stack dump pages')
+    parser.add_argument('--report', help='XML report to use instead of a generated one')
+    parser.add_argument('--runs', type=int, default=5, help='number of runs, the best time is shown')
+    gen_report.add_arguments(parser)
+    args = parser.parse_args()
+
+    tmpdir = None
+    filename = args.report
+    if filename is None:
+        tmpdir = tempfile.mkdtemp()
+        filename = os.path.join(tmpdir, 'report.xml')
+        gen_report.generate_from_args(filename, args)
+    try:
+        report = XMLReport(filename, use_cache=False)
+        for f in report.fields:
+            getattr(report, f)
+        report.module_index
+        frames = sum([len(dump.callstack or []) for dump in report.stackdumps])
+        print('%s: %.1f MB, %i threads, %i stack dumps, %i frames' % (filename, os.path.getsize(filename) / 1e6,
+                                                                      len(report.threads), len(report.stackdumps), frames))
+        print('%-16s %18s %18s %18s' % tuple(['template'] + [label for (variant, label) in VARIANTS]))
+        for name in ['stackdumps.html', 'threads.html', 'stackdump.html']:
+            template = loader.get_template(name)
+            best = {}
+            output = {}
+            for i in range(args.runs):
+                for (variant, label) in VARIANTS:
+                    model = make_model(make_context(report, 'lazy')) if variant == 'cached' else None
+                    if model is not None:
+                        render(report, template, variant, model)
+                    start = time.perf_counter()
+                    output[variant] = render(report, template, variant, model)
+                    elapsed = time.perf_counter() - start
+                    best[variant] = min(best.get(variant, elapsed), elapsed)
+            if len(set(output.values())) != 1:
+                print('Different output of %s' % name)
+                return 1
+            print('%-16s %15.1f ms %15.1f ms %15.1f ms' % (name, best['proxy'] * 1000, best['lazy'] * 1000, best['cached'] * 1000))
+    finally:
+        if tmpdir is not None:
+            os.unlink(filename)
+            os.rmdir(tmpdir)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
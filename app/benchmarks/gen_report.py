@@ -0,0 +1,205 @@
+#!/usr/bin/python3
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+"""
+Generates a synthetic crash report XML of the layout written by the crash
+handler, used by the benchmarks of the report parser and of the detail
+pages. The content is deterministic for the given parameters.
+"""
+
+import sys
+import base64
+import random
+import argparse
+
+def _field(out, name, data_type, value):
+    out.append('<%s type="%s">%s</%s>' % (name, data_type, value, name))
+
+def generate(filename, threads=200, frames=30, modules=300, regions=2000, blocks=60, block_size=16384, seed=1):
+    rnd = random.Random(seed)
+    out = []
+    f = lambda name, data_type, value: _field(out, name, data_type, value)
+    out.append('<?xml version="1.0" encoding="UTF-8"?>\n<crash_dump>')
+    f('uuid', 'uuid', '12345678-1234-1234-1234-123456789abc')
+    f('crash_timestamp', 'QDateTime', '2024-01-02 03:04:05')
+    f('report_fqdn', 'QString', 'reporter.example.com')
+    f('report_username', 'QString', 'bob')
+    f('application', 'QString', 'C:/Program Files/App/app.exe')
+    f('command_line', 'QString', 'app.exe -x')
+    out.append('<symbol_directories type="QStringList"><item>C:/sym</item><item>D:/sym</item></symbol_directories>')
+    out.append('<environment type="QVariantMap"><item key="PATH" type="QString">C:/bin;D:/bin</item><item key="N" type="int">5</item></environment>')
+
+    out.append('<system_info>')
+    f('platform_type', 'QString', 'Windows NT')
+    f('platform_type_id', 'int', '2')
+    f('cpu_type', 'QString', 'AMD64')
+    f('cpu_type_id', 'int', '9')
+    f('cpu_name', 'QString', 'Intel')
+    f('number_of_cpus', 'int', '8')
+    f('os_version', 'QString', '10.0')
+    f('os_version_number', 'uint', 'a000000000000')
+    f('os_build_number', 'uint', '4a61')
+    out.append('</system_info>')
+
+    out.append('<file_info><log><message>')
+    f('time', 'QDateTime', '2024-01-02 03:04:06')
+    f('text', 'QString', 'loaded')
+    out.append('</message></log></file_info>')
+
+    tids = [0x1000 + i * 4 for i in range(threads)]
+    exception_tid = tids[min(3, threads - 1)]
+    out.append('<exception>')
+    f('threadid', 'uint', '%x' % exception_tid)
+    f('code', 'uint', 'c0000005')
+    f('address', 'uint', '7ff712345678')
+    f('flags', 'uint', '0')
+    f('numparams', 'int', '2')
+    f('param0', 'uint', '1')
+    f('param1', 'uint', 'deadbeef')
+    f('param2', 'uint', '0')
+    f('param3', 'uint', '0')
+    out.append('</exception>')
+
+    out.append('<modules>')
+    for i in range(modules):
+        out.append('<module>')
+        f('base', 'uint', '%x' % (0x7ff700000000 + i * 0x100000))
+        f('size', 'uint', '80000')
+        f('timestamp', 'QDateTime', '2023-05-06 07:08:09')
+        f('file_version_number', 'uint', '%x' % (1 << 48 | 2 << 32 | 3 << 16 | i))
+        f('product_version_number', 'uint', '%x' % (1 << 48))
+        f('file_version', 'QString', '1.2.3.%d' % i)
+        f('product_version', 'QString', '1.0.0.0')
+        f('name', 'QString', 'C:/Windows/System32/mod%d.dll' % i)
+        f('symbol_file', 'QString', 'mod%d.pdb' % i)
+        f('symbol_type_number', 'int', '3')
+        f('flags', 'uint', '0')
+        out.append('</module>')
+    out.append('</modules>')
+
+    out.append('<threads>')
+    for n, tid in enumerate(tids):
+        out.append('<thread>')
+        f('id', 'uint', '%x' % tid)
+        f('exception', 'bool', 'true' if tid == exception_tid else 'false')
+        f('name', 'QString', 'worker%d' % n)
+        f('memory', 'uint', '%x' % (0x10000000 + n * 0x100000))
+        f('start_addr', 'uint', '7ff700001000')
+        f('create_time', 'QDateTime', '2024-01-02 03:04:05')
+        f('kernel_time', 'int', '12')
+        f('user_time', 'int', '34')
+        f('stack_addr', 'uint', '%x' % (0x10000000 + n * 0x100000))
+        f('teb', 'uint', '%x' % (0x20000000 + n * 0x2000))
+        f('priority', 'int', '0')
+        f('suspend_count', 'int', '0')
+        out.append('</thread>')
+    out.append('</threads>')
+
+    out.append('<memory_info>')
+    for i in range(regions):
+        base = 0x10000000 + (regions - i) * 0x10000
+        out.append('<memory>')
+        f('base_addr', 'uint', '%x' % base)
+        f('size', 'uint', '10000')
+        f('alloc_base', 'uint', '%x' % base)
+        f('alloc_prot', 'uint', '4')
+        f('type', 'uint', '20000')
+        f('protect', 'uint', '4')
+        f('state', 'uint', '1000')
+        if i % 50 == 0:
+            out.append('<usage>')
+            f('threadid', 'uint', '%x' % tids[i % threads])
+            f('usagetype', 'int', '1')
+            out.append('</usage>')
+        out.append('</memory>')
+    out.append('</memory_info>')
+
+    out.append('<memory_blocks>')
+    for i in range(blocks):
+        data = bytes(rnd.getrandbits(8) for _ in range(block_size))
+        out.append('<memory_block>')
+        f('num', 'int', str(i))
+        f('base', 'uint', '%x' % (0x10000000 + (blocks - i) * 0x100000))
+        f('size', 'uint', '%x' % block_size)
+        out.append('<memory type="QByteArray" encoding-type="base64">%s</memory>' % base64.b64encode(data).decode('ascii'))
+        out.append('</memory_block>')
+    out.append('</memory_blocks>')
+
+    out.append('<stackdumps>')
+    for n, tid in enumerate(tids):
+        for simplified in (False, True):
+            if simplified and tid != exception_tid:
+                continue
+            out.append('<stackdump threadid="0x%x" simplified="%s" exception="%s">' % (tid, 'true' if simplified else 'false', 'true' if tid == exception_tid else 'false'))
+            for k in range(frames if not simplified else min(5, frames)):
+                out.append('<frame>')
+                f('num', 'int', str(k))
+                f('addr', 'uint', '%x' % (0x7ff700001000 + k * 0x10 + n))
+                f('retaddr', 'uint', '%x' % (0x7ff700001000 + k))
+                f('param0', 'uint', '0')
+                f('param1', 'uint', '1')
+                f('param2', 'uint', '2')
+                f('param3', 'uint', '3')
+                f('infosrc', 'int', '1')
+                f('trust_level', 'int', '2')
+                f('module', 'QString', 'mod%d.dll' % (k % 7))
+                f('module_base', 'uint', '%x' % (0x7ff700000000 + (k % 7) * 0x100000))
+                f('function', 'QString', 'ns::Class%d::func%d(int, char const*)' % (k % 5, k))
+                f('funcoff', 'uint', '%x' % (k * 3 + 0x10 + n))
+                f('source', 'QString', 'C:/src/file%d.cpp' % k)
+                f('line', 'int', str(100 + k))
+                f('lineoff', 'int', '4')
+                out.append('</frame>')
+            out.append('</stackdump>')
+    out.append('</stackdumps>')
+
+    out.append('<simplified_info>')
+    f('threadid', 'uint', '%x' % exception_tid)
+    out.append('<missing_debug_symbols type="QStringList"><item>modx.dll</item></missing_debug_symbols>')
+    out.append('<first_useful_modules type="QStringList"><item>mod0.dll</item><item>mod1.dll</item></first_useful_modules>')
+    out.append('<first_useful_functions type="QStringList"><item>ns::Class0::func0(int, char const*)</item><item>ns::Class1::func1(int, char const*)</item></first_useful_functions>')
+    out.append('</simplified_info>')
+
+    out.append('<fast_protect_version_info>')
+    f('product_name', 'QString', 'App')
+    f('product_code_name', 'QString', 'app')
+    f('product_version', 'QString', '1.2.3')
+    f('thread_name_tls_slot', 'int', '7')
+    out.append('</fast_protect_version_info>')
+
+    out.append('<fast_protect_system_info>')
+    f('hostname', 'QString', 'host')
+    f('fqdn', 'QString', 'host.example.com')
+    f('username', 'QString', 'alice')
+    f('cpu_name', 'QString', 'Intel')
+    f('num_logical_cpus', 'int', '8')
+    out.append('<rawdata type="QByteArray" encoding-type="base64">%s</rawdata>' % base64.b64encode(b'[System]\nMachineType=PC\n').decode('ascii'))
+    out.append('</fast_protect_system_info>')
+    out.append('</crash_dump>')
+
+    with open(filename, 'w') as f:
+        f.write('\n'.join(out))
+
+def add_arguments(parser):
+    """
+    Adds the options controlling the size of the generated report to the
+    given argument parser.
+    """
+    parser.add_argument('--threads', type=int, default=200, help='number of threads with a stack dump')
+    parser.add_argument('--frames', type=int, default=30, help='number of frames per stack dump')
+    parser.add_argument('--modules', type=int, default=300, help='number of modules')
+    parser.add_argument('--regions', type=int, default=2000, help='number of memory regions')
+    parser.add_argument('--blocks', type=int, default=60, help='number of memory blocks')
+    parser.add_argument('--block-size', dest='block_size', type=int, default=16384, help='size of each memory block in bytes')
+
+def generate_from_args(filename, args):
+    generate(filename, threads=args.threads, frames=args.frames, modules=args.modules,
+             regions=args.regions, blocks=args.blocks, block_size=args.block_size)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='generate a synthetic crash report XML')
+    parser.add_argument('filename', help='output file')
+    add_arguments(parser)
+    args = parser.parse_args()
+    generate_from_args(args.filename, args)
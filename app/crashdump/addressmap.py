@@ -0,0 +1,123 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+from bisect import bisect_right
+from heapq import heappush, heappop
+
+class AddressMap(object):
+    """
+    Sorted map of address ranges [base, end) to arbitrary objects with
+    O(log n) lookup of the range containing an address. Ranges may overlap
+    or be nested (memory regions and memory lists of a dump do), an address
+    inside several ranges is found in the one given first, like a linear
+    scan over the items would.
+    """
+    def __init__(self, items=None):
+        self._bases = []
+        self._ends = []
+        self._objects = []
+        # highest end of all ranges up to each index, an address at or
+        # above it is not contained in that or any preceding range
+        self._max_ends = []
+        # the ranges split into disjoint segments starting at each of
+        # _segment_bases, each with the index of the range found for the
+        # addresses in the segment or -1 for a gap
+        self._segment_bases = []
+        self._segment_indices = []
+        if items:
+            ordered = sorted(enumerate(items), key=lambda item: (item[1][0], item[0]))
+            max_end = None
+            for (num, (base, end, obj)) in ordered:
+                self._bases.append(base)
+                self._ends.append(end)
+                self._objects.append(obj)
+                max_end = end if max_end is None or end > max_end else max_end
+                self._max_ends.append(max_end)
+            self._build_segments([num for (num, item) in ordered])
+
+    def _build_segments(self, item_numbers):
+        # sweep over all range boundaries keeping the ranges covering the
+        # current segment in a heap ordered by their position in the items
+        boundaries = sorted(set(self._bases) | set(self._ends))
+        active = []
+        idx = 0
+        for addr in boundaries:
+            while idx < len(self._bases) and self._bases[idx] <= addr:
+                heappush(active, (item_numbers[idx], idx))
+                idx += 1
+            while active and self._ends[active[0][1]] <= addr:
+                heappop(active)
+            found = active[0][1] if active else -1
+            if not self._segment_indices or self._segment_indices[-1] != found:
+                self._segment_bases.append(addr)
+                self._segment_indices.append(found)
+
+    def __len__(self):
+        return len(self._objects)
+
+    def __iter__(self):
+        return iter(self._objects)
+
+    def _index(self, addr):
+        idx = bisect_right(self._segment_bases, addr) - 1
+        return self._segment_indices[idx] if idx >= 0 else -1
+
+    def find(self, addr, default=None):
+        """
+        Returns the object of the range containing addr.
+        """
+        if addr is None:
+            return default
+        idx = self._index(addr)
+        return self._objects[idx] if idx >= 0 else default
+
+    def __contains__(self, addr):
+        return addr is not None and self._index(addr) >= 0
+
+    def span(self):
+        """
+        Returns the lowest base and the highest end of all ranges or None.
+        """
+        if not self._bases:
+            return None
+        return (self._bases[0], self._max_ends[-1])
+
+    def overlapping(self, start, end):
+        """
+        Returns the objects of all ranges overlapping [start, end) ordered
+        by their base address. Takes O(log n) plus the number of ranges
+        starting between the first overlapping range and end, which
+        includes the ranges nested in a longer one that end before start.
+        """
+        ret = []
+        # first range which may reach beyond start
+        idx = bisect_right(self._max_ends, start)
+        while idx < len(self._bases) and self._bases[idx] < end:
+            if self._ends[idx] > start:
+                ret.append(self._objects[idx])
+            idx += 1
+        return ret
+
+class ModuleIndex(AddressMap):
+    """
+    Map of the address ranges of the loaded modules to the modules, each
+    module needs a base and a size attribute.
+    """
+    def __init__(self, modules=None):
+        items = []
+        if modules:
+            for m in modules:
+                if m.base is not None and m.size:
+                    items.append( (m.base, m.base + m.size, m) )
+        AddressMap.__init__(self, items)
+
+    def resolve(self, addr):
+        """
+        Returns the module containing addr and the offset of addr within
+        the module or (None, None).
+        """
+        m = self.find(addr)
+        if m is None:
+            return (None, None)
+        return (m, addr - m.base)
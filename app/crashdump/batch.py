@@ -0,0 +1,196 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import os
+import sys
+import json
+import time
+from datetime import datetime
+from concurrent.futures import ProcessPoolExecutor
+
+from crashdump.xmlreport import XMLReport
+from crashdump.minidump import MiniDump, MiniDumpWrapper
+from crashdump.signature import report_signature
+
+# increment when the summary lines get new or changed data, files with an
+# older summary are parsed again even if they are unchanged
+BATCH_VERSION = 1
+# number of files handed to a worker process at once
+BATCH_CHUNK_SIZE = 16
+
+_summary_system_info_fields = ['platform_type', 'cpu_type', 'cpu_name', 'cpu_vendor', 'number_of_cpus',
+                               'os_version', 'os_version_info', 'distribution_id', 'distribution_release']
+_summary_module_fields = ['name', 'base', 'size', 'file_version', 'product_version']
+
+def _json_value(value):
+    if isinstance(value, bytes):
+        return value.rstrip(b'\0').decode('utf8', 'replace')
+    elif isinstance(value, datetime):
+        return value.isoformat()
+    elif value is None or isinstance(value, (int, float, bool)):
+        return value
+    return str(value)
+
+def _entity_dict(entity, fields):
+    return dict([(f, _json_value(getattr(entity, f, None))) for f in fields])
+
+def find_report_files(root):
+    """
+    Returns the sorted list of (crashid, filename) of all crashes below the
+    given dumpdata directory. The XML report is used if a crash has one,
+    otherwise the minidump.
+    """
+    ret = []
+    for (dirpath, dirnames, filenames) in os.walk(root):
+        # skip the upload staging directory
+        dirnames[:] = sorted([d for d in dirnames if not d.startswith('.')])
+        xmlfiles = sorted([f for f in filenames if f.endswith('.xml')])
+        minidumpfiles = sorted([f for f in filenames if f.endswith('.dmp')])
+        crashid = os.path.basename(dirpath)
+        if xmlfiles:
+            ret.append( (crashid, os.path.join(dirpath, xmlfiles[0])) )
+        elif minidumpfiles:
+            ret.append( (crashid, os.path.join(dirpath, minidumpfiles[0])) )
+    return ret
+
+def summarize_report(report):
+    """
+    Returns a dict with the signature, exception, modules and system info of
+    the given XMLReport or MiniDumpWrapper.
+    """
+    ret = {}
+    ret['signature'] = report_signature(report)
+    exception = report.exception
+    if exception is not None:
+        try:
+            name = exception.name
+        except (TypeError, ValueError):
+            name = None
+        ret['exception'] = {'threadid': exception.threadid, 'code': exception.code, 'address': exception.address, 'name': name}
+    else:
+        ret['exception'] = None
+    ret['assertion'] = report.assertion is not None
+    ret['modules'] = [_entity_dict(m, _summary_module_fields) for m in report.modules] if report.modules else []
+    system_info = report.system_info
+    ret['system_info'] = _entity_dict(system_info, _summary_system_info_fields) if system_info is not None else None
+    ret['is_64_bit'] = report.is_64_bit
+    return ret
+
+def analyze_file(item):
+    """
+    Parse a single report file and returns its summary line. Runs in the
+    worker processes, so all errors are part of the returned dict.
+    """
+    crashid, filename, size, mtime = item
+    ret = {'crashid': crashid, 'file': filename, 'size': size, 'mtime': mtime, 'version': BATCH_VERSION, 'error': None}
+    start = time.time()
+    try:
+        if filename.endswith('.xml'):
+            ret['type'] = 'xml'
+            ret.update(summarize_report(XMLReport(filename)))
+        else:
+            ret['type'] = 'minidump'
+            md = MiniDump(filename)
+            try:
+                wrapper = MiniDumpWrapper(md)
+                ret.update(summarize_report(wrapper))
+                if wrapper.errors:
+                    ret['error'] = '; '.join(['%s: %s' % item for item in sorted(wrapper.errors.items())])
+            finally:
+                md.close()
+    except XMLReport.XMLReportException as e:
+        ret['error'] = str(e)
+    except Exception as e:
+        ret['error'] = '%s: %s' % (e.__class__.__name__, e)
+    ret['parse_time'] = time.time() - start
+    return ret
+
+def load_summaries(filename):
+    """
+    Returns a dict with the summary lines of a previous run by file name.
+    """
+    ret = {}
+    try:
+        f = open(filename, 'r')
+    except IOError:
+        return ret
+    with f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if entry.get('version') == BATCH_VERSION and 'file' in entry:
+                ret[entry['file']] = entry
+    return ret
+
+def run_batch(root, output=None, jobs=None, force=False, verbose=False, log=sys.stderr):
+    """
+    Write one JSON summary line per crash below root to output (stdout if
+    not given). Files whose size and modification time did not change since
+    the previous run written to the same output are not parsed again.
+    Returns a tuple of the number of parsed, skipped and failed files.
+    """
+    previous = load_summaries(output) if output and not force else {}
+    todo = []
+    items = []
+    for (crashid, filename) in find_report_files(root):
+        try:
+            st = os.stat(filename)
+        except OSError:
+            continue
+        item = (crashid, filename, st.st_size, st.st_mtime_ns)
+        old = previous.get(filename)
+        if old is not None and old.get('size') == st.st_size and old.get('mtime') == st.st_mtime_ns:
+            items.append(old)
+        else:
+            items.append(None)
+            todo.append(item)
+
+    num_parsed = 0
+    num_errors = 0
+    start = time.time()
+    out = open(output + '.tmp', 'w') if output else sys.stdout
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs != 1 else None
+    try:
+        results = executor.map(analyze_file, todo, chunksize=BATCH_CHUNK_SIZE) if executor else map(analyze_file, todo)
+        for entry in items:
+            if entry is None:
+                entry = next(results)
+                num_parsed += 1
+                if entry['error']:
+                    num_errors += 1
+                    log.write('%s: %s\n' % (entry['file'], entry['error']))
+                if verbose:
+                    log.write('%s: %.3fs\n' % (entry['file'], entry['parse_time']))
+            out.write(json.dumps(entry, sort_keys=True) + '\n')
+    finally:
+        if executor:
+            executor.shutdown()
+        if output:
+            out.close()
+    if output:
+        os.replace(output + '.tmp', output)
+    num_skipped = len(items) - num_parsed
+    log.write('Parsed %i files (%i unchanged, %i with errors) in %.1fs\n' % (num_parsed, num_skipped, num_errors, time.time() - start))
+    return num_parsed, num_skipped, num_errors
+
+def main(argv=None):
+    import argparse
+    parser = argparse.ArgumentParser(description='Write a JSON summary line for each crash of a dumpdata directory')
+    parser.add_argument('-v', '--verbose', dest='verbose', action='store_true', help='print the parse time of each file.')
+    parser.add_argument('-j', '--jobs', dest='jobs', type=int, default=None, help='number of worker processes (default: number of CPUs).')
+    parser.add_argument('-o', '--output', dest='output', default=None, help='JSONL output file, unchanged files of a previous run are not parsed again (default: stdout).')
+    parser.add_argument('-f', '--force', dest='force', action='store_true', help='parse all files, even unchanged ones.')
+    parser.add_argument('dumpdata')
+
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.dumpdata):
+        print('Directory %s does not exist' % args.dumpdata)
+        return 1
+    run_batch(args.dumpdata, output=args.output, jobs=args.jobs, force=args.force, verbose=args.verbose)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import re
+import struct
+
+from .addressmap import AddressMap
+
+# The Linux streams written by breakpad are copies of files from /proc and
+# /etc. All functions work on memoryviews of the mapped minidump file and
+# only the parsed values are copied.
+
+# /proc/<pid>/maps: start-end perms offset dev inode [pathname]
+_re_maps_line = re.compile(rb'^([0-9a-fA-F]+)-([0-9a-fA-F]+)[ \t]+(\S+)[ \t]+([0-9a-fA-F]+)[ \t]+(\S+)[ \t]+(\d+)[ \t]*([^\n]*?)[ \t]*$', re.MULTILINE)
+# /proc/cpuinfo and /proc/<pid>/status: key: value
+_re_colon_line = re.compile(rb'^([^:\n]*?)[ \t]*:[ \t]*([^\n]*?)[ \t]*$', re.MULTILINE)
+# /etc/lsb-release: KEY=value
+_re_assignment_line = re.compile(rb'^[ \t]*([^=#\n]+?)[ \t]*=[ \t]*([^\n]*?)[ \t]*$', re.MULTILINE)
+# /proc/<pid>/cmdline and /proc/<pid>/environ: NUL separated strings
+_re_nul_separated = re.compile(rb'([^\0]+)')
+
+# a_type values of /proc/<pid>/auxv
+auxv_type_names = {
+    0: 'AT_NULL',
+    3: 'AT_PHDR',
+    4: 'AT_PHENT',
+    5: 'AT_PHNUM',
+    6: 'AT_PAGESZ',
+    7: 'AT_BASE',
+    8: 'AT_FLAGS',
+    9: 'AT_ENTRY',
+    11: 'AT_UID',
+    12: 'AT_EUID',
+    13: 'AT_GID',
+    14: 'AT_EGID',
+    15: 'AT_PLATFORM',
+    16: 'AT_HWCAP',
+    17: 'AT_CLKTCK',
+    23: 'AT_SECURE',
+    24: 'AT_BASE_PLATFORM',
+    25: 'AT_RANDOM',
+    26: 'AT_HWCAP2',
+    31: 'AT_EXECFN',
+    33: 'AT_SYSINFO_EHDR',
+    51: 'AT_MINSIGSTKSZ',
+    }
+
+def _decode(value):
+    return value.decode('utf8', 'replace')
+
+class LinuxMapping(object):
+    __slots__ = ('base', 'end', 'perms', 'offset', 'dev', 'inode', 'name')
+
+    def __init__(self, base, end, perms, offset, dev, inode, name):
+        self.base = base
+        self.end = end
+        self.perms = perms
+        self.offset = offset
+        self.dev = dev
+        self.inode = inode
+        self.name = name
+
+    @property
+    def size(self):
+        return self.end - self.base
+
+    @property
+    def basename(self):
+        if not self.name:
+            return self.name
+        return self.name[self.name.rfind('/') + 1:]
+
+    def __str__(self):
+        return '%x-%x %s %08x %s %i %s' % (self.base, self.end, self.perms, self.offset, self.dev, self.inode, self.name)
+
+def parse_maps(data):
+    """
+    Returns an AddressMap of the LinuxMapping entries of the given
+    /proc/<pid>/maps content.
+    """
+    items = []
+    names = {}
+    for m in _re_maps_line.finditer(data):
+        base = int(m.group(1), 16)
+        end = int(m.group(2), 16)
+        # libraries are mapped several times, share the name
+        name = m.group(7)
+        name = names.setdefault(name, _decode(name)) if name else None
+        items.append( (base, end, LinuxMapping(base, end, _decode(m.group(3)), int(m.group(4), 16), _decode(m.group(5)), int(m.group(6)), name)) )
+    return AddressMap(items)
+
+def parse_key_value(data, separator=':'):
+    """
+    Returns a dict with the key/value pairs of the given text with one
+    pair per line, e.g. /proc/<pid>/status or /etc/lsb-release.
+    """
+    regex = _re_colon_line if separator == ':' else _re_assignment_line
+    ret = {}
+    for m in regex.finditer(data):
+        value = _decode(m.group(2))
+        if len(value) >= 2 and value[0] == value[-1] and value[0] in '"\'':
+            value = value[1:-1]
+        ret[_decode(m.group(1))] = value
+    return ret
+
+def parse_cpu_info(data):
+    """
+    Returns a list with a dict for each processor of the given
+    /proc/cpuinfo content.
+    """
+    ret = []
+    current = None
+    for m in _re_colon_line.finditer(data):
+        key = _decode(m.group(1))
+        if current is None or (key == 'processor' and key in current):
+            current = {}
+            ret.append(current)
+        current[key] = _decode(m.group(2))
+    return ret
+
+def parse_nul_separated(data):
+    """
+    Returns the list of strings of the given /proc/<pid>/cmdline content.
+    """
+    return [_decode(m.group(1)) for m in _re_nul_separated.finditer(data)]
+
+def parse_environ(data):
+    """
+    Returns a dict with the variables of the given /proc/<pid>/environ
+    content.
+    """
+    ret = {}
+    for item in parse_nul_separated(data):
+        name, _, value = item.partition('=')
+        ret[name] = value
+    return ret
+
+def parse_auxv(data, pointer_size):
+    """
+    Returns the list of (a_type, a_val) tuples of the given
+    /proc/<pid>/auxv content up to the terminating AT_NULL entry.
+    """
+    entry = struct.Struct('<QQ' if pointer_size == 8 else '<II')
+    data = memoryview(data)
+    ret = []
+    for (a_type, a_val) in entry.iter_unpack(data[:len(data) - len(data) % entry.size]):
+        if a_type == 0:
+            break
+        ret.append( (a_type, a_val) )
+    return ret
@@ -2,61 +2,122 @@
 # -*- coding: utf-8 -*-
 # kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
 
+import os
 import struct
+import mmap
 from datetime import datetime,timedelta
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
 from arsoft.timestamp import FixedOffset
 from .fastprotect_version_info import FastprotectVersionInfo
 
 from .exception_info import exception_code_names_per_platform_type, exception_info_per_platform_type
 from .utils import format_version_number
+from .addressmap import AddressMap, ModuleIndex
+from .stackscan import scan_minidump
+from .linux_streams import parse_maps, parse_key_value, parse_cpu_info, parse_nul_separated, parse_environ, parse_auxv
+
+class _StructureType(type):
+    """
+    Compiles the _fields_ of a structure class into a single struct.Struct
+    covering the whole record including nested structures and declares a
+    slot for each field. Fields with a name starting with two underscores
+    are alignment padding and are skipped.
+    """
+    def __new__(mcs, name, bases, namespace):
+        fields = namespace.get('_fields_')
+        if fields is not None:
+            slots = list(namespace.get('__slots__', ()))
+            fmt = '<'
+            layout = []
+            for field_name, field_type in fields:
+                if isinstance(field_type, str):
+                    if field_name.startswith('__'):
+                        fmt += '%ix' % struct.calcsize(field_type)
+                        continue
+                    fmt += field_type.lstrip('<')
+                    layout.append( (field_name, None) )
+                else:
+                    fmt += field_type._struct_.format.lstrip('<')
+                    layout.append( (field_name, field_type) )
+                slots.append(field_name)
+            namespace['__slots__'] = tuple(slots)
+            namespace['_struct_'] = struct.Struct(fmt)
+            namespace['_layout_'] = tuple(layout)
+            namespace['_flat_'] = all([sub is None for (_, sub) in layout])
+        return type.__new__(mcs, name, bases, namespace)
+
+class Structure(object, metaclass=_StructureType):
+    __slots__ = ()
+    # variadic structures reference other parts of the file by rva and
+    # are parsed from a buffer holding the whole file
+    _variadic_ = False
 
-class Structure(object):
     def __init__(self):
         if not hasattr(self, "_fields_"):
             raise NotImplementedError("No _fields_ in structure")
-        
-        self.__size__ = 0
-        self.__struct_fields__ = {}
-        
-        for _, field_type in self._fields_:
-            if type(field_type) == str:
-                self.__size__ += struct.calcsize(field_type)
-            else:
-                obj = field_type()
-                self.__size__ += len(obj)
 
-    def __getattr__(self, name):
-        if name in self.__struct_fields__:
-            return self.__struct_fields__[name]
-        raise AttributeError(name)
-    
     def __len__(self):
-        return self.__size__
-    
+        return self._struct_.size
+
     def __repr__(self):
         return self.tree()
 
-    def parse(self, fd):
-        for field_name, field_type in self._fields_:
-            if type(field_type) == str:
-                size = struct.calcsize(field_type)
-                value = struct.unpack(field_type, fd.read(size))[0]
-                self.__struct_fields__[field_name] = value
+    def _assign(self, values, pos=0):
+        if self._flat_:
+            for (field_name, _), value in zip(self._layout_, values[pos:]):
+                setattr(self, field_name, value)
+            return pos + len(self._layout_)
+        for field_name, field_type in self._layout_:
+            if field_type is None:
+                setattr(self, field_name, values[pos])
+                pos += 1
             else:
-                obj = field_type()
-                obj.parse(fd)
-                self.__struct_fields__[field_name] = obj
+                obj = field_type.__new__(field_type)
+                pos = obj._assign(values, pos)
+                setattr(self, field_name, obj)
+        return pos
+
+    def parse_from(self, buffer, offset=0):
+        self._assign(self._struct_.unpack_from(buffer, offset))
+        return self
+
+    def parse(self, fd):
+        if self._variadic_:
+            pos = fd.tell()
+            fd.seek(0)
+            self.parse_from(fd.read(), pos)
+        else:
+            self.parse_from(fd.read(len(self)))
+
+    @classmethod
+    def unpack_from(cls, buffer, offset=0):
+        return cls.__new__(cls).parse_from(buffer, offset)
+
+    @classmethod
+    def unpack_array(cls, buffer, offset, count):
+        """
+        Returns a list with count consecutive records starting at offset.
+        """
+        size = cls._struct_.size
+        data = memoryview(buffer)[offset:offset + count * size]
+        if len(data) != count * size:
+            raise struct.error('unpack_array requires a buffer of %i bytes' % (count * size))
+        ret = []
+        for values in cls._struct_.iter_unpack(data):
+            obj = cls.__new__(cls)
+            obj._assign(values)
+            ret.append(obj)
+        return ret
 
-    
     def tree(self, depth=0):
         def stringify(name):
-            assert name in self.__struct_fields__
-            value = self.__struct_fields__[name]
-            if type(value) == int:
+            value = getattr(self, name)
+            if isinstance(value, int):
                 return "0x%08x" % value
-            elif type(value) == long:
-                return "0x%016x" % value
-            elif type(value) == str:
+            elif isinstance(value, (bytes, str)):
                 return repr(value)
             else:
                 return "%s\n%s" % (value.__class__.__name__, value.tree(depth + 2))
@@ -65,7 +126,7 @@ class Structure(object):
         if depth != 0: out += "+"
         out += "%s\n" % self.__class__.__name__
 
-        for field_name, field_type in self._fields_:
+        for field_name, field_type in self._layout_:
             out += "  " * depth + "  .%-32s = %s\n" % (field_name, stringify(field_name))
         
         return out[ : -1]
@@ -171,6 +232,10 @@ class MINIDUMP_MISC_INFO_3(Structure):
                 ("TimezoneInfo", MINIDUMP_TIME_ZONE)]
 
 
+class MINIDUMP_MEMORY_DESCRIPTOR(Structure):
+    _fields_ = [("StartOfMemoryRange", "<Q"), \
+                ("Memory", MINIDUMP_LOCATION_DESCRIPTOR)]
+
 class MINIDUMP_MEMORY_DESCRIPTOR64(Structure):
     _fields_ = [("StartOfMemory", "<Q"), \
                 ("DataSize", "<Q")]
@@ -191,22 +256,15 @@ class VS_FIXEDFILEINFO(Structure):
                 ("dwFileDateLS", "<I")]
 
 class MINIDUMP_STRING(Structure):
-    def __init__(self):
-        self._fields_ = [("Length", "<I")]
-        Structure.__init__(self)
+    __slots__ = ("Buffer",)
+    _fields_ = [("Length", "<I")]
+    _variadic_ = True
 
-    def __len__(self):
-        if self.__size__ == 0: raise Exception("Variadic Structure")
-        return self.__size__
-    
-    def parse(self, fd):
-        count = struct.unpack("<I", fd.read(4))[0]
-        bytes = fd.read(count)
-
-        self.__struct_fields__["Length"] = count
-        self.__struct_fields__["Buffer"] = bytes
-        
-        self._fields_.append(("Buffer", "%ds" % count))
+    def parse_from(self, buffer, offset=0):
+        Structure.parse_from(self, buffer, offset)
+        offset += len(self)
+        self.Buffer = bytes(buffer[offset:offset + self.Length])
+        return self
 
 class MINIDUMP_MODULE(Structure):
     _fields_ = [("BaseOfImage", "<Q"), \
@@ -221,85 +279,66 @@ class MINIDUMP_MODULE(Structure):
                 ("Reserved1", "<Q")]
 
 class MINIDUMP_MODULE_LIST(Structure):
-    def __init__(self):
-        self._fields_ = [("NumberOfModules", "<I")]
-        Structure.__init__(self)
-
-    def __len__(self):
-        if self.__size__ == 0: raise Exception("Variadic Structure")
-        return self.__size__
-
-    def parse(self, fd):
-        count = struct.unpack("<I", fd.read(4))[0]
-        self.__struct_fields__["NumberOfModules"] = count
-        self.__struct_fields__["Modules"] = {}
-
-        for i in range(0, count):
-            mm = MINIDUMP_MODULE()
-            mm.parse(fd)
-            
-            pos = fd.tell()
-            fd.seek(mm.ModuleNameRva)
-            
-            ms = MINIDUMP_STRING()
-            ms.parse(fd)
-            
-            self.__struct_fields__["Modules"][str(ms.Buffer)] = mm
-
-            fd.seek(pos)
+    __slots__ = ("Modules",)
+    _fields_ = [("NumberOfModules", "<I")]
+    _variadic_ = True
+
+    def parse_from(self, buffer, offset=0):
+        Structure.parse_from(self, buffer, offset)
+        self.Modules = {}
+        for mm in MINIDUMP_MODULE.unpack_array(buffer, offset + len(self), self.NumberOfModules):
+            ms = MINIDUMP_STRING.unpack_from(buffer, mm.ModuleNameRva)
+            self.Modules[ms.Buffer.decode('utf16', 'replace')] = mm
+        return self
 
     def tree(self, depth=0):
         out  = "  " * depth
         if depth != 0: out += "+"
         out += "%s\n" % self.__class__.__name__
         
-        out += "  " * depth + "  .%-32s = 0x%08x\n" % ("NumberOfModules", self.__struct_fields__["NumberOfModules"])
+        out += "  " * depth + "  .%-32s = 0x%08x\n" % ("NumberOfModules", self.NumberOfModules)
         out += "  " * depth + "  .%-32s = MINIDUMP_MODULE[]\n" % "Modules"
         
         i = 0
-        for module_name in self.__struct_fields__["Modules"]:
+        for module_name in self.Modules:
             out += "  " * depth + "    [%02i] \"%s\" %s\n" % (i, module_name, \
-                                                              self.__struct_fields__["Modules"][module_name].tree(depth + 2))
+                                                              self.Modules[module_name].tree(depth + 2))
             i += 1
 
         return out[ : -1]
 
-class MINIDUMP_MEMORY64_LIST(Structure):
-    def __init__(self):
-        self._fields_ = [("NumberOfMemoryRanges", "<Q"), \
-                         ("BaseRva", "<Q")]
-        Structure.__init__(self)
-    
-    def __len__(self):
-        if self.__size__ == 0: raise Exception("Variadic Structure")
-        return self.__size__
+class MINIDUMP_MEMORY_LIST(Structure):
+    __slots__ = ("MemoryRanges",)
+    _fields_ = [("NumberOfMemoryRanges", "<I")]
+    _variadic_ = True
 
-    def parse(self, fd):
-        nitems, rva = struct.unpack("<QQ", fd.read(16))
-        self.__struct_fields__["NumberOfMemoryRanges"] = nitems
-        self.__struct_fields__["BaseRva"] = rva
-        
-        obj = MINIDUMP_MEMORY_DESCRIPTOR64()
-        self.__size__ = 16 + nitems * len(obj)
-        
-        self.__struct_fields__["MemoryRanges"] = []
-        for i in range(0, nitems):
-            desc = MINIDUMP_MEMORY_DESCRIPTOR64()
-            desc.parse(fd)
+    def parse_from(self, buffer, offset=0):
+        Structure.parse_from(self, buffer, offset)
+        self.MemoryRanges = MINIDUMP_MEMORY_DESCRIPTOR.unpack_array(buffer, offset + len(self), self.NumberOfMemoryRanges)
+        return self
+
+class MINIDUMP_MEMORY64_LIST(Structure):
+    __slots__ = ("MemoryRanges",)
+    _fields_ = [("NumberOfMemoryRanges", "<Q"), \
+                ("BaseRva", "<Q")]
+    _variadic_ = True
 
-            self.__struct_fields__["MemoryRanges"].append(desc)
+    def parse_from(self, buffer, offset=0):
+        Structure.parse_from(self, buffer, offset)
+        self.MemoryRanges = MINIDUMP_MEMORY_DESCRIPTOR64.unpack_array(buffer, offset + len(self), self.NumberOfMemoryRanges)
+        return self
 
     def tree(self, depth=0):
         out  = "  " * depth
         if depth != 0: out += "+"
         out += "%s\n" % self.__class__.__name__
 
-        out += "  " * depth + "  .%-32s = 0x%016x\n" % ("NumberOfMemoryRanges", self.__struct_fields__["NumberOfMemoryRanges"])
-        out += "  " * depth + "  .%-32s = 0x%016x\n" % ("BaseRva", self.__struct_fields__["BaseRva"])
+        out += "  " * depth + "  .%-32s = 0x%016x\n" % ("NumberOfMemoryRanges", self.NumberOfMemoryRanges)
+        out += "  " * depth + "  .%-32s = 0x%016x\n" % ("BaseRva", self.BaseRva)
         out += "  " * depth + "  .%-32s = MINIDUMP_MEMORY_DESCRIPTOR64[]\n" % "MemoryRanges"
         
         i = 0
-        for desc in self.__struct_fields__["MemoryRanges"]:
+        for desc in self.MemoryRanges:
             out += "  " * depth + "    [%02i] %s\n" % (i, desc.tree(depth + 2))
             i += 1
         
@@ -326,6 +365,7 @@ class MINIDUMP_MEMORY_INFO_LIST(Structure):
                 ("NumberOfEntries", "<Q")]
 
 class MINIDUMP_SYSTEM_INFO(Structure):
+    __slots__ = ("CSDVersion",)
     _fields_ = [("ProcessorArchitecture", "<H"), \
                 ("ProcessorLevel", "<H"), \
                 ("ProcessorRevision", "<H"), \
@@ -344,64 +384,56 @@ class MINIDUMP_SYSTEM_INFO(Structure):
                 ("AMDExtendedCpuFeatures", "<I")]
 
 class MINIDUMP_THREAD(Structure):
+    __slots__ = ("Context",)
     _fields_ = [("ThreadId", "<I"), \
                 ("SuspendCount", "<I"), \
                 ("PriorityClass", "<I"), \
                 ("Priority", "<I"), \
                 ("Teb", "<Q"), \
-                ("Stack", MINIDUMP_MEMORY_DESCRIPTOR64), \
+                ("Stack", MINIDUMP_MEMORY_DESCRIPTOR), \
                 ("ThreadContext", MINIDUMP_LOCATION_DESCRIPTOR)]
+    _variadic_ = True
 
-    def parse(self, fd):
-        Structure.parse(self, fd)
-        a = fd.tell()
-        fd.seek(self.ThreadContext.Rva)
-        self.__struct_fields__["Context"] = fd.read(self.ThreadContext.DataSize)
-        fd.seek(a) 
+    def parse_from(self, buffer, offset=0):
+        Structure.parse_from(self, buffer, offset)
+        self._parse_context(buffer)
+        return self
+
+    def _parse_context(self, buffer):
+        rva = self.ThreadContext.Rva
+        self.Context = memoryview(buffer)[rva:rva + self.ThreadContext.DataSize]
 
     def getContext(self, architecture):
-        if architecture == "x86":
-            cxt = CONTEXT_x86()
-        elif architecture == "amd64":
-            cxt = CONTEXT_amd64()
-        elif architecture == "arm32":
-            cxt = CONTEXT_arm32()
-        else:
+        if architecture not in _context_per_architecture:
             raise Exception("Unknown architecture for context parsing!")
-        assert len(self.Context) == len(cxt)
+        cxt_type = _context_per_architecture[architecture]
+        # the context structures only cover the leading registers
+        assert len(self.Context) >= cxt_type._struct_.size
 
-        cxt.parse(StringIO(self.Context))
-        return cxt
+        return cxt_type.unpack_from(self.Context)
 
 class MINIDUMP_THREAD_LIST(Structure):
-    def __init__(self):
-        self._fields_ = [("NumberOfThreads", "<I")]
-        Structure.__init__(self)
+    __slots__ = ("Threads",)
+    _fields_ = [("NumberOfThreads", "<I")]
+    _variadic_ = True
 
-    def __len__(self):
-        if self.__size__ == 0: raise Exception("Variadic Structure")
-        return self.__size__
-
-    def parse(self, fd):
-        count = struct.unpack("<I", fd.read(4))[0]
-        self.__struct_fields__["NumberOfThreads"] = count
-        self.__struct_fields__["Threads"] = []
-
-        for i in range(0, count):
-            mt = MINIDUMP_THREAD()
-            mt.parse(fd)
-            self.__struct_fields__["Threads"].append(mt)
+    def parse_from(self, buffer, offset=0):
+        Structure.parse_from(self, buffer, offset)
+        self.Threads = MINIDUMP_THREAD.unpack_array(buffer, offset + len(self), self.NumberOfThreads)
+        for mt in self.Threads:
+            mt._parse_context(buffer)
+        return self
 
     def tree(self, depth=0):
         out  = "  " * depth
         if depth != 0: out += "+"
         out += "%s\n" % self.__class__.__name__
         
-        out += "  " * depth + "  .%-32s = 0x%08x\n" % ("NumberOfThreads", self.__struct_fields__["NumberOfThreads"])
+        out += "  " * depth + "  .%-32s = 0x%08x\n" % ("NumberOfThreads", self.NumberOfThreads)
         out += "  " * depth + "  .%-32s = MINIDUMP_THREAD[]\n" % "Threads"
         
         i = 0
-        for thread in self.__struct_fields__["Threads"]:
+        for thread in self.Threads:
             out += "  " * depth + "    [%02i] %s\n" % (i, thread.tree(depth + 2))
             i += 1
 
@@ -419,41 +451,26 @@ class MINIDUMP_THREAD_INFO(Structure):
                 ("StartAddress", "<Q"), \
                 ("Affinity", "<Q")]
 
-    def parse(self, fd):
-        Structure.parse(self, fd)
-
 class MINIDUMP_THREAD_INFO_LIST(Structure):
-    def __init__(self):
-        self._fields_ = [("SizeOfHeader", "<I"), ("SizeOfEntry", "<I"), ("NumberOfThreads", "<I")]
-        Structure.__init__(self)
-
-    def __len__(self):
-        if self.__size__ == 0: raise Exception("Variadic Structure")
-        return self.__size__
+    __slots__ = ("ThreadInfos",)
+    _fields_ = [("SizeOfHeader", "<I"), ("SizeOfEntry", "<I"), ("NumberOfThreads", "<I")]
+    _variadic_ = True
 
-    def parse(self, fd):
-        header_size = struct.unpack("<I", fd.read(4))[0]
-        entry_size = struct.unpack("<I", fd.read(4))[0]
-        count = struct.unpack("<I", fd.read(4))[0]
-
-        self.__struct_fields__["NumberOfThreads"] = count
-        self.__struct_fields__["ThreadInfos"] = []
-
-        for i in range(0, count):
-            mt = MINIDUMP_THREAD_INFO()
-            mt.parse(fd)
-            self.__struct_fields__["ThreadInfos"].append(mt)
+    def parse_from(self, buffer, offset=0):
+        Structure.parse_from(self, buffer, offset)
+        self.ThreadInfos = MINIDUMP_THREAD_INFO.unpack_array(buffer, offset + len(self), self.NumberOfThreads)
+        return self
 
     def tree(self, depth=0):
         out  = "  " * depth
         if depth != 0: out += "+"
         out += "%s\n" % self.__class__.__name__
 
-        out += "  " * depth + "  .%-32s = 0x%08x\n" % ("NumberOfThreads", self.__struct_fields__["NumberOfThreads"])
+        out += "  " * depth + "  .%-32s = 0x%08x\n" % ("NumberOfThreads", self.NumberOfThreads)
         out += "  " * depth + "  .%-32s = MINIDUMP_THREAD_INFO[]\n" % "ThreadInfos"
 
         i = 0
-        for thread in self.__struct_fields__["ThreadInfos"]:
+        for thread in self.ThreadInfos:
             out += "  " * depth + "    [%02i] %s\n" % (i, thread.tree(depth + 2))
             i += 1
 
@@ -585,59 +602,223 @@ class CONTEXT_arm32(Structure):
                  ("Fpscr", "<I"), \
                  ("Padding", "<I")]
 
+class MD_RAW_LINK_MAP32(Structure):
+    __slots__ = ("Name",)
+    _fields_ = [("addr", "<I"), \
+                ("name", "<I"), \
+                ("ld", "<I")]
+
+class MD_RAW_LINK_MAP64(Structure):
+    __slots__ = ("Name",)
+    _fields_ = [("addr", "<Q"), \
+                ("name", "<I"), \
+                ("__alignment", "<I"), \
+                ("ld", "<Q")]
+
+class MD_RAW_DEBUG(Structure):
+    # common part of MD_RAW_DEBUG32 and MD_RAW_DEBUG64
+    __slots__ = ("LinkMaps",)
+    _variadic_ = True
+
+    def parse_from(self, buffer, offset=0):
+        Structure.parse_from(self, buffer, offset)
+        self.LinkMaps = self._link_map_type_.unpack_array(buffer, self.map, self.dso_count)
+        for lm in self.LinkMaps:
+            lm.Name = MINIDUMP_STRING.unpack_from(buffer, lm.name).Buffer.decode('utf16') if lm.name else None
+        return self
+
+class MD_RAW_DEBUG32(MD_RAW_DEBUG):
+    _fields_ = [("version", "<I"), \
+                ("map", "<I"), \
+                ("dso_count", "<I"), \
+                ("brk", "<I"), \
+                ("ldbase", "<I"), \
+                ("dynamic", "<I")]
+    _link_map_type_ = MD_RAW_LINK_MAP32
+
+class MD_RAW_DEBUG64(MD_RAW_DEBUG):
+    _fields_ = [("version", "<I"), \
+                ("map", "<I"), \
+                ("dso_count", "<I"), \
+                ("__alignment", "<I"), \
+                ("brk", "<Q"), \
+                ("ldbase", "<Q"), \
+                ("dynamic", "<Q")]
+    _link_map_type_ = MD_RAW_LINK_MAP64
+
+_context_per_architecture = {
+    "x86": CONTEXT_x86,
+    "amd64": CONTEXT_amd64,
+    "arm32": CONTEXT_arm32,
+    }
+
+class MiniDumpMemoryData(Mapping):
+    """
+    Read-only mapping of the start address of each memory range to the
+    memory of the range. The memory is returned as memoryview of the
+    mapped minidump file, nothing is read or copied up front.
+    """
+    def __init__(self, minidump):
+        self._md = minidump
+        self._ranges = {}
+
+    def _add(self, start, size, rva):
+        self._ranges[start] = (size, rva)
+
+    def __getitem__(self, start):
+        size, rva = self._ranges[start]
+        return self._md._view(rva, size)
+
+    def __iter__(self):
+        return iter(self._ranges)
+
+    def __len__(self):
+        return len(self._ranges)
+
+def _stream_property(stream_types, attr):
+    # the streams are parsed the first time one of their values is accessed
+    if not isinstance(stream_types, tuple):
+        stream_types = (stream_types,)
+    def getter(self):
+        for stream_type in stream_types:
+            if stream_type not in self._parsed_streams:
+                self._parse_stream(stream_type)
+        return getattr(self, attr)
+    return property(getter)
+
+def _wrapper_section(default=None):
+    # errors of the stream parsers are kept in MiniDumpWrapper.errors and
+    # the section is empty, the sections are only parsed on first access
+    # (usually while a template is rendered)
+    def decorator(getter):
+        name = getter.__name__
+        def wrapper(self):
+            if name in self.errors:
+                return default() if default is not None else None
+            try:
+                return getter(self)
+            except MiniDump.MiniDumpClosedError:
+                raise
+            except Exception as e:
+                self.errors[name] = '%s: %s' % (e.__class__.__name__, e)
+                return default() if default is not None else None
+        return property(wrapper)
+    return decorator
+
 class MiniDump(object):
+
+    class MiniDumpClosedError(ValueError):
+        pass
+
     def __init__(self, path, autoparse=True):
         self.path = path
-        self.fd = open(self.path, "rb")
-        
-        self.memory_data = {}
-        self.memory_query = {}
-        self.context = None
+        self._closed = False
+        with open(self.path, "rb") as fd:
+            st = os.fstat(fd.fileno())
+            self.file_key = (os.path.abspath(self.path), st.st_size, st.st_mtime_ns)
+            try:
+                # all streams and the memory ranges are read from the
+                # mapping, the file itself is not needed any longer
+                self._mmap = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                # empty file
+                self._mmap = None
+        # all structures are parsed from the mapped file
+        self._data = memoryview(self._mmap) if self._mmap is not None else b''
+        self._streams = {}
+        self._stream_handlers = {}
+        self._parsed_streams = set()
+
+        self._memory_data = MiniDumpMemoryData(self)
+        self._memory_ranges = AddressMap()
+        self._memory_query = {}
+        self._context = None
         
-        self.processor = None
-        self.architecture = None
-        self.processor_level = None
-        self.version = None
+        self._processor = None
+        self._architecture = None
+        self._processor_level = None
+        self._version = None
         
-        self.exception_info = None
-        self.assertion_info = None
-        self.system_info = None
-        self.misc_info = None
-        self.module_map = {}
-        self.threads = []
-        self.fast_protect_system_info = None
-        self.fast_protect_version_info = None
+        self._exception_info = None
+        self._assertion_info = None
+        self._system_info = None
+        self._misc_info = None
+        self._module_map = {}
+        self._threads = []
+        self._thread_infos = []
+        self._fast_protect_system_info = None
+        self._fast_protect_version_info = None
+        self._linux_cpu_info = None
+        self._linux_proc_status = None
+        self._linux_lsb_release = None
+        self._linux_cmd_line = None
+        self._linux_environ = None
+        self._linux_auxv = None
+        self._linux_maps = None
+        self._linux_dso_debug = None
 
         if autoparse: self.parse()
 
+    system_info = _stream_property(7, '_system_info')
+    processor = _stream_property(7, '_processor')
+    architecture = _stream_property(7, '_architecture')
+    processor_level = _stream_property(7, '_processor_level')
+    version = _stream_property(7, '_version')
+    threads = _stream_property(3, '_threads')
+    module_map = _stream_property(4, '_module_map')
+    exception_info = _stream_property(6, '_exception_info')
+    context = _stream_property(6, '_context')
+    memory_data = _stream_property((5, 9), '_memory_data')
+    memory_ranges = _stream_property((5, 9), '_memory_ranges')
+    misc_info = _stream_property(15, '_misc_info')
+    memory_query = _stream_property(16, '_memory_query')
+    thread_infos = _stream_property(17, '_thread_infos')
+    assertion_info = _stream_property(0x47670002, '_assertion_info')
+    fast_protect_version_info = _stream_property(0x61AE0000, '_fast_protect_version_info')
+    fast_protect_system_info = _stream_property(0x61AE0001, '_fast_protect_system_info')
+    linux_cpu_info = _stream_property(0x47670003, '_linux_cpu_info')
+    linux_proc_status = _stream_property(0x47670004, '_linux_proc_status')
+    linux_lsb_release = _stream_property(0x47670005, '_linux_lsb_release')
+    linux_cmd_line = _stream_property(0x47670006, '_linux_cmd_line')
+    linux_environ = _stream_property(0x47670007, '_linux_environ')
+    linux_auxv = _stream_property(0x47670008, '_linux_auxv')
+    linux_maps = _stream_property(0x47670009, '_linux_maps')
+    linux_dso_debug = _stream_property(0x4767000A, '_linux_dso_debug')
+
+    @property
+    def pointer_size(self):
+        return 8 if self.architecture in ('amd64', 'arm64', 'ia64') else 4
+
     def __parse_memory_list64__(self, dirent):
-        ml64 = MINIDUMP_MEMORY64_LIST()
-        ml64.parse(self.fd)
-        
-        self.fd.seek(ml64.BaseRva)
+        ml64 = MINIDUMP_MEMORY64_LIST.unpack_from(self._data, dirent.Location.Rva)
 
+        # the memory of all ranges is stored consecutively starting at
+        # BaseRva, only remember where to find it
+        rva = ml64.BaseRva
+        ranges = []
         for desc in ml64.MemoryRanges:
-            bytes = self.fd.read(desc.DataSize)
-            self.memory_data[desc.StartOfMemory] = bytes
+            ranges.append( (desc.StartOfMemory, desc.DataSize, rva) )
+            rva += desc.DataSize
+        self._add_memory_ranges(ranges)
+
+    def __parse_memory_list__(self, dirent):
+        ml = MINIDUMP_MEMORY_LIST.unpack_from(self._data, dirent.Location.Rva)
+        self._add_memory_ranges([(desc.StartOfMemoryRange, desc.Memory.DataSize, desc.Memory.Rva) for desc in ml.MemoryRanges])
+
+    def _add_memory_ranges(self, ranges):
+        for (start, size, rva) in ranges:
+            self._memory_data._add(start, size, rva)
+        items = [(start, start + size, (start, size, rva)) for (start, size, rva) in ranges]
+        self._memory_ranges = AddressMap(items + [(r[0], r[0] + r[1], r) for r in self._memory_ranges])
 
     def __parse_exception_stream__(self, dirent):
-        exc = MINIDUMP_EXCEPTION_STREAM()
-        exc.parse(self.fd)
+        exc = MINIDUMP_EXCEPTION_STREAM.unpack_from(self._data, dirent.Location.Rva)
         
-        self.fd.seek(exc.ThreadContext.Rva)
-        
-        if self.architecture == "x86":
-            cxt = CONTEXT_x86()
-        elif self.architecture == "amd64":
-            cxt = CONTEXT_amd64()
-        elif self.architecture == "arm32":
-            cxt = CONTEXT_arm32()
-        else:
+        if self.architecture not in _context_per_architecture:
             raise Exception("Unknown architecture for context parsing!")
         
-        cxt.parse(self.fd)
-        self.context = cxt
-        self.exception_info = exc
+        self._context = _context_per_architecture[self.architecture].unpack_from(self._data, exc.ThreadContext.Rva)
+        self._exception_info = exc
 
     def __parse_memory_info__(self, dirent):
         PAGE_EXECUTE = 0x10
@@ -660,139 +841,138 @@ class MiniDump(object):
             if ((flags & 0xff) == PAGE_NOACCESS): return ""
             raise NotImplementedError
 
-        mil = MINIDUMP_MEMORY_INFO_LIST()
-        mil.parse(self.fd)
+        mil = MINIDUMP_MEMORY_INFO_LIST.unpack_from(self._data, dirent.Location.Rva)
         
-        for i in range(0, mil.NumberOfEntries):
-            mi = MINIDUMP_MEMORY_INFO()
-            mi.parse(self.fd)
-            
+        for mi in MINIDUMP_MEMORY_INFO.unpack_array(self._data, dirent.Location.Rva + len(mil), mil.NumberOfEntries):
             if mi.Protect == 0:
                 perms = parse_perms(mi.AllocationProtect)
             else:
                 perms = parse_perms(mi.Protect)
 
-            self.memory_query[mi.BaseAddress] = (perms, mi.RegionSize)
+            self._memory_query[mi.BaseAddress] = (perms, mi.RegionSize)
     
     def __parse_systeminfo__(self, dirent):
         PROCESSOR_ARCHITECTURE_AMD64   = 9
         PROCESSOR_ARCHITECTURE_ARM     = 5
         PROCESSOR_ARCHITECTURE_IA64    = 6
         PROCESSOR_ARCHITECTURE_INTEL   = 0
+        PROCESSOR_ARCHITECTURE_ARM64   = 12
+        # used by older breakpad versions
+        MD_CPU_ARCHITECTURE_ARM64_OLD  = 0x8003
         PROCESSOR_ARCHITECTURE_UNKNOWN = 0xffff
 
-        msi = MINIDUMP_SYSTEM_INFO()
-        msi.parse(self.fd)
+        msi = MINIDUMP_SYSTEM_INFO.unpack_from(self._data, dirent.Location.Rva)
 
-        self.system_info = msi
-        self.processor = msi.VendorId
-        self.system_info.CSDVersion = self._read_string(msi.CSDVersionRva)
+        self._system_info = msi
+        self._processor = msi.VendorId
+        msi.CSDVersion = self._read_string(msi.CSDVersionRva)
 
         if msi.ProcessorArchitecture == PROCESSOR_ARCHITECTURE_AMD64:
-            self.architecture = "amd64"
+            self._architecture = "amd64"
         elif msi.ProcessorArchitecture == PROCESSOR_ARCHITECTURE_ARM:
-            self.architecture = "arm32"
+            self._architecture = "arm32"
+        elif msi.ProcessorArchitecture in (PROCESSOR_ARCHITECTURE_ARM64, MD_CPU_ARCHITECTURE_ARM64_OLD):
+            self._architecture = "arm64"
         elif msi.ProcessorArchitecture == PROCESSOR_ARCHITECTURE_IA64:
-            self.architecture = "ia64"
+            self._architecture = "ia64"
         elif msi.ProcessorArchitecture == PROCESSOR_ARCHITECTURE_INTEL:
-            self.architecture = "x86"
+            self._architecture = "x86"
         else:
-            self.architecture = "unknown"
+            self._architecture = "unknown"
         
-        if self.architecture == "x86":
+        if self._architecture == "x86":
             if msi.ProcessorLevel == 3:
-                self.processor_level = "i386"
+                self._processor_level = "i386"
             elif msi.ProcessorLevel == 4:
-                self.processor_level = "i486"
+                self._processor_level = "i486"
             elif msi.ProcessorLevel == 5:
-                self.processor_level = "pentium"
+                self._processor_level = "pentium"
             elif msi.ProcessorLevel == 6:
-                self.processor_level = "pentium2"
+                self._processor_level = "pentium2"
         else:
-            self.processor_level = "unknown"
+            self._processor_level = "unknown"
         
-        self.version = "%d.%d (build %d)" % (msi.MajorVersion, msi.MinorVersion, msi.BuildNumber)
+        self._version = "%d.%d (build %d)" % (msi.MajorVersion, msi.MinorVersion, msi.BuildNumber)
     
     def __parse_modulelist__(self, dirent):
-        mml = MINIDUMP_MODULE_LIST()
-        mml.parse(self.fd)
+        mml = MINIDUMP_MODULE_LIST.unpack_from(self._data, dirent.Location.Rva)
 
-        self.module_map = mml.Modules
+        self._module_map = mml.Modules
 
     def __parse_threadlist__(self, dirent):
-        mtl = MINIDUMP_THREAD_LIST()
-        mtl.parse(self.fd)
+        mtl = MINIDUMP_THREAD_LIST.unpack_from(self._data, dirent.Location.Rva)
 
-        self.threads = mtl.Threads
+        self._threads = mtl.Threads
 
     def __parse_threadinfolist__(self, dirent):
-        mtl = MINIDUMP_THREAD_INFO_LIST()
-        mtl.parse(self.fd)
+        mtl = MINIDUMP_THREAD_INFO_LIST.unpack_from(self._data, dirent.Location.Rva)
 
-        self.thread_infos = mtl.ThreadInfos
+        self._thread_infos = mtl.ThreadInfos
 
     def __parse_breakpad_info__(self, dirent):
         pass
     def __parse_assertion_info__(self, dirent):
-        mta = MINIDUMP_ASSERTION_INFO()
-        mta.parse(self.fd)
+        mta = MINIDUMP_ASSERTION_INFO.unpack_from(self._data, dirent.Location.Rva)
 
-        self.assertion_info = mta
+        self._assertion_info = mta
 
     def __parse_misc_info__(self, dirent):
-        mi = MINIDUMP_MISC_INFO_3()
-        mi.parse(self.fd)
-        self.misc_info = mi
+        mi = MINIDUMP_MISC_INFO_3.unpack_from(self._data, dirent.Location.Rva)
+        self._misc_info = mi
 
+    # the text streams are kept as memoryview of the mapped file, see
+    # linux_streams for the parsing
     def __parse_linux_proc_cpuinfo__(self, dirent):
-        pass
+        self._linux_cpu_info = self._view(dirent.Location.Rva, dirent.Location.DataSize)
     def __parse_linux_proc_status__(self, dirent):
-        pass
+        self._linux_proc_status = self._view(dirent.Location.Rva, dirent.Location.DataSize)
     def __parse_linux_lsb_release__(self, dirent):
-        pass
+        self._linux_lsb_release = self._view(dirent.Location.Rva, dirent.Location.DataSize)
     def __parse_linux_cmd_line__(self, dirent):
-        pass
+        self._linux_cmd_line = self._view(dirent.Location.Rva, dirent.Location.DataSize)
     def __parse_linux_environ__(self, dirent):
-        pass
+        self._linux_environ = self._view(dirent.Location.Rva, dirent.Location.DataSize)
     def __parse_linux_auxv__(self, dirent):
-        pass
+        self._linux_auxv = parse_auxv(self._view(dirent.Location.Rva, dirent.Location.DataSize), self.pointer_size)
     def __parse_linux_maps__(self, dirent):
-        pass
+        self._linux_maps = parse_maps(self._view(dirent.Location.Rva, dirent.Location.DataSize))
     def __parse_linux_dso_debug__(self, dirent):
-        pass
+        debug_type = MD_RAW_DEBUG64 if self.pointer_size == 8 else MD_RAW_DEBUG32
+        self._linux_dso_debug = debug_type.unpack_from(self._data, dirent.Location.Rva)
     def __parse_fast_protect_version_info__(self, dirent):
-        self.fd.seek(dirent.Location.Rva)
-        rawdata = self.fd.read(dirent.Location.DataSize)
-        self.fast_protect_version_info = FastprotectVersionInfo(rawdata)
+        rawdata = bytes(self._view(dirent.Location.Rva, dirent.Location.DataSize))
+        self._fast_protect_version_info = FastprotectVersionInfo(rawdata)
 
     def __parse_fast_protect_system_info__(self, dirent):
-        self.fd.seek(dirent.Location.Rva)
-        rawdata = self.fd.read(dirent.Location.DataSize)
-        self.fast_protect_system_info = None
+        self._fast_protect_system_info = None
 
     def _read_string(self, rva):
-
-        pos = self.fd.tell()
-        self.fd.seek(rva)
-
-        ms = MINIDUMP_STRING()
-        ms.parse(self.fd)
-
-        ret = str(ms.Buffer)
-
-        self.fd.seek(pos)
-        return ret
+        ms = MINIDUMP_STRING.unpack_from(self._data, rva)
+        return ms.Buffer.decode('utf16', 'replace')
+
+    @staticmethod
+    def read_header(path):
+        """
+        Returns the MINIDUMP_HEADER of the given file without mapping the
+        file or reading the stream directory. Raises OSError if the file
+        can not be read and ValueError if it is not a minidump.
+        """
+        with open(path, "rb") as fd:
+            data = fd.read(MINIDUMP_HEADER._struct_.size)
+        if len(data) < MINIDUMP_HEADER._struct_.size:
+            raise ValueError("File %s is too small for a minidump" % path)
+        hdr = MINIDUMP_HEADER.unpack_from(data)
+        if hdr.Signature != b"MDMP":
+            raise ValueError("MINIDUMP_HEADER signature does not match %s" % hdr.Signature)
+        return hdr
 
     def parse(self):
         try:
-            hdr = MINIDUMP_HEADER()
-            hdr.parse(self.fd)
+            hdr = MINIDUMP_HEADER.unpack_from(self._data)
             
             if hdr.Signature != b"MDMP":
                 raise Exception("MINIDUMP_HEADER signature does not match %s" % hdr.Signature)
 
-            self.fd.seek(hdr.StreamDirectoryRva)
-            
             # Check MINIDUMP_STREAM_TYPE for full list
             # https://msdn.microsoft.com/en-us/library/windows/desktop/ms680394(v=vs.85).aspx
             # and MiniDumpStreamType from breakpad
@@ -819,6 +999,7 @@ class MiniDump(object):
             streamTbl = {
                 3: self.__parse_threadlist__,
                 4: self.__parse_modulelist__,
+                5: self.__parse_memory_list__,
                 6: self.__parse_exception_stream__,
                 7: self.__parse_systeminfo__,
                 9: self.__parse_memory_list64__,
@@ -838,28 +1019,29 @@ class MiniDump(object):
                 0x61AE0000: self.__parse_fast_protect_version_info__,
                 0x61AE0001: self.__parse_fast_protect_system_info__,
                          }
-            streams = {}
-            for i in range(0, hdr.NumberOfStreams):
-                dirent = MINIDUMP_DIRECTORY()
-                dirent.parse(self.fd)
-                
-                streams[dirent.StreamType] = dirent
+            for dirent in MINIDUMP_DIRECTORY.unpack_array(self._data, hdr.StreamDirectoryRva, hdr.NumberOfStreams):
+                self._streams[dirent.StreamType] = dirent
     
-            if not 7 in streams: raise Exception("No SYSTEM_INFO stream found...context will not work correctly!")
+            if not 7 in self._streams: raise Exception("No SYSTEM_INFO stream found...context will not work correctly!")
             
-            # it is important we parse SYSTEM_INFO first
-            parse_order = list(streams.keys())
-            parse_order.remove(7)
-            parse_order = [7] + parse_order
-            
-            for item in parse_order:
-                dirent = streams[item]
-                if dirent.StreamType in streamTbl:
-                    self.fd.seek(dirent.Location.Rva)
-                    streamTbl[dirent.StreamType](dirent)
-
-        finally:
+            # the streams are parsed on first access, see _parse_stream
+            self._stream_handlers = streamTbl
+        except Exception:
             self.close()
+            raise
+
+    def _parse_stream(self, stream_type):
+        if self._closed:
+            raise MiniDump.MiniDumpClosedError("Minidump %s has been closed" % self.path)
+        self._parsed_streams.add(stream_type)
+        dirent = self._streams.get(stream_type)
+        if dirent is None or stream_type not in self._stream_handlers:
+            return
+        try:
+            self._stream_handlers[stream_type](dirent)
+        except Exception:
+            self._parsed_streams.discard(stream_type)
+            raise
     
     def get_exception_info(self):
         return self.exception_info
@@ -905,10 +1087,44 @@ class MiniDump(object):
     def get_memory_map(self):
         return self.memory_query
 
+    def _view(self, rva, size):
+        if self._closed:
+            raise MiniDump.MiniDumpClosedError("Minidump %s has been closed" % self.path)
+        if self._mmap is None:
+            return None
+        return self._data[rva:rva + size]
+
+    def read_memory(self, addr, size):
+        """
+        Returns up to size bytes of the process memory at addr as memoryview
+        of the minidump file without copying. The read continues into the
+        following memory range if it is adjacent in memory and in the file.
+        Returns None if addr is not included in the minidump.
+        """
+        r = self.memory_ranges.find(addr)
+        if r is None:
+            return None
+        start, range_size, rva = r
+        offset = addr - start
+        available = range_size - offset
+        while available < size:
+            next_start = start + range_size
+            n = self.memory_ranges.find(next_start)
+            if n is None or n[0] != next_start or n[2] != rva + range_size:
+                break
+            start, range_size, rva = n
+            available += range_size
+        return self._view(r[2] + offset, min(size, available))
+
     def close(self):
-        if not self.fd is None:
-            self.fd.close()
-            self.fd = None
+        """
+        Releases the mapping of the minidump file once all memoryviews
+        handed out are gone. Accessing a stream which has not been parsed
+        before or the memory raises MiniDumpClosedError afterwards.
+        """
+        self._closed = True
+        self._data = b''
+        self._mmap = None
 
 class MiniDumpWrapper(object):
 
@@ -930,6 +1146,14 @@ class MiniDumpWrapper(object):
         9: 'Android', # PlatformTypeAndroid,
         10: 'PS3', # PlatformTypePS3,
         11: 'NaCl', # PlatformTypeNACL
+        # MDOSPlatform values written by breakpad
+        0x8101: 'Mac OS X', # MD_OS_MAC_OS_X
+        0x8102: 'iOS', # MD_OS_IOS
+        0x8201: 'Linux', # MD_OS_LINUX
+        0x8202: 'Solaris', # MD_OS_SOLARIS
+        0x8203: 'Android', # MD_OS_ANDROID
+        0x8204: 'PS3', # MD_OS_PS3
+        0x8205: 'NaCl', # MD_OS_NACL
     };
 
     CPUTypeId_to_string = {
@@ -960,6 +1184,8 @@ class MiniDumpWrapper(object):
         self._exception = None
         self._assertion = None
         self._modules = None
+        self._module_index = None
+        self._is_64_bit = None
         self._threads = None
         self._stackdumps = None
         self._tz = None
@@ -967,6 +1193,13 @@ class MiniDumpWrapper(object):
         self._misc_info = None
         self._fast_protect_version_info = None
         self._fast_protect_system_info = None
+        self._linux_cpu_info = None
+        self._linux_proc_status = None
+        self._linux_lsb_release = None
+        self._linux_cmd_line = None
+        self._linux_environ = None
+        # error messages of the sections which could not be parsed
+        self.errors = {}
 
     class MiniDumpEntity(object):
         def __init__(self, owner):
@@ -989,18 +1222,21 @@ class MiniDumpWrapper(object):
             self.platform_type_id = self._md.system_info.PlatformId
             self.cpu_type = MiniDumpWrapper.CPUTypeId_to_string.get(self._md.system_info.ProcessorArchitecture, None)
             self.cpu_type_id = self._md.system_info.ProcessorArchitecture
-            self.cpu_name = None
+            cpu_info = owner.linux_cpu_info
+            self.cpu_name = cpu_info[0].get('model name') if cpu_info else None
             self.cpu_level = self._md.system_info.ProcessorLevel
             self.cpu_revision = self._md.system_info.ProcessorRevision
-            self.cpu_vendor = self._md.system_info.VendorId
+            self.cpu_vendor = self._md.system_info.VendorId.rstrip(b'\0').decode('ascii', 'replace')
             self.number_of_cpus = self._md.system_info.NumberOfProcessors
             self.os_version = '%i.%i.%i' % (self._md.system_info.MajorVersion, self._md.system_info.MinorVersion, self._md.system_info.BuildNumber)
             self.os_version_number = (self._md.system_info.MajorVersion << 32) + self._md.system_info.MinorVersion
+            self.os_build_number = self._md.system_info.BuildNumber
             self.os_version_info = self._md.system_info.CSDVersion
-            self.distribution_id = None
-            self.distribution_release = None
-            self.distribution_codename = None
-            self.distribution_description = None
+            lsb_release = owner.linux_lsb_release or {}
+            self.distribution_id = lsb_release.get('DISTRIB_ID')
+            self.distribution_release = lsb_release.get('DISTRIB_RELEASE')
+            self.distribution_codename = lsb_release.get('DISTRIB_CODENAME')
+            self.distribution_description = lsb_release.get('DISTRIB_DESCRIPTION')
 
     class TimezoneInfo(MiniDumpEntity):
         def __init__(self, owner):
@@ -1207,72 +1443,106 @@ class MiniDumpWrapper(object):
 
         @property
         def stackdump(self):
-            ret = None
-            for st in self._owner.stackdumps:
-                if st.threadid == self.id and not st.simplified:
-                    ret = st
-                    break
-            return ret
+            return self._owner.stackdumps.get(self.id)
 
         @property
         def simplified_stackdump(self):
-            ret = None
-            for st in self._owner.stackdumps:
-                if st.threadid == self.id and st.simplified:
-                    ret = st
-                    break
-            return ret
+            return self._owner.stackdumps.get(self.id, simplified=True)
 
-    class ProxyObject(object):
-        def __init__(self, report, field_name):
-            object.__setattr__(self, '_report', report)
-            object.__setattr__(self, '_field_name', field_name)
-            object.__setattr__(self, '_real_object', None)
+    class StackDumpList(MiniDumpEntity):
+        def __init__(self, owner):
+            super(MiniDumpWrapper.StackDumpList, self).__init__(owner)
+            self._list = []
+            self._by_thread = {}
+            self._exception = None
 
-        def __getattr__(self, key):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            if self._real_object is None:
-                return None
-            return getattr(self._real_object, key)
+        def append(self, dump):
+            self._list.append(dump)
+            self._by_thread.setdefault((dump.threadid, bool(dump.simplified)), dump)
+            if dump.exception and self._exception is None:
+                self._exception = dump
 
-        def __setattr__(self, key, value):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            if self._real_object is None:
-                return None
-            return setattr(self._real_object, key, value)
+        def get(self, threadid, simplified=False, default=None):
+            return self._by_thread.get((threadid, simplified), default)
 
         def __iter__(self):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            if self._real_object is None:
-                return None
-            return iter(self._real_object)
-
-        def __nonzero__(self):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            if self._real_object is None:
-                return False
-            return bool(self._real_object)
+            return iter(self._list)
 
         def __len__(self):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            if self._real_object is None:
-                return None
-            if hasattr(self._real_object, '__len__'):
-                return len(self._real_object)
-            else:
-                return 0
+            return len(self._list)
+
+        def _lookup(self, key):
+            if isinstance(key, int):
+                return self._by_thread.get((key, False))
+            elif key == 'exception':
+                return self._exception
+            return None
+
+        def __contains__(self, key):
+            return self._lookup(key) is not None
+
+        def __getitem__(self, key):
+            ret = self._lookup(key)
+            if ret is None:
+                raise KeyError(key)
+            return ret
+
+    class StackDump(MiniDumpEntity):
+        def __init__(self, owner, threadid, frames, exception):
+            super(MiniDumpWrapper.StackDump, self).__init__(owner)
+            self.threadid = threadid
+            self.simplified = False
+            self.exception = exception
+            self.callstack = []
+            for num, frm in enumerate(frames):
+                retaddr = frames[num + 1].addr if num + 1 < len(frames) else None
+                self.callstack.append(MiniDumpWrapper.StackFrame(owner, num, frm, retaddr))
+
+        @property
+        def thread(self):
+            for t in self._owner.threads:
+                if t.id == self.threadid:
+                    return t
+            return None
+
+        @property
+        def involved_modules(self):
+            ret = []
+            for frm in self.callstack:
+                if frm.module and frm.module not in ret:
+                    ret.append(frm.module)
+            return ret
+
+        @property
+        def top(self):
+            return self.callstack[0] if self.callstack else None
+
+    class StackFrame(MiniDumpEntity):
+        def __init__(self, owner, num, frame, retaddr):
+            super(MiniDumpWrapper.StackFrame, self).__init__(owner)
+            module, offset = owner.resolve_address(frame.addr)
+            self.num = num
+            self.addr = frame.addr
+            self.retaddr = retaddr
+            self.params = []
+            self.infosrc = None
+            self.trust_level = frame.trust_level
+            self.module = module.basename if module is not None else None
+            self.module_base = module.base if module is not None else None
+            self.function = None
+            self.funcoff = None
+            self.source = None
+            self.source_url = None
+            self.line = None
+            self.lineoff = None
+
     @property
     def crash_info(self):
         #if self._crash_info is None:
         #    self._crash_info = MiniDumpWrapper.CrashInfo(self)
         return self._crash_info
 
-    @property
+    @_wrapper_section()
     def system_info(self):
         if self._system_info is None:
             self._system_info = MiniDumpWrapper.SystemInfo(self)
@@ -1285,31 +1555,31 @@ class MiniDumpWrapper(object):
             self._tzinfo = FixedOffset(offset_hours=int(offset / 60), offset_minutes=int(offset % 60), name='%i' % offset)
         return self._tzinfo
 
-    @property
+    @_wrapper_section()
     def timezone_info(self):
         if self._tz is None and self._md.misc_info:
             self._tz = MiniDumpWrapper.TimezoneInfo(self)
         return self._tz
 
-    @property
+    @_wrapper_section()
     def misc_info(self):
         if self._misc_info is None and self._md.misc_info:
             self._misc_info = MiniDumpWrapper.MiscInfo(self)
         return self._misc_info
 
-    @property
+    @_wrapper_section()
     def exception(self):
         if self._exception is None and self._md.exception_info:
             self._exception = MiniDumpWrapper.Exception(self)
         return self._exception
 
-    @property
+    @_wrapper_section()
     def assertion(self):
         if self._assertion is None and self._md.assertion_info:
             self._assertion = MiniDumpWrapper.Assertion(self)
         return self._assertion
 
-    @property
+    @_wrapper_section(list)
     def modules(self):
         if self._modules is None:
             self._modules = []
@@ -1319,6 +1589,19 @@ class MiniDumpWrapper(object):
         return self._modules
 
     @property
+    def module_index(self):
+        if self._module_index is None:
+            self._module_index = ModuleIndex(self.modules)
+        return self._module_index
+
+    def resolve_address(self, addr):
+        """
+        Returns the module containing addr and the offset of addr within
+        the module or (None, None).
+        """
+        return self.module_index.resolve(addr)
+
+    @_wrapper_section(list)
     def threads(self):
         if self._threads is None:
             self._threads = []
@@ -1331,26 +1614,84 @@ class MiniDumpWrapper(object):
                 self._threads.append(t)
         return self._threads
 
-    @property
+    @_wrapper_section()
     def stackdumps(self):
         if self._stackdumps is None:
-            self._stackdumps = []
+            # without an XML report the stacks are scanned for return
+            # addresses, see stackscan
+            self._stackdumps = MiniDumpWrapper.StackDumpList(self)
+            exception = self._md.exception_info
+            frames_per_thread = scan_minidump(self._md, self.module_index)
+            for thread in self._md.threads:
+                frames = frames_per_thread.get(thread.ThreadId)
+                if frames:
+                    is_exception = exception is not None and exception.ThreadId == thread.ThreadId
+                    self._stackdumps.append(MiniDumpWrapper.StackDump(self, thread.ThreadId, frames, is_exception))
         return self._stackdumps
 
 
-    @property
+    @_wrapper_section()
     def fast_protect_version_info(self):
         if self._fast_protect_version_info is None and self._md.fast_protect_version_info:
             self._fast_protect_version_info = self._md.fast_protect_version_info
         return self._fast_protect_version_info
 
 
-    @property
+    @_wrapper_section()
     def fast_protect_system_info(self):
         if self._fast_protect_system_info is None and self._md.fast_protect_system_info:
             self._fast_protect_system_info = self._md.fast_protect_system_info
         return self._fast_protect_system_info
 
+    @_wrapper_section()
+    def linux_cpu_info(self):
+        if self._linux_cpu_info is None and self._md.linux_cpu_info is not None:
+            self._linux_cpu_info = parse_cpu_info(self._md.linux_cpu_info)
+        return self._linux_cpu_info
+
+    @_wrapper_section()
+    def linux_proc_status(self):
+        if self._linux_proc_status is None and self._md.linux_proc_status is not None:
+            self._linux_proc_status = parse_key_value(self._md.linux_proc_status, ':')
+        return self._linux_proc_status
+
+    @_wrapper_section()
+    def linux_lsb_release(self):
+        if self._linux_lsb_release is None and self._md.linux_lsb_release is not None:
+            self._linux_lsb_release = parse_key_value(self._md.linux_lsb_release, '=')
+        return self._linux_lsb_release
+
+    @_wrapper_section()
+    def linux_cmd_line(self):
+        if self._linux_cmd_line is None and self._md.linux_cmd_line is not None:
+            self._linux_cmd_line = parse_nul_separated(self._md.linux_cmd_line)
+        return self._linux_cmd_line
+
+    @_wrapper_section()
+    def linux_environ(self):
+        if self._linux_environ is None and self._md.linux_environ is not None:
+            self._linux_environ = parse_environ(self._md.linux_environ)
+        return self._linux_environ
+
+    @_wrapper_section()
+    def linux_auxv(self):
+        return self._md.linux_auxv
+
+    @_wrapper_section()
+    def linux_maps(self):
+        return self._md.linux_maps
+
+    @_wrapper_section()
+    def linux_dso_debug(self):
+        return self._md.linux_dso_debug
+
+    def find_mapping(self, addr):
+        """
+        Returns the entry of /proc/<pid>/maps containing addr or None.
+        """
+        maps = self._md.linux_maps
+        return maps.find(addr) if maps is not None else None
+
     @property
     def platform_type(self):
         s = self.system_info
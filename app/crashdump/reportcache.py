@@ -0,0 +1,121 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import os
+import mmap
+import struct
+import marshal
+import tempfile
+
+# The sidecar cache of a report file is stored next to it and contains the
+# parsed values of each section as a separate marshal blob, so a section
+# can be loaded without touching the others. The header holds the size and
+# modification time of the report file and the parser version; the cache is
+# ignored if any of them differs. marshal is used because it is the fastest
+# serializer for the builtin types of the values. Like pickle it is not
+# secure against maliciously constructed data; a cache file is only loaded
+# if its header matches the size and the modification time (ns) of the
+# report file on the server, which a client uploading files into the
+# dumpdata directory can not know in advance.
+# Binary data such as the memory blocks is stored as separate raw blobs
+# named by their number with a leading @ and read only when it is accessed.
+
+REPORT_CACHE_MAGIC = b'XRCC'
+REPORT_CACHE_SUFFIX = '.cache'
+
+# magic, parser version, report file size, report file mtime (ns), number of sections
+_header = struct.Struct('<4sIQQI')
+# section name, offset, size
+_index_entry = struct.Struct('<32sQQ')
+
+def cache_filename(filename):
+    return filename + REPORT_CACHE_SUFFIX
+
+def _file_key(filename):
+    st = os.stat(filename)
+    return st.st_size, st.st_mtime_ns
+
+class ReportCache(object):
+    def __init__(self, filename, data, index):
+        self._filename = filename
+        self._data = data
+        self._index = index
+
+    @staticmethod
+    def open(filename, version):
+        """
+        Returns the ReportCache of the given report file or None if there is
+        no cache or if it is outdated.
+        """
+        try:
+            size, mtime = _file_key(filename)
+            with open(cache_filename(filename), 'rb') as f:
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            # ValueError for an empty file
+            return None
+        data = memoryview(data)
+        if len(data) < _header.size:
+            return None
+        magic, cache_version, cache_size, cache_mtime, num_sections = _header.unpack_from(data)
+        if magic != REPORT_CACHE_MAGIC or cache_version != version or cache_size != size or cache_mtime != mtime:
+            return None
+        if len(data) < _header.size + num_sections * _index_entry.size:
+            return None
+        index = {}
+        for (name, offset, length) in _index_entry.iter_unpack(data[_header.size:_header.size + num_sections * _index_entry.size]):
+            if offset + length > len(data):
+                return None
+            index[name.rstrip(b'\0').decode('ascii')] = (offset, length)
+        return ReportCache(filename, data, index)
+
+    def __contains__(self, name):
+        return name in self._index
+
+    def load(self, name):
+        """
+        Returns the values of the given section. Raises KeyError if the
+        section is not in the cache and ValueError if it is damaged.
+        """
+        offset, length = self._index[name]
+        try:
+            return marshal.loads(self._data[offset:offset + length])
+        except (EOFError, TypeError) as e:
+            raise ValueError('Damaged section %s in %s: %s' % (name, cache_filename(self._filename), e))
+
+    def load_blob(self, num):
+        """
+        Returns the data of the given blob. Raises KeyError if the blob is
+        not in the cache.
+        """
+        offset, length = self._index['@%i' % num]
+        return bytes(self._data[offset:offset + length])
+
+def write_report_cache(filename, version, sections, blobs=None):
+    """
+    Write the cache of the given report file with the values of the
+    sections in the dict sections and the binary data in the list blobs,
+    see ReportCache.load_blob. The file is replaced atomically, so
+    concurrent readers see either the old or the new cache.
+    """
+    size, mtime = _file_key(filename)
+    blobs = [(name.encode('ascii'), marshal.dumps(values)) for (name, values) in sorted(sections.items())] + \
+            [(('@%i' % num).encode('ascii'), bytes(data)) for (num, data) in enumerate(blobs or [])]
+    offset = _header.size + len(blobs) * _index_entry.size
+    parts = [_header.pack(REPORT_CACHE_MAGIC, version, size, mtime, len(blobs))]
+    for (name, blob) in blobs:
+        parts.append(_index_entry.pack(name, offset, len(blob)))
+        offset += len(blob)
+    parts.extend([blob for (name, blob) in blobs])
+
+    dest = cache_filename(filename)
+    fd, tmpname = tempfile.mkstemp(prefix='.', suffix=REPORT_CACHE_SUFFIX, dir=os.path.dirname(dest) or '.')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(b''.join(parts))
+        os.chmod(tmpname, 0o644)
+        os.replace(tmpname, dest)
+    except:
+        os.unlink(tmpname)
+        raise
@@ -0,0 +1,141 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import sys
+import re
+import hashlib
+
+# number of stack frames which make up a crash signature
+SIGNATURE_FRAMES = 5
+
+_re_whitespace = re.compile(r'\s+')
+_re_offset = re.compile(r'\s*\+\s*0x[0-9a-fA-F]+$')
+_re_address = re.compile(r'0x[0-9a-fA-F]+')
+# compiler generated unique ids, e.g. <lambda_1b7e5f6a2c9d4e1f>
+_re_lambda_id = re.compile(r'<lambda_[0-9a-fA-F]+>')
+# GUIDs and addresses without 0x prefix (8 or 16 hex digits, at least one
+# of them a decimal digit so words like deadbeef or facade are kept)
+_re_unique_id = re.compile(r'\b(?:[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}'
+                           r'|(?=[a-fA-F]*[0-9])[0-9a-fA-F]{8}(?:[0-9a-fA-F]{8})?)\b')
+
+def _strip_parameters(function):
+    # remove the parameter list (and trailing qualifiers like const) of a
+    # C++ function name, template arguments with parentheses are kept
+    end = function.rfind(')')
+    if end < 0:
+        return function
+    depth = 0
+    for i in range(end, -1, -1):
+        c = function[i]
+        if c == ')':
+            depth += 1
+        elif c == '(':
+            depth -= 1
+            if depth == 0:
+                if i == 0:
+                    return function
+                return function[:i].rstrip()
+    return function
+
+def normalize_function(function):
+    if not function:
+        return None
+    ret = _re_whitespace.sub(' ', str(function).strip())
+    ret = _re_offset.sub('', ret)
+    ret = _strip_parameters(ret)
+    ret = _re_address.sub('?', ret)
+    ret = _re_lambda_id.sub('<lambda_?>', ret)
+    ret = _re_unique_id.sub('?', ret)
+    return ret if ret else None
+
+def normalize_module(module):
+    if not module:
+        return None
+    name = str(module)
+    idx = max(name.rfind('/'), name.rfind('\\'))
+    if idx >= 0:
+        name = name[idx+1:]
+    # module names on Windows are case-insensitive
+    return name.lower() if name else None
+
+def normalize_frame(module, function):
+    m = normalize_module(module)
+    f = normalize_function(function)
+    if m and f:
+        return m + '!' + f
+    elif f:
+        return f
+    elif m:
+        return m + '!?'
+    else:
+        return '?'
+
+def compute_signature(frames, fallback_functions=None, max_frames=SIGNATURE_FRAMES):
+    """
+    Returns the signature for the given list of (module, function) tuples of
+    the crashing thread, starting with the top frame. The fallback functions
+    (e.g. first_useful_functions from the simplified info) are used if none
+    of the frames has any information.
+    """
+    parts = [normalize_frame(m, f) for (m, f) in frames[:max_frames]] if frames else []
+    if not [p for p in parts if p != '?']:
+        parts = []
+        if fallback_functions:
+            for f in fallback_functions:
+                f = normalize_function(f)
+                if f:
+                    parts.append(f)
+                if len(parts) >= max_frames:
+                    break
+    return ' | '.join(parts) if parts else None
+
+def signature_hash(signature):
+    return hashlib.sha1(signature.encode('utf-8')).hexdigest()
+
+def exception_stackdump(report):
+    """
+    Returns the (not simplified) stack dump of the faulting thread of the
+    given XMLReport or MiniDumpWrapper, or None.
+    """
+    exception = report.exception
+    stackdumps = report.stackdumps
+    if not stackdumps:
+        return None
+    if exception is not None:
+        for st in stackdumps:
+            if st.threadid == exception.threadid and not st.simplified:
+                return st
+    return stackdumps['exception'] if 'exception' in stackdumps else None
+
+def frame_module(report, frm):
+    """
+    Returns the module name and base address of the given stack frame,
+    frames without module information are resolved by their address.
+    """
+    if frm.module:
+        return frm.module, frm.module_base
+    module, offset = report.resolve_address(frm.addr)
+    if module is None:
+        return None, frm.module_base
+    return module.basename or module.name, module.base
+
+def report_signature(report):
+    """
+    Returns the signature of the crash of the given XMLReport or
+    MiniDumpWrapper.
+    """
+    signature_frames = []
+    stackdump = exception_stackdump(report)
+    if stackdump is not None:
+        signature_frames = [(frame_module(report, frm)[0], frm.function) for frm in stackdump.callstack]
+    simplified_info = getattr(report, 'simplified_info', None)
+    return compute_signature(signature_frames, simplified_info.first_useful_functions if simplified_info is not None else None)
+
+if __name__ == '__main__':
+    from crashdump.xmlreport import XMLReport
+    if len(sys.argv) < 2:
+        print('No crash report XML file(s) specified')
+        sys.exit(1)
+    for f in sys.argv[1:]:
+        print('%s: %s' % (f, report_signature(XMLReport(f))))
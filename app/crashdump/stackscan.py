@@ -0,0 +1,124 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import time
+import struct
+import threading
+from collections import OrderedDict
+
+# trust levels as used by the XML reports, see format_trust_level
+TRUST_LEVEL_SCAN = 1
+TRUST_LEVEL_IP = 6
+
+# maximum number of frames per thread
+SCAN_MAX_FRAMES = 64
+# maximum number of bytes of the stack of each thread which are scanned
+SCAN_MAX_STACK_SIZE = 256 * 1024
+# maximum time in seconds to scan all threads of a minidump
+SCAN_TIME_BUDGET = 2.0
+# number of minidumps of which the scanned frames are kept
+SCAN_CACHE_SIZE = 64
+
+# (instruction pointer, stack pointer, link register, pointer size)
+_registers_per_architecture = {
+    'x86': ('Eip', 'Esp', None, 4),
+    'amd64': ('Rip', 'Rsp', None, 8),
+    'arm32': ('Pc', 'Sp', 'Lr', 4),
+    }
+
+class ScannedFrame(object):
+    __slots__ = ('addr', 'sp', 'trust_level')
+
+    def __init__(self, addr, sp, trust_level):
+        self.addr = addr
+        self.sp = sp
+        self.trust_level = trust_level
+
+def scan_stack(architecture, context, stack, stack_start, module_index, max_frames=SCAN_MAX_FRAMES,
+               max_stack_size=SCAN_MAX_STACK_SIZE, deadline=None):
+    """
+    Returns the list of ScannedFrame of a thread with the given register
+    context. The first frame is the instruction pointer of the context,
+    the following ones are all values on the stack, starting at the stack
+    pointer, which point into one of the modules (i.e. candidate return
+    addresses). The scan stops at max_frames, after max_stack_size bytes
+    or at the deadline (time.monotonic()).
+    """
+    if architecture not in _registers_per_architecture or context is None:
+        return []
+    ip_reg, sp_reg, lr_reg, pointer_size = _registers_per_architecture[architecture]
+    ip = getattr(context, ip_reg)
+    sp = getattr(context, sp_reg)
+    frames = [ScannedFrame(ip, sp, TRUST_LEVEL_IP)]
+    if lr_reg is not None:
+        lr = getattr(context, lr_reg)
+        if lr != ip and lr in module_index:
+            frames.append(ScannedFrame(lr, sp, TRUST_LEVEL_SCAN))
+    span = module_index.span()
+    if stack is None or span is None:
+        return frames
+
+    offset = sp - stack_start
+    if offset < 0 or offset >= len(stack):
+        return frames
+    offset -= offset % pointer_size
+    end = min(len(stack), offset + max_stack_size)
+    end -= (end - offset) % pointer_size
+    # cheap range check before the lookup in the module index
+    first, last = span
+    word = struct.Struct('<Q' if pointer_size == 8 else '<I')
+    slot = stack_start + offset
+    for n, (value,) in enumerate(word.iter_unpack(stack[offset:end])):
+        slot += pointer_size
+        if first <= value < last and value in module_index:
+            frames.append(ScannedFrame(value, slot, TRUST_LEVEL_SCAN))
+            if len(frames) >= max_frames:
+                break
+        if deadline is not None and n % 4096 == 0 and time.monotonic() > deadline:
+            break
+    return frames
+
+_cache = OrderedDict()
+_cache_lock = threading.Lock()
+
+def _thread_stack(minidump, thread):
+    desc = thread.Stack
+    if desc.Memory.Rva:
+        return minidump._view(desc.Memory.Rva, desc.Memory.DataSize)
+    return minidump.read_memory(desc.StartOfMemoryRange, desc.Memory.DataSize)
+
+def scan_minidump(minidump, module_index, max_frames=SCAN_MAX_FRAMES, time_budget=SCAN_TIME_BUDGET):
+    """
+    Returns a dict with the list of ScannedFrame for each thread id of the
+    minidump. The exception thread uses the context of the exception. The
+    result is cached by the file name, size and modification time of the
+    minidump.
+    """
+    key = minidump.file_key
+    with _cache_lock:
+        if key in _cache:
+            _cache.move_to_end(key)
+            return _cache[key]
+
+    architecture = minidump.architecture
+    exception = minidump.exception_info
+    deadline = time.monotonic() + time_budget
+    ret = {}
+    for thread in minidump.threads:
+        if exception is not None and exception.ThreadId == thread.ThreadId and minidump.context is not None:
+            context = minidump.context
+        else:
+            try:
+                context = thread.getContext(architecture)
+            except Exception:
+                context = None
+        ret[thread.ThreadId] = scan_stack(architecture, context, _thread_stack(minidump, thread),
+                                          thread.Stack.StartOfMemoryRange, module_index,
+                                          max_frames=max_frames, deadline=deadline)
+
+    with _cache_lock:
+        _cache[key] = ret
+        while len(_cache) > SCAN_CACHE_SIZE:
+            _cache.popitem(last=False)
+    return ret
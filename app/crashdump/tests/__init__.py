@@ -4,7 +4,7 @@
 
 import unittest
 
-from crashdump.tests import api, web_ui, model
+from crashdump.tests import api, web_ui, model, minidump, stackscan, xmlreport, addressmap, signature
 
 
 def test_suite():
@@ -12,6 +12,11 @@ def test_suite():
     suite.addTest(api.test_suite())
     suite.addTest(web_ui.test_suite())
     suite.addTest(model.test_suite())
+    suite.addTest(minidump.test_suite())
+    suite.addTest(stackscan.test_suite())
+    suite.addTest(xmlreport.test_suite())
+    suite.addTest(addressmap.test_suite())
+    suite.addTest(signature.test_suite())
 
     return suite
 
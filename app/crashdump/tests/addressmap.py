@@ -0,0 +1,77 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import random
+import unittest
+
+from crashdump.addressmap import AddressMap
+
+
+class AddressMapTestCase(unittest.TestCase):
+    def test_disjoint(self):
+        m = AddressMap([(0x3000, 0x4000, 'c'), (0x1000, 0x2000, 'a'), (0x2000, 0x2800, 'b')])
+        self.assertEqual([m.find(addr) for addr in (0xfff, 0x1000, 0x1fff, 0x2000, 0x27ff, 0x2800, 0x3000, 0x4000)],
+                         [None, 'a', 'a', 'b', 'b', None, 'c', None])
+        self.assertEqual(m.span(), (0x1000, 0x4000))
+        self.assertEqual(m.overlapping(0x1800, 0x3001), ['a', 'b', 'c'])
+        self.assertEqual(m.overlapping(0x2800, 0x3000), [])
+
+    def test_nested(self):
+        # a region containing two memory lists, the outer range is given
+        # first and wins like in a scan over the items
+        m = AddressMap([(0x1000, 0x9000, 'outer'), (0x2000, 0x3000, 'inner1'), (0x4000, 0x5000, 'inner2')])
+        self.assertEqual([m.find(addr) for addr in (0x1000, 0x2000, 0x4fff, 0x6000, 0x9000)],
+                         ['outer', 'outer', 'outer', 'outer', None])
+        m = AddressMap([(0x2000, 0x3000, 'inner1'), (0x4000, 0x5000, 'inner2'), (0x1000, 0x9000, 'outer')])
+        self.assertEqual([m.find(addr) for addr in (0x1000, 0x2000, 0x3000, 0x4fff, 0x6000, 0x9000)],
+                         ['outer', 'inner1', 'outer', 'inner2', 'outer', None])
+        self.assertEqual(m.span(), (0x1000, 0x9000))
+        # the later range starting before the address is not the one
+        # containing it
+        self.assertEqual(m.overlapping(0x6000, 0x7000), ['outer'])
+        self.assertEqual(m.overlapping(0x2800, 0x4001), ['outer', 'inner1', 'inner2'])
+
+    def test_overlapping(self):
+        m = AddressMap([(0x1000, 0x3000, 'a'), (0x2000, 0x4000, 'b'), (0x2000, 0x2100, 'c')])
+        self.assertEqual([m.find(addr) for addr in (0x1fff, 0x2000, 0x2fff, 0x3000, 0x3fff)], ['a', 'a', 'a', 'b', 'b'])
+        self.assertIn(0x3fff, m)
+        self.assertNotIn(0x4000, m)
+        self.assertNotIn(None, m)
+        self.assertEqual(m.overlapping(0x3000, 0x3001), ['b'])
+        self.assertEqual(m.overlapping(0x2050, 0x2060), ['a', 'b', 'c'])
+
+    def test_empty(self):
+        m = AddressMap()
+        self.assertIsNone(m.find(0x1000))
+        self.assertIsNone(m.span())
+        self.assertEqual(m.overlapping(0, 0x1000), [])
+        m = AddressMap([(0x1000, 0x1000, 'empty')])
+        self.assertIsNone(m.find(0x1000))
+
+    def test_random(self):
+        # compare with a scan over the items
+        rnd = random.Random(1)
+        for i in range(200):
+            items = []
+            for j in range(rnd.randint(1, 20)):
+                base = rnd.randint(0, 100)
+                items.append((base, base + rnd.randint(0, 40), j))
+            m = AddressMap(items)
+            for addr in range(0, 150):
+                expected = [obj for (base, end, obj) in items if base <= addr < end]
+                self.assertEqual(m.find(addr), expected[0] if expected else None)
+            start = rnd.randint(0, 120)
+            end = start + rnd.randint(1, 30)
+            expected = [obj for (base, e, obj) in sorted(items, key=lambda item: item[0]) if base < end and e > start]
+            self.assertEqual(m.overlapping(start, end), expected)
+
+
+def test_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(AddressMapTestCase))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,247 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import os
+import struct
+import tempfile
+import unittest
+
+from crashdump.minidump import MiniDump, MiniDumpWrapper, MD_RAW_DEBUG32, MD_RAW_DEBUG64, MD_RAW_LINK_MAP32, MD_RAW_LINK_MAP64
+from crashdump.linux_streams import parse_maps, parse_key_value, parse_cpu_info, parse_environ, parse_auxv
+
+MD_LINUX_CPU_INFO = 0x47670003
+MD_LINUX_PROC_STATUS = 0x47670004
+MD_LINUX_LSB_RELEASE = 0x47670005
+MD_LINUX_CMD_LINE = 0x47670006
+MD_LINUX_ENVIRON = 0x47670007
+MD_LINUX_AUXV = 0x47670008
+MD_LINUX_MAPS = 0x47670009
+MD_LINUX_DSO_DEBUG = 0x4767000A
+PROCESSOR_ARCHITECTURE_INTEL = 0
+PROCESSOR_ARCHITECTURE_AMD64 = 9
+
+def _minidump_string(s):
+    data = s.encode('utf-16-le')
+    return struct.pack('<I', len(data)) + data
+
+def _build_minidump(architecture, link_maps, streams=()):
+    """
+    Returns a minidump with a system info and a DSO debug stream with the
+    given (addr, name, ld) link maps, laid out like breakpad writes them,
+    followed by the given (stream type, data) streams.
+    """
+    is_64_bit = architecture == PROCESSOR_ARCHITECTURE_AMD64
+    header_size = 32
+    directory_size = (2 + len(streams)) * 12
+    data = bytearray(header_size + directory_size)
+
+    def append(chunk):
+        rva = len(data)
+        data.extend(chunk)
+        return rva
+
+    csd_rva = append(_minidump_string(''))
+    system_info = struct.pack('<HHHBBIIIIIHH12sIII', architecture, 6, 0, 4, 1, 4, 15, 0, 0x8201, csd_rva, 0, 0, b'GenuineIntel', 0, 0, 0)
+    system_info_rva = append(system_info)
+
+    names = [append(_minidump_string(name)) for (addr, name, ld) in link_maps]
+    if is_64_bit:
+        # MDRawLinkMap64 and MDRawDebug64 are naturally aligned
+        entries = [struct.pack('<QIIQ', addr, name_rva, 0, ld) for ((addr, name, ld), name_rva) in zip(link_maps, names)]
+    else:
+        entries = [struct.pack('<III', addr, name_rva, ld) for ((addr, name, ld), name_rva) in zip(link_maps, names)]
+    map_rva = append(b''.join(entries))
+    if is_64_bit:
+        debug = struct.pack('<IIIIQQQ', 1, map_rva, len(link_maps), 0, 0x555555756000, 0x7f0000001000, 0x555555754de8)
+    else:
+        debug = struct.pack('<IIIIII', 1, map_rva, len(link_maps), 0x56556000, 0xf7fd0000, 0x56555ef0)
+    debug_rva = append(debug)
+
+    struct.pack_into('<4sIIIIIQ', data, 0, b'MDMP', 0xa793, 2 + len(streams), header_size, 0, 0, 0)
+    struct.pack_into('<III', data, header_size, 7, len(system_info), system_info_rva)
+    struct.pack_into('<III', data, header_size + 12, MD_LINUX_DSO_DEBUG, len(debug), debug_rva)
+    for (i, (stream_type, stream)) in enumerate(streams):
+        struct.pack_into('<III', data, header_size + (2 + i) * 12, stream_type, len(stream), append(stream))
+    return bytes(data)
+
+
+class _MiniDumpTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        for f in os.listdir(self.tmpdir):
+            os.unlink(os.path.join(self.tmpdir, f))
+        os.rmdir(self.tmpdir)
+
+    def _open(self, architecture, link_maps, streams=()):
+        filename = os.path.join(self.tmpdir, 'test.dmp')
+        with open(filename, 'wb') as f:
+            f.write(_build_minidump(architecture, link_maps, streams))
+        md = MiniDump(filename)
+        self.addCleanup(md.close)
+        return md
+
+
+class MiniDumpDSODebugTestCase(_MiniDumpTestCase):
+
+    def test_structure_sizes(self):
+        self.assertEqual(len(MD_RAW_LINK_MAP32.__new__(MD_RAW_LINK_MAP32)), 12)
+        self.assertEqual(len(MD_RAW_LINK_MAP64.__new__(MD_RAW_LINK_MAP64)), 24)
+        self.assertEqual(len(MD_RAW_DEBUG32.__new__(MD_RAW_DEBUG32)), 24)
+        self.assertEqual(len(MD_RAW_DEBUG64.__new__(MD_RAW_DEBUG64)), 40)
+
+    def test_dso_debug_64(self):
+        link_maps = [(0, '', 0x7ffff7ffd000),
+                     (0x7ffff7fc4000, 'linux-vdso.so.1', 0x7ffff7fc4f00),
+                     (0x7ffff7dd0000, '/lib/x86_64-linux-gnu/libc.so.6', 0x7ffff7fbd8c0)]
+        md = self._open(PROCESSOR_ARCHITECTURE_AMD64, link_maps)
+        debug = md.linux_dso_debug
+        self.assertEqual(debug.dso_count, 3)
+        self.assertEqual(debug.brk, 0x555555756000)
+        self.assertEqual(debug.ldbase, 0x7f0000001000)
+        self.assertEqual(debug.dynamic, 0x555555754de8)
+        self.assertEqual([(lm.addr, lm.Name, lm.ld) for lm in debug.LinkMaps], link_maps)
+
+    def test_dso_debug_32(self):
+        link_maps = [(0, '', 0xf7ffd000),
+                     (0xf7fc4000, '/lib/i386-linux-gnu/libc.so.6', 0xf7fbd8c0)]
+        md = self._open(PROCESSOR_ARCHITECTURE_INTEL, link_maps)
+        debug = md.linux_dso_debug
+        self.assertEqual(debug.dso_count, 2)
+        self.assertEqual(debug.brk, 0x56556000)
+        self.assertEqual(debug.dynamic, 0x56555ef0)
+        self.assertEqual([(lm.addr, lm.Name, lm.ld) for lm in debug.LinkMaps], link_maps)
+
+
+_MAPS = (b'555555554000-555555556000 r--p 00000000 08:01 1048602                    /usr/bin/app\n'
+         b'555555556000-55555555a000 r-xp 00002000 08:01 1048602                    /usr/bin/app\n'
+         b'555555756000-555555777000 rw-p 00000000 00:00 0                          [heap]\n'
+         b'7ffff7dd0000-7ffff7df8000 r--p 00000000 08:01 2359325                    /lib/x86_64-linux-gnu/libc.so.6\n'
+         b'7ffff7fc0000-7ffff7fc4000 rw-p 00000000 00:00 0 \n'
+         b'7ffffffde000-7ffffffff000 rw-p 00000000 00:00 0                          [stack]\n')
+
+_CPU_INFO = (b'processor\t: 0\nvendor_id\t: GenuineIntel\nmodel name\t: Intel(R) Core(TM) i7-8550U CPU @ 1.80GHz\nflags\t\t: fpu vme\n\n'
+             b'processor\t: 1\nvendor_id\t: GenuineIntel\nmodel name\t: Intel(R) Core(TM) i7-8550U CPU @ 1.80GHz\nflags\t\t:\n\n')
+
+_LSB_RELEASE = (b'DISTRIB_ID=Ubuntu\nDISTRIB_RELEASE=22.04\nDISTRIB_CODENAME=jammy\n'
+                b'DISTRIB_DESCRIPTION="Ubuntu 22.04.3 LTS"\n')
+
+
+class LinuxStreamsTestCase(unittest.TestCase):
+    def test_parse_maps(self):
+        maps = parse_maps(memoryview(_MAPS))
+        self.assertEqual(len(maps), 6)
+        m = maps.find(0x555555557000)
+        self.assertEqual((m.base, m.end, m.perms, m.offset, m.dev, m.inode), (0x555555556000, 0x55555555a000, 'r-xp', 0x2000, '08:01', 1048602))
+        self.assertEqual((m.name, m.basename, m.size), ('/usr/bin/app', 'app', 0x4000))
+        # the mappings of a file share the name
+        self.assertIs(maps.find(0x555555554000).name, m.name)
+        self.assertEqual(maps.find(0x555555760000).name, '[heap]')
+        # anonymous mapping with trailing blank
+        anonymous = maps.find(0x7ffff7fc0000)
+        self.assertIsNone(anonymous.name)
+        self.assertIsNone(anonymous.basename)
+        self.assertIsNone(maps.find(0x7ffff7fc4000))
+        self.assertEqual(str(m), '555555556000-55555555a000 r-xp 00002000 08:01 1048602 /usr/bin/app')
+        self.assertEqual(len(parse_maps(b'')), 0)
+        self.assertEqual(len(parse_maps(b'garbage\n')), 0)
+
+    def test_parse_key_value(self):
+        status = parse_key_value(b'Name:\tapp\nState:\tS (sleeping)\nPid:\t4711\nGroups:\t\n')
+        self.assertEqual(status, {'Name': 'app', 'State': 'S (sleeping)', 'Pid': '4711', 'Groups': ''})
+        lsb_release = parse_key_value(memoryview(_LSB_RELEASE + b'# comment\n\nDISTRIB_X = \'quoted\'\n'), '=')
+        self.assertEqual(lsb_release, {'DISTRIB_ID': 'Ubuntu', 'DISTRIB_RELEASE': '22.04', 'DISTRIB_CODENAME': 'jammy',
+                                       'DISTRIB_DESCRIPTION': 'Ubuntu 22.04.3 LTS', 'DISTRIB_X': 'quoted'})
+        # a single quote character is kept
+        self.assertEqual(parse_key_value(b'A="\n', '='), {'A': '"'})
+
+    def test_parse_cpu_info(self):
+        cpus = parse_cpu_info(memoryview(_CPU_INFO))
+        self.assertEqual(len(cpus), 2)
+        self.assertEqual(cpus[0], {'processor': '0', 'vendor_id': 'GenuineIntel', 'model name': 'Intel(R) Core(TM) i7-8550U CPU @ 1.80GHz',
+                                   'flags': 'fpu vme'})
+        self.assertEqual((cpus[1]['processor'], cpus[1]['flags']), ('1', ''))
+        # ARM kernels list the processors without a common header
+        cpus = parse_cpu_info(b'processor\t: 0\nBogoMIPS\t: 38.40\n\nprocessor\t: 1\nBogoMIPS\t: 38.40\n\nHardware\t: BCM2835\n')
+        self.assertEqual([cpu['processor'] for cpu in cpus], ['0', '1'])
+        self.assertEqual(cpus[1]['Hardware'], 'BCM2835')
+        self.assertEqual(parse_cpu_info(b''), [])
+
+    def test_parse_environ(self):
+        environ = parse_environ(memoryview(b'HOME=/home/user\0PATH=/usr/bin:/bin\0EMPTY=\0OPTS=a=b\0NOVALUE\0\0'))
+        self.assertEqual(environ, {'HOME': '/home/user', 'PATH': '/usr/bin:/bin', 'EMPTY': '', 'OPTS': 'a=b', 'NOVALUE': ''})
+        self.assertEqual(parse_environ(b''), {})
+        self.assertEqual(parse_environ(b'LANG=de_DE.\xff\0')['LANG'], 'de_DE.\ufffd')
+
+    def test_parse_auxv(self):
+        entries = [(6, 0x1000), (33, 0x7ffff7fc1000), (9, 0x555555556040)]
+        data = b''.join([struct.pack('<QQ', t, v) for (t, v) in entries + [(0, 0), (7, 0xdead)]])
+        self.assertEqual(parse_auxv(memoryview(data), 8), entries)
+        entries = [(6, 0x1000), (9, 0x56556040)]
+        data = b''.join([struct.pack('<II', t, v) for (t, v) in entries])
+        # without AT_NULL and with a truncated entry at the end
+        self.assertEqual(parse_auxv(data + b'\x06\0', 4), entries)
+        self.assertEqual(parse_auxv(b'', 8), [])
+
+
+class MiniDumpLinuxStreamsTestCase(_MiniDumpTestCase):
+    def _streams(self, auxv):
+        return [(MD_LINUX_CPU_INFO, _CPU_INFO),
+                (MD_LINUX_PROC_STATUS, b'Name:\tapp\nPid:\t4711\n'),
+                (MD_LINUX_LSB_RELEASE, _LSB_RELEASE),
+                (MD_LINUX_CMD_LINE, b'/usr/bin/app\0--verbose\0'),
+                (MD_LINUX_ENVIRON, b'HOME=/home/user\0LANG=C\0'),
+                (MD_LINUX_AUXV, auxv),
+                (MD_LINUX_MAPS, _MAPS)]
+
+    def test_streams(self):
+        auxv = struct.pack('<QQQQ', 6, 0x1000, 0, 0)
+        md = self._open(PROCESSOR_ARCHITECTURE_AMD64, [], self._streams(auxv))
+        self.assertEqual(bytes(md.linux_lsb_release), _LSB_RELEASE)
+        self.assertEqual(md.linux_auxv, [(6, 0x1000)])
+        self.assertEqual(md.linux_maps.find(0x7ffff7dd1000).basename, 'libc.so.6')
+        wrapper = MiniDumpWrapper(md)
+        self.assertEqual(len(wrapper.linux_cpu_info), 2)
+        self.assertEqual(wrapper.linux_proc_status, {'Name': 'app', 'Pid': '4711'})
+        self.assertEqual(wrapper.linux_cmd_line, ['/usr/bin/app', '--verbose'])
+        self.assertEqual(wrapper.linux_environ, {'HOME': '/home/user', 'LANG': 'C'})
+        self.assertEqual(wrapper.find_mapping(0x7ffffffde000).name, '[stack]')
+        self.assertIsNone(wrapper.find_mapping(0x1000))
+
+    def test_auxv_32(self):
+        auxv = struct.pack('<IIII', 6, 0x1000, 0, 0)
+        md = self._open(PROCESSOR_ARCHITECTURE_INTEL, [], self._streams(auxv))
+        self.assertEqual(md.linux_auxv, [(6, 0x1000)])
+
+    def test_system_info(self):
+        md = self._open(PROCESSOR_ARCHITECTURE_AMD64, [], self._streams(b''))
+        system_info = MiniDumpWrapper(md).system_info
+        self.assertEqual(system_info.cpu_type, 'AMD64')
+        self.assertEqual(system_info.cpu_vendor, 'GenuineIntel')
+        self.assertEqual(system_info.cpu_name, 'Intel(R) Core(TM) i7-8550U CPU @ 1.80GHz')
+        self.assertEqual((system_info.distribution_id, system_info.distribution_release, system_info.distribution_codename,
+                          system_info.distribution_description), ('Ubuntu', '22.04', 'jammy', 'Ubuntu 22.04.3 LTS'))
+
+    def test_system_info_without_linux_streams(self):
+        md = self._open(PROCESSOR_ARCHITECTURE_AMD64, [])
+        wrapper = MiniDumpWrapper(md)
+        self.assertIsNone(wrapper.linux_cpu_info)
+        self.assertIsNone(wrapper.linux_maps)
+        system_info = wrapper.system_info
+        self.assertIsNone(system_info.cpu_name)
+        self.assertIsNone(system_info.distribution_id)
+        self.assertIsNone(system_info.distribution_description)
+
+
+def test_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(MiniDumpDSODebugTestCase))
+    suite.addTest(unittest.makeSuite(LinuxStreamsTestCase))
+    suite.addTest(unittest.makeSuite(MiniDumpLinuxStreamsTestCase))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
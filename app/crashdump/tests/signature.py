@@ -0,0 +1,52 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import unittest
+
+from crashdump.signature import normalize_function, normalize_module, normalize_frame, compute_signature
+
+
+class SignatureTestCase(unittest.TestCase):
+    def test_normalize_function(self):
+        self.assertEqual(normalize_function('ns::Foo::bar(int, const char *) const'), 'ns::Foo::bar')
+        self.assertEqual(normalize_function('std::function<void (int)>::operator()(int)'), 'std::function<void (int)>::operator()')
+        self.assertEqual(normalize_function('  main  +  0x1f'), 'main')
+        self.assertEqual(normalize_function('call_at_0x7ff700001010'), 'call_at_?')
+        self.assertIsNone(normalize_function(''))
+        self.assertIsNone(normalize_function(None))
+
+    def test_unique_ids(self):
+        self.assertEqual(normalize_function('Foo::<lambda_1b7e5f6a2c9d4e1f>::operator()(int)'), 'Foo::<lambda_?>::operator()')
+        self.assertEqual(normalize_function('`anonymous namespace\'::{12345678-9abc-def0-1234-56789abcdef0}::run'),
+                         '`anonymous namespace\'::{?}::run')
+        self.assertEqual(normalize_function('thunk 7ff70000 for foo'), 'thunk ? for foo')
+        self.assertEqual(normalize_function('thunk 00007ff700001010 for foo'), 'thunk ? for foo')
+        # hex-like names and digits inside identifiers are kept
+        for name in ['Decoder::deadbeefcafe', 'facade::Accessed', 'sha256_transform', 'md5_update_12345678',
+                     'Crc32Table12345678', 'parse_20240101']:
+            self.assertEqual(normalize_function(name), name)
+
+    def test_normalize_module(self):
+        self.assertEqual(normalize_module('C:\\Program Files\\App\\App.EXE'), 'app.exe')
+        self.assertEqual(normalize_module('/usr/lib/libfoo.so.1'), 'libfoo.so.1')
+        self.assertIsNone(normalize_module(None))
+        self.assertEqual(normalize_frame('app.exe', None), 'app.exe!?')
+        self.assertEqual(normalize_frame(None, None), '?')
+
+    def test_compute_signature(self):
+        frames = [('App.exe', 'crash(int)'), (None, 'caller'), (None, None)]
+        self.assertEqual(compute_signature(frames), 'app.exe!crash | caller | ?')
+        self.assertEqual(compute_signature(frames, max_frames=1), 'app.exe!crash')
+        self.assertEqual(compute_signature([(None, None)], ['first(void)', 'second']), 'first | second')
+        self.assertIsNone(compute_signature([], None))
+
+
+def test_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(SignatureTestCase))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
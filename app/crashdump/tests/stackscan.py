@@ -0,0 +1,87 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import time
+import struct
+import unittest
+
+from crashdump.addressmap import ModuleIndex
+from crashdump.stackscan import scan_stack, TRUST_LEVEL_IP, TRUST_LEVEL_SCAN
+
+
+class _Module(object):
+    def __init__(self, base, size):
+        self.base = base
+        self.size = size
+
+class _Context(object):
+    def __init__(self, **registers):
+        for (k, v) in registers.items():
+            setattr(self, k, v)
+
+
+class StackScanTestCase(unittest.TestCase):
+    def setUp(self):
+        self.module_index = ModuleIndex([_Module(0x400000, 0x10000), _Module(0x7f0000000000, 0x20000)])
+        self.stack_start = 0x7ffd0000
+
+    def _stack(self, fmt, values):
+        return b''.join([struct.pack(fmt, v) for v in values])
+
+    def test_amd64(self):
+        # return addresses into both modules between other values
+        values = [0, 0x400123, 0x7ffd1000, 0x12345678, 0x7f0000010000, 0x410000, 0x40fff0]
+        stack = self._stack('<Q', values)
+        context = _Context(Rip=0x400010, Rsp=self.stack_start)
+        frames = scan_stack('amd64', context, stack, self.stack_start, self.module_index)
+        self.assertEqual([f.addr for f in frames], [0x400010, 0x400123, 0x7f0000010000, 0x40fff0])
+        self.assertEqual([f.trust_level for f in frames], [TRUST_LEVEL_IP, TRUST_LEVEL_SCAN, TRUST_LEVEL_SCAN, TRUST_LEVEL_SCAN])
+        # stack pointer after the return address has been popped
+        self.assertEqual([f.sp for f in frames[1:]], [self.stack_start + 16, self.stack_start + 40, self.stack_start + 56])
+
+    def test_starts_at_stack_pointer(self):
+        values = [0x400100, 0x400200, 0x400300]
+        stack = self._stack('<I', values)
+        context = _Context(Eip=0x400000, Esp=self.stack_start + 6)
+        frames = scan_stack('x86', context, stack, self.stack_start, ModuleIndex([_Module(0x400000, 0x1000)]))
+        # the unaligned stack pointer is rounded down to the slot
+        self.assertEqual([f.addr for f in frames], [0x400000, 0x400200, 0x400300])
+
+    def test_arm32_link_register(self):
+        stack = self._stack('<I', [0x400200])
+        context = _Context(Pc=0x400000, Sp=self.stack_start, Lr=0x400100)
+        frames = scan_stack('arm32', context, stack, self.stack_start, ModuleIndex([_Module(0x400000, 0x1000)]))
+        self.assertEqual([f.addr for f in frames], [0x400000, 0x400100, 0x400200])
+
+    def test_limits(self):
+        values = [0x400000 + i for i in range(100)]
+        stack = self._stack('<Q', values)
+        context = _Context(Rip=0x400010, Rsp=self.stack_start)
+        frames = scan_stack('amd64', context, stack, self.stack_start, self.module_index, max_frames=10)
+        self.assertEqual(len(frames), 10)
+        frames = scan_stack('amd64', context, stack, self.stack_start, self.module_index, max_stack_size=8 * 5)
+        self.assertEqual([f.addr for f in frames[1:]], values[:5])
+        # an expired deadline stops after the first slot
+        frames = scan_stack('amd64', context, stack, self.stack_start, self.module_index, deadline=time.monotonic() - 1)
+        self.assertEqual(len(frames), 2)
+
+    def test_no_stack(self):
+        context = _Context(Rip=0x400010, Rsp=self.stack_start)
+        self.assertEqual([f.addr for f in scan_stack('amd64', context, None, self.stack_start, self.module_index)], [0x400010])
+        # stack pointer outside of the stack memory
+        stack = self._stack('<Q', [0x400100])
+        context = _Context(Rip=0x400010, Rsp=self.stack_start - 8)
+        self.assertEqual(len(scan_stack('amd64', context, stack, self.stack_start, self.module_index)), 1)
+        self.assertEqual(scan_stack('mips', context, stack, self.stack_start, self.module_index), [])
+        self.assertEqual(scan_stack('amd64', None, stack, self.stack_start, self.module_index), [])
+
+
+def test_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(StackScanTestCase))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
@@ -0,0 +1,210 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+# kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
+
+import os
+import base64
+import shutil
+import tempfile
+import unittest
+
+from crashdump.xmlreport import XMLReport, HexDumpMemoryBlock
+from crashdump.reportcache import cache_filename
+
+_memory = bytes(range(256)) * 4
+
+REPORT_XML = """<?xml version="1.0" encoding="UTF-8"?>
+<crash_dump>
+<uuid type="uuid">12345678-1234-1234-1234-123456789abc</uuid>
+<crash_timestamp type="QDateTime">2024-01-02 03:04:05</crash_timestamp>
+<application type="QString">C:/Program Files/App/app.exe</application>
+<symbol_directories type="QStringList"><item>C:/sym</item><item>D:/sym</item></symbol_directories>
+<environment type="QVariantMap"><item key="PATH" type="QString">C:/bin</item><item key="N" type="int">5</item></environment>
+<system_info>
+<platform_type type="QString">Windows NT</platform_type>
+<cpu_type type="QString">AMD64</cpu_type>
+<cpu_type_id type="int">9</cpu_type_id>
+<os_version_number type="uint">a000000000000</os_version_number>
+<os_build_number type="uint">4a61</os_build_number>
+</system_info>
+<file_info><log><message>
+<time type="QDateTime">2024-01-02 03:04:06</time>
+<text type="QString">loaded</text>
+</message></log></file_info>
+<exception>
+<threadid type="uint">1004</threadid>
+<code type="uint">c0000005</code>
+<address type="uint">7ff700001010</address>
+</exception>
+<modules>
+<module>
+<base type="uint">7ff700000000</base>
+<size type="uint">80000</size>
+<name type="QString">C:/App/app.exe</name>
+<file_version_number type="uint">1000200030004</file_version_number>
+</module>
+</modules>
+<threads>
+<thread>
+<id type="uint">1000</id>
+<name type="QString">main</name>
+<exception type="bool">false</exception>
+</thread>
+<thread>
+<id type="uint">1004</id>
+<name type="QString">worker</name>
+<exception type="bool">true</exception>
+</thread>
+</threads>
+<memory_info>
+<memory>
+<base_addr type="uint">10000000</base_addr>
+<size type="uint">10000</size>
+<usage>
+<threadid type="uint">1004</threadid>
+<usagetype type="int">1</usagetype>
+</usage>
+</memory>
+</memory_info>
+<memory_blocks>
+<memory_block>
+<num type="int">0</num>
+<base type="uint">10000000</base>
+<size type="uint">400</size>
+<memory type="QByteArray" encoding-type="base64">%s</memory>
+</memory_block>
+</memory_blocks>
+<stackdumps>
+<stackdump threadid="0x1004" simplified="false" exception="true">
+<frame>
+<num type="int">0</num>
+<addr type="uint">7ff700001010</addr>
+<module type="QString">app.exe</module>
+<function type="QString">main</function>
+<funcoff type="uint">10</funcoff>
+</frame>
+<frame>
+<num type="int">1</num>
+<addr type="uint">7ff700002000</addr>
+<module type="QString">app.exe</module>
+</frame>
+</stackdump>
+</stackdumps>
+<fast_protect_version_info>
+<product_name type="QString">App</product_name>
+<thread_name_tls_slot type="int">7</thread_name_tls_slot>
+</fast_protect_version_info>
+</crash_dump>
+""" % base64.b64encode(_memory).decode('ascii')
+
+def _plain(value):
+    # comparable representation of the values and entities of a report
+    if isinstance(value, HexDumpMemoryBlock):
+        return bytes(value.raw)
+    elif isinstance(value, XMLReport.StackDumpList):
+        return [_plain(v) for v in value]
+    elif isinstance(value, XMLReport.XMLReportEntity):
+        return dict([(k, _plain(v)) for (k, v) in value._attributes() if k[0] != '_'])
+    elif isinstance(value, list):
+        return [_plain(v) for v in value]
+    elif isinstance(value, dict):
+        return dict([(k, _plain(v)) for (k, v) in value.items()])
+    return value
+
+
+class XMLReportCacheTestCase(unittest.TestCase):
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.filename = os.path.join(self.tmpdir, 'report.xml')
+        with open(self.filename, 'w') as f:
+            f.write(REPORT_XML)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def _sections(self, report):
+        return dict([(field, _plain(getattr(report, field))) for field in XMLReport._cache_layout])
+
+    def test_round_trip(self):
+        expected = self._sections(XMLReport(self.filename))
+        self.assertEqual(len(expected['threads']), 2)
+        self.assertEqual(expected['memory_blocks'][0]['memory'], _memory)
+        self.assertIsNone(expected['assertion'])
+
+        XMLReport(self.filename).write_cache()
+        self.assertTrue(os.path.isfile(cache_filename(self.filename)))
+
+        report = XMLReport(self.filename)
+        self.assertIsNotNone(report._cache)
+        self.assertIsNone(report._xml)
+        self.assertEqual(self._sections(report), expected)
+        self.assertEqual(report._restored_sections, set(XMLReport._cache_layout))
+        # the indexes are built for the restored sections as well
+        self.assertEqual(report._get_thread(0x1004).name, 'worker')
+        self.assertEqual(report.find_memory_block(0x10000100).base, 0x10000000)
+        self.assertEqual(report.read(0x100000fe, 4), _memory[0xfe:0x102])
+
+    def test_memory_blocks_loaded_on_access(self):
+        XMLReport(self.filename).write_cache()
+        report = XMLReport(self.filename)
+        blocks = report.memory_blocks
+        self.assertIn('memory_blocks', report._restored_sections)
+        self.assertFalse(blocks[0].memory.is_loaded)
+        self.assertEqual(len(blocks[0].memory), len(_memory))
+        self.assertFalse(blocks[0].memory.is_loaded)
+        self.assertEqual(blocks[0].memory.raw, _memory)
+        self.assertTrue(blocks[0].memory.is_loaded)
+
+    def test_nested_memory_blocks(self):
+        nested = """<memory_block>
+<num type="int">1</num>
+<base type="uint">10000100</base>
+<size type="uint">10</size>
+<memory type="QByteArray" encoding-type="base64">%s</memory>
+</memory_block>
+</memory_blocks>""" % base64.b64encode(_memory[0x100:0x110]).decode('ascii')
+        with open(self.filename, 'w') as f:
+            f.write(REPORT_XML.replace('</memory_blocks>', nested))
+        report = XMLReport(self.filename)
+        # the first block containing the address is found like by a scan
+        # over the blocks, the nested one only by its base
+        self.assertEqual(report.find_memory_block(0x10000108).base, 0x10000000)
+        self.assertEqual(report.memory_block_at(0x10000100).base, 0x10000100)
+        self.assertEqual(report.memory_block_at(0x10000000).base, 0x10000000)
+        self.assertIsNone(report.memory_block_at(0x10000108))
+        self.assertEqual(report.read(0x100000f8, 0x20), _memory[0xf8:0x118])
+
+    def test_outdated_cache(self):
+        XMLReport(self.filename).write_cache()
+        st = os.stat(self.filename)
+        os.utime(self.filename, ns=(st.st_atime_ns, st.st_mtime_ns + 1000))
+        report = XMLReport(self.filename)
+        self.assertIsNone(report._cache)
+        self.assertEqual(len(report.threads), 2)
+
+    def test_damaged_cache(self):
+        expected = self._sections(XMLReport(self.filename))
+        XMLReport(self.filename).write_cache()
+        # overwrite the data of all sections, keep the header and the index
+        name = cache_filename(self.filename)
+        size = os.path.getsize(name)
+        with open(name, 'r+b') as f:
+            f.seek(size // 2)
+            f.write(b'\xff' * (size - size // 2))
+
+        report = XMLReport(self.filename)
+        self.assertIsNotNone(report._cache)
+        self.assertEqual(self._sections(report), expected)
+        # the damaged section and all following ones are parsed from the XML
+        self.assertIsNone(report._cache)
+        self.assertNotEqual(report._restored_sections, set(XMLReport._cache_layout))
+
+
+def test_suite():
+    suite = unittest.TestSuite()
+    suite.addTest(unittest.makeSuite(XMLReportCacheTestCase))
+    return suite
+
+
+if __name__ == '__main__':
+    unittest.main(defaultTest='test_suite')
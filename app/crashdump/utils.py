@@ -7,17 +7,23 @@ crashdump_use_jinja2 = False
 def _(msg):
     return msg
 
+def _escape_html_text(text):
+    return text.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
+
+def _escape_html_attrib(text):
+    return text.replace('&', '&amp;').replace('>', '&gt;').replace('"', '&quot;')
+
 def tag_a(name, title=None, href=None, alt=None):
-    from xml.etree.ElementTree import Element, tostring
-    a = Element('a')
-    a.text = name
+    # same output as serializing an ElementTree element with method html,
+    # but without the overhead of the serializer for every stack frame
+    ret = '<a'
     if href:
-        a.set('href', href)
+        ret += ' href="' + _escape_html_attrib(href) + '"'
     if title:
-        a.set('title', title)
+        ret += ' title="' + _escape_html_attrib(title) + '"'
     if alt:
-        a.set('alt', alt)
-    return tostring(a, encoding="utf8", method='html').decode()
+        ret += ' alt="' + _escape_html_attrib(alt) + '"'
+    return ret + '>' + (_escape_html_text(name) if name else '') + '</a>'
 
 def _hex_format(number, prefix='0x', width=None, bits=None):
     if isinstance(number, str):
@@ -414,7 +420,7 @@ def format_gl_extension_name(ext):
     return tag_a(name, title=title, href=href)
 
 def format_version_number(num):
-    if isinstance(num, str) or isinstance(num, unicode):
+    if isinstance(num, str):
         try:
             num = int(num)
         except ValueError:
@@ -712,6 +718,14 @@ def format_thread(thread):
             ret = ret + ' ' + _('with exception')
         return ret
 
+def format_address_module(module_index, addr):
+    if module_index is None or addr is None:
+        return ''
+    module, offset = module_index.resolve(addr)
+    if module is None:
+        return ''
+    return (module.basename or module.name) + '+' + hex_format(offset)
+
 def format_stack_frame(frame):
     if frame is None:
         return _('N/A')
@@ -725,6 +739,83 @@ def format_stack_frame(frame):
         else:
             return format_function_plus_offset(frame.function, frame.funcoff)
 
+# main fields of the report used by the pages of the crash details (report is
+# the overview of the Trac plugin), all other sections are skipped while
+# parsing and loaded on first access
+report_page_fields = {
+    'report': ['crash_info', 'system_info', 'fast_protect_system_info', 'fast_protect_version_info', 'exception', 'assertion',
+               'modules', 'threads', 'stackdumps', 'memory_regions', 'memory_blocks', 'file_info'],
+    'sysinfo': ['system_info', 'fast_protect_system_info'],
+    'sysinfo_ex': ['system_info', 'fast_protect_system_info', 'processmemoryinfowin32', 'processstatuslinux', 'processstatuswin32', 'threads'],
+    'fast_protect_version_info': ['system_info', 'fast_protect_version_info'],
+    'exception': ['system_info', 'exception', 'assertion', 'simplified_info', 'modules'],
+    'memory_blocks': ['system_info', 'memory_blocks', 'threads'],
+    'memory_block': ['system_info', 'memory_blocks', 'threads'],
+    'memory_regions': ['system_info', 'memory_regions', 'threads'],
+    'modules': ['system_info', 'modules'],
+    'threads': ['system_info', 'threads', 'stackdumps', 'fast_protect_version_info', 'memory_blocks', 'modules'],
+    'stackdumps': ['system_info', 'stackdumps', 'threads'],
+    'stackdump': ['system_info', 'stackdumps', 'threads'],
+    'file_info': ['system_info', 'file_info'],
+}
+
+class LazyReportSection(object):
+    """
+    Template value for a main field of a XMLReport or MiniDumpWrapper. The
+    field is read from the report on the first call and the same object is
+    returned afterwards. Django templates call callable values when a
+    variable is resolved, so the template works on the real objects.
+    """
+    __slots__ = ('_report', '_field_name', '_value', '_resolved')
+
+    def __init__(self, report, field_name):
+        self._report = report
+        self._field_name = field_name
+        self._value = None
+        self._resolved = False
+
+    def __call__(self):
+        if not self._resolved:
+            self._value = getattr(self._report, self._field_name)
+            self._resolved = True
+        return self._value
+
+    def __repr__(self):
+        return 'LazyReportSection(%s, %s)' % (self._report, self._field_name)
+
+def add_report_sections(data, report):
+    """
+    Add the main fields and the module index of the given XMLReport or
+    MiniDumpWrapper to the template data as LazyReportSection.
+    """
+    for f in report.fields:
+        data[f] = LazyReportSection(report, f)
+    data['module_index'] = LazyReportSection(report, 'module_index')
+
+def resolve_report_sections(data, fields=None):
+    """
+    Replace the LazyReportSection values of the given fields in the
+    template data by the real objects, all if fields is None. The other
+    sections are set to None. Use this for template engines which do not
+    call callable values.
+    """
+    for (key, value) in list(data.items()):
+        if isinstance(value, LazyReportSection):
+            if fields is None or key in fields:
+                data[key] = value()
+            else:
+                data[key] = None
+    return data
+
+def report_section(data, name):
+    """
+    Returns the given main field from the template data.
+    """
+    value = data.get(name)
+    if isinstance(value, LazyReportSection):
+        value = value()
+    return value
+
 if __name__ == '__main__':
     x = _get_version_from_string("6.1 Service Pack 1")
     print(x)
\ No newline at end of file
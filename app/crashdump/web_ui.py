@@ -286,7 +286,13 @@ class CrashDumpModule(Component):
 
         return template, data, content_type, method
 
-    def _prepare_data(self, req, crashobj, absurls=False):
+    @staticmethod
+    def _report_fields(page, default=None):
+        fields = report_page_fields.get(page, default)
+        # platform_type is derived from system_info
+        return fields + ['platform_type'] if fields is not None else None
+
+    def _prepare_data(self, req, crashobj, absurls=False, fields=None):
         data = {'object': crashobj,
                 'to_utimestamp': to_utimestamp,
                 'hex_format':hex_format,
@@ -376,18 +382,19 @@ class CrashDumpModule(Component):
             if os.path.isfile(xmlfile):
                 try:
                     xmlreport = XMLReport(xmlfile)
-                    for f in xmlreport.fields:
-                        data[f] = XMLReport.ProxyObject(xmlreport, f)
+                    add_report_sections(data, xmlreport)
                     data['xmlreport'] = xmlreport
                     data['is_64_bit'] = xmlreport.is_64_bit
                 except XMLReport.XMLReportIOError as e:
                     data['xmlfile_error'] = str(e)
             else:
                 wrapper = MiniDumpWrapper(data['minidumpfile'])
-                for f in wrapper.fields:
-                    data[f] = MiniDumpWrapper.ProxyObject(wrapper, f)
+                add_report_sections(data, wrapper)
                 data['xmlreport'] = None
                 data['xmlfile_error'] = 'XML file %s does not exist' % xmlfile
+            # Genshi and Jinja2 do not call the lazy sections, so only the
+            # sections used by the page are loaded
+            resolve_report_sections(data, fields)
             end = time.time()
             data['parsetime'] = end - start
         data['bits'] = 64 if data['is_64_bit'] else 32
@@ -488,7 +495,9 @@ class CrashDumpModule(Component):
         params = _get_list_from_args(req.args, 'params', None)
         self.log.debug('process_request %s:%s-%s' % (action, type(params), params))
         if action is None or action == 'view':
-            data = self._prepare_data(req, crashobj)
+            # the overview is the report page, an invalid sub-page does not
+            # need any section
+            data = self._prepare_data(req, crashobj, fields=self._report_fields(params[0] if params else 'report', []))
             
             xmlfile = data['xmlfile'] if 'xmlfile' in data else None
             data['dbtime'] = end - start
@@ -544,7 +553,7 @@ class CrashDumpModule(Component):
                 else:
                     raise ResourceNotFound(_("Invalid sub-page request %(param)s for crash %(uuid)s.", param=str(params[0]), uuid=str(crashobj.uuid)))
         elif action == 'sysinfo_report':
-            data = self._prepare_data(req, crashobj)
+            data = self._prepare_data(req, crashobj, fields=self._report_fields(params[0] if params else None, report_page_fields['sysinfo']))
             data['dbtime'] = end - start
 
             if 'xmlreport' in data:
@@ -587,7 +596,7 @@ class CrashDumpModule(Component):
                     raise ResourceNotFound(_("Invalid sub-page request %(param)s for crash %(uuid)s.", param=str(params[0]), uuid=str(crashobj.uuid)))
 
         elif action == 'systeminfo_raw':
-            data = self._prepare_data(req, crashobj)
+            data = self._prepare_data(req, crashobj, fields=self._report_fields('sysinfo'))
 
             xmlfile = data['xmlfile'] if 'xmlfile' in data else None
             data['dbtime'] = end - start
@@ -2,15 +2,21 @@
 # -*- coding: utf-8 -*-
 # kate: space-indent on; indent-width 4; mixedindent off; indent-mode python;
 
+import os
+import re
 import sys
+from sys import intern
 import base64
 import struct
+import threading
 from datetime import datetime, tzinfo, timedelta
 from uuid import UUID
 from lxml import etree
 
+from crashdump.addressmap import AddressMap, ModuleIndex
 from crashdump.exception_info import exception_code_names_per_platform_type, exception_info_per_platform_type
 from crashdump.utils import format_version_number, format_memory_usagetype
+from crashdump.reportcache import ReportCache, write_report_cache
 
 ZERO = timedelta(0)
 
@@ -27,84 +33,120 @@ class UTC(tzinfo):
         return ZERO
 
 class HexDumpMemoryBlock(object):
-    def __init__(self, memory):
+    def __init__(self, memory=None, loader=None, size=None):
+        # the memory is either given directly or retrieved on first
+        # access by calling loader
         self._memory = memory
+        self._loader = loader
+        self._size = size
         self._hexdump = None
 
     @property
     def raw(self):
+        if self._memory is None and self._loader is not None:
+            self._memory = self._loader()
+            self._loader = None
         return self._memory
 
+    @property
+    def is_loaded(self):
+        return self._loader is None
+
     @property
     def size(self):
-        return len(self._memory)
+        if self._memory is None and self._size is not None:
+            return self._size
+        return len(self.raw)
 
     def __len__(self):
-        return len(self._memory)
+        return self.size
 
     @property
     def hexdump(self):
         if not self._hexdump:
-            self._hexdump = self._generate_hexdump()
+            self._hexdump = HexDumpMemoryBlock.HexDump(self.raw)
         return self._hexdump
 
+    # maps all non-printable characters to a dot for the ASCII column
+    _ascii_table = bytes([c if 32 <= c < 127 else ord('.') for c in range(256)])
+
+    @staticmethod
+    def _hex_line(memory_line):
+        return memory_line.hex(' ').upper().ljust(47)
+
+    @staticmethod
+    def _ascii_line(memory_line):
+        return memory_line.translate(HexDumpMemoryBlock._ascii_table).decode('ascii').ljust(16)
+
     class HexDumpLine(object):
         def __init__(self, offset, memory_line, line_length):
             self.offset = offset
             self.raw = memory_line
+            self.hex = HexDumpMemoryBlock._hex_line(memory_line[:line_length])
+            self.ascii = HexDumpMemoryBlock._ascii_line(memory_line[:line_length])
 
-            self.hex = ''
-            self.ascii = ''
-            idx = 0
-            while idx < 16:
-                if idx != 0:
-                    self.hex += ' '
-                if idx < line_length:
-                    c = memory_line[idx]
-                    c_i = int(c)
-                    self.hex += '%02X' % c_i
-                    if c_i < 32 or c_i >= 127:
-                        self.ascii += '.'
-                    else:
-                        self.ascii += chr(c)
-                else:
-                    self.hex += '  '
-                    self.ascii += ' '
-                idx += 1
         def __str__(self):
             return '%06x %32s %16s\n' % (self.offset, self.hex, self.ascii)
 
     class HexDump(object):
-        def __init__(self, size):
+        def __init__(self, memory):
+            self._memory = bytes(memory) if memory is not None else b''
+            size = len(self._memory)
             if size > 65536:
                 self.offset_width = 6
             elif size > 256:
                 self.offset_width = 4
             else:
                 self.offset_width = 2
-            self._lines = []
             self._raw_offset = None
             self._raw_hex = None
             self._raw_ascii = None
 
+        def __len__(self):
+            # number of lines
+            return (len(self._memory) + 15) // 16
+
         def __iter__(self):
-            return iter(self._lines)
+            return self.lines()
+
+        def lines(self, start=0, stop=None):
+            """
+            Yields the lines from line number start up to (excluding) stop
+            without generating the other lines of the dump.
+            """
+            total_size = len(self._memory)
+            end = total_size if stop is None else min(stop * 16, total_size)
+            for offset in range(start * 16, end, 16):
+                memory_line = self._memory[offset:offset + 16]
+                yield HexDumpMemoryBlock.HexDumpLine(offset, memory_line, len(memory_line))
+
+        def raw_columns(self, start=0, stop=None):
+            """
+            Returns the offset, hex and ASCII column of the lines from line
+            number start up to (excluding) stop, lines are separated by CRLF.
+            """
+            total_size = len(self._memory)
+            begin = min(start * 16, total_size)
+            end = total_size if stop is None else max(begin, min(stop * 16, total_size))
+            memory = self._memory[begin:end]
+            size = len(memory)
+            full_size = size & ~15
+            offset_fmt = '0x%%0%dX' % self.offset_width
+            raw_offset = '\r\n'.join([offset_fmt % offset for offset in range(begin, end, 16)])
+
+            # one hex string for all complete lines, each line takes 48
+            # characters including the separator to the next line
+            hex_all = memory[:full_size].hex(' ').upper()
+            hex_lines = [hex_all[i:i + 47] for i in range(0, len(hex_all), 48)]
+            ascii_all = memory[:full_size].translate(HexDumpMemoryBlock._ascii_table).decode('ascii')
+            ascii_lines = [ascii_all[i:i + 16] for i in range(0, full_size, 16)]
+            if full_size != size:
+                hex_lines.append(HexDumpMemoryBlock._hex_line(memory[full_size:]))
+                ascii_lines.append(HexDumpMemoryBlock._ascii_line(memory[full_size:]))
+            return raw_offset, '\r\n'.join(hex_lines), '\r\n'.join(ascii_lines)
 
         def _generate_raw(self):
-            self._raw_offset  = ''
-            self._raw_hex  = ''
-            self._raw_ascii  = ''
-            offset_fmt = '0x%%0%dX' % self.offset_width
-            first = True
-            for line in self._lines:
-                if not first:
-                    self._raw_offset += '\r\n'
-                    self._raw_hex += '\r\n'
-                    self._raw_ascii += '\r\n'
-                self._raw_offset += offset_fmt % line.offset
-                self._raw_hex += line.hex
-                self._raw_ascii += line.ascii
-                first = False
+            self._raw_offset, self._raw_hex, self._raw_ascii = self.raw_columns()
 
         @property
         def raw_offset(self):
@@ -125,30 +167,13 @@ class HexDumpMemoryBlock(object):
             return self._raw_ascii
 
         def __str__(self):
-            ret = ''
-            for l in self._lines:
-                ret += str(l)
-            return ret
-
-    def _generate_hexdump(self):
-        offset = 0
-        total_size = len(self._memory)
-        ret = HexDumpMemoryBlock.HexDump(total_size)
-        while offset < total_size:
-            max_row = 16
-            remain = total_size - offset
-            if remain < 16:
-                max_row = remain
-            line = HexDumpMemoryBlock.HexDumpLine(offset, self._memory[offset:offset + max_row], max_row)
-            ret._lines.append(line)
-            offset += 16
-        return ret
+            return ''.join([str(l) for l in self.lines()])
 
     def __getitem__(self, index):
         if isinstance(index, int):
-            return self._memory[index]
+            return self.raw[index]
         elif isinstance(index, slice):
-            return self._memory[index.start:index.stop: index.step]
+            return self.raw[index.start:index.stop: index.step]
         else:
             raise TypeError("index %s" % index)
 
@@ -157,9 +182,9 @@ class HexDumpMemoryBlock(object):
 
     def find(self, needle, start=0):
         if isinstance(needle, bytes):
-            return self._memory.find(needle, start)
+            return self.raw.find(needle, start)
         elif isinstance(needle, str):
-            return self._memory.find(needle.encode('us-ascii'), start)
+            return self.raw.find(needle.encode('us-ascii'), start)
         else:
             raise TypeError('insupported type for search in memory block: %s' % type(needle))
 
@@ -260,6 +285,45 @@ class Win32_PEB(MemObject):
     def image_base_address(self):
         return self._read_ptr(0x10)
 
+class _EntityType(type):
+    # entity classes declared with fields=[...] get a fixed layout with a
+    # slot for each field and for the given extra attributes instead of a
+    # __dict__ per instance
+    def __new__(mcs, name, bases, namespace, fields=None, extra=()):
+        if fields is not None:
+            namespace['__slots__'] = tuple([f[1] if isinstance(f, tuple) else f for f in fields]) + tuple(extra)
+        return type.__new__(mcs, name, bases, namespace)
+
+    def __init__(cls, name, bases, namespace, fields=None, extra=()):
+        type.__init__(cls, name, bases, namespace)
+
+def _report_section(field):
+    # property of a section of XMLReport, the section is restored from the
+    # sidecar cache if there is one before the getter parses it from the XML.
+    # The section is loaded only once, even by concurrent threads sharing
+    # the report.
+    attr = '_' + field
+    def decorator(getter):
+        def wrapper(self):
+            if field in self._section_sizes:
+                return getattr(self, attr)
+            with self._lock:
+                if field not in self._section_sizes:
+                    # the getter builds the indexes of a restored section as
+                    # well, it is skipped if the report has no such section
+                    missing = getattr(self, attr) is None and self._restore_section(field) and getattr(self, attr) is None
+                    if not missing:
+                        getter(self)
+                    self._section_loaded(field)
+                return getattr(self, attr)
+        wrapper.__name__ = getter.__name__
+        return property(wrapper)
+    return decorator
+
+def _file_key(filename):
+    st = os.stat(filename)
+    return st.st_size, st.st_mtime_ns
+
 class XMLReport(object):
 
     _main_fields = ['crash_info', 'platform_type', 'system_info', 'file_info', 'exception',
@@ -268,6 +332,15 @@ class XMLReport(object):
                     'processmemoryinfowin32', 'misc_info',
                     'fast_protect_version_info', 'fast_protect_system_info']
 
+    # name of the XML element below crash_dump for each main field if it
+    # differs from the field name; crash_info is made of the leaf elements
+    # listed in _crash_dump_fields
+    _main_field_tags = {
+        'platform_type': 'system_info',
+        'memory_regions': 'memory_info',
+        'handles': 'handle',
+    }
+
     _crash_dump_fields = ['uuid', 'crash_timestamp', 
                           'report_time', 'report_fqdn', 'report_username', 'report_hostname', 'report_domain', 
                           'application', 'command_line',
@@ -411,78 +484,6 @@ class XMLReport(object):
         def __init__(self, report, message):
             super(XMLReport.XMLReportParserError, self).__init__(report, message)
 
-    class ProxyObject(object):
-        def __init__(self, report, field_name):
-            object.__setattr__(self, '_report', report)
-            object.__setattr__(self, '_field_name', field_name)
-            object.__setattr__(self, '_real_object', None)
-
-        def __getattr__(self, key):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            if self._real_object is None:
-                return None
-            return getattr(self._real_object, key)
-
-        def __setattr__(self, key, value):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            if self._real_object is None:
-                return None
-            return setattr(self._real_object, key, value)
-
-        def __iter__(self):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            if self._real_object is None:
-                return None
-            return iter(self._real_object)
-
-        def __nonzero__(self):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            if self._real_object is None:
-                return False
-            return bool(self._real_object)
-
-        def __bool__(self):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            if self._real_object is None:
-                return False
-            return bool(self._real_object)
-
-        def __len__(self):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            if self._real_object is None:
-                return None
-            if hasattr(self._real_object, '__len__'):
-                return len(self._real_object)
-            else:
-                return 0
-
-        def __contains__(self, key):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            if self._real_object is None:
-                return False
-            return key in self._real_object
-
-        def __getitem__(self, key):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            return self._real_object[key]
-
-        def __repr__(self):
-            if self._real_object is None:
-                object.__setattr__(self, '_real_object', getattr(self._report, self._field_name))
-            return 'ProxyObject(%s, %s, %r)' % (
-                getattr(self, '_report'),
-                getattr(self, '_field_name'),
-                getattr(self, '_real_object')
-            )
-
     @staticmethod
     def unique(items):
         found = set()
@@ -495,18 +496,42 @@ class XMLReport(object):
 
         return keep
 
-    def __init__(self, filename=None):
+    def __init__(self, filename=None, fields=None, use_cache=True):
         self._filename = filename
         self._xml = None
+        # XML elements of the sections which have been parsed, None if the
+        # whole document is loaded
+        self._loaded_tags = None
+        # sidecar cache of the parsed sections, see write_cache
+        self._cache = None
+        self._restored_sections = set()
+        # base64 data is read from the file on demand, starting at these
+        # lines; the file must not change after it has been parsed
+        self._file_key = None
+        self._text_lines = set()
+        self._text_line_offsets = {}
+        # guards the loading of the sections
+        self._lock = threading.RLock()
+        # estimated memory used by the parsed XML elements of each section
+        # which has not been extracted yet and by each loaded section
+        self._tree_sizes = {}
+        self._section_sizes = {}
+        # called with the new size after the size of the report has changed
+        self.size_changed = None
         self._crash_info = None
         self._system_info = None
         self._file_info = None
         self._exception = None
         self._assertion = None
         self._threads = None
+        self._threads_by_id = None
+        self._thread_ids_by_memory = None
         self._modules = None
+        self._module_index = None
         self._memory_regions = None
+        self._memory_region_map = None
         self._memory_blocks = None
+        self._memory_block_map = None
         self._handles = None
         self._stackdumps = None
         self._simplified_info = None
@@ -522,25 +547,195 @@ class XMLReport(object):
         self._peb_address = None
         self._peb_memory_block = None
 
-        if self._filename:
+        if self._filename and use_cache:
+            self._cache = ReportCache.open(self._filename, XMLReport.CACHE_VERSION)
+        if self._filename and self._cache is None:
+            self._open_xml(fields)
+
+    def _open_xml(self, fields):
+        if fields is None:
             try:
                 self._xml = etree.parse(self._filename)
             except IOError as e:
                 raise XMLReport.XMLReportIOError(self, str(e))
             except etree.XMLSyntaxError as e:
                 raise XMLReport.XMLReportParserError(self, str(e))
+            for child in self._xml.getroot():
+                self._add_tree_size(child, int(child.xpath('count(.//*)')) + 1)
+        else:
+            tags = XMLReport._section_tags(fields)
+            root = self._iterparse(tags)
+            self._xml = etree.ElementTree(root) if root is not None else None
+            self._loaded_tags = tags
+
+    @staticmethod
+    def _section_tags(fields):
+        ret = set()
+        for f in fields:
+            if f == 'crash_info':
+                ret.update(XMLReport._crash_dump_fields)
+            else:
+                ret.add(XMLReport._main_field_tags.get(f, f))
+        return ret
+
+    def _iterparse(self, tags):
+        """
+        Parse only the given elements below crash_dump and return the root
+        element. The content of all other sections is discarded while
+        parsing and the parser stops as soon as all requested elements
+        have been read.
+        """
+        pending = set(tags)
+        root = None
+        depth = 0
+        keep = False
+        try:
+            with open(self._filename, 'rb') as f:
+                for event, elem in etree.iterparse(f, events=('start', 'end')):
+                    if event == 'start':
+                        depth += 1
+                        if depth == 1:
+                            root = elem
+                        elif depth == 2:
+                            keep = elem.tag in tags
+                            num_elements = 1
+                        continue
+                    depth -= 1
+                    if depth == 1:
+                        if keep:
+                            self._add_tree_size(elem, num_elements)
+                            pending.discard(elem.tag)
+                            if not pending:
+                                break
+                        else:
+                            elem.clear()
+                            root.remove(elem)
+                    elif depth > 1:
+                        if keep:
+                            num_elements += 1
+                        else:
+                            # drop already parsed content of an unused section
+                            elem.clear()
+                            while elem.getprevious() is not None:
+                                del elem.getparent()[0]
+        except IOError as e:
+            raise XMLReport.XMLReportIOError(self, str(e))
+        except etree.XMLSyntaxError as e:
+            raise XMLReport.XMLReportParserError(self, str(e))
+        if root is not None:
+            # the parser reads ahead, drop the partially parsed elements
+            # following the last requested section
+            for child in list(root):
+                if child.tag not in tags:
+                    root.remove(child)
+        return root
+
+    def _load_section(self, field):
+        if self._loaded_tags is None or self._xml is None:
+            return
+        if not (XMLReport._section_tags([field]) - self._loaded_tags):
+            return
+        # a page which needs one section beyond the selected ones often
+        # needs more of them, load all remaining sections in a single pass
+        # instead of parsing the file again for each of them
+        tags = XMLReport._section_tags(XMLReport._main_fields) - self._loaded_tags
+        root = self._iterparse(tags)
+        if root is not None:
+            dest = self._xml.getroot()
+            for child in list(root):
+                dest.append(child)
+        self._loaded_tags.update(tags)
+
+    def _add_tree_size(self, elem, num_elements):
+        size = num_elements * XMLReport.XML_ELEMENT_SIZE + int(elem.xpath('string-length(.)'))
+        self._tree_sizes[elem.tag] = self._tree_sizes.get(elem.tag, 0) + size
+
+    def _section_loaded(self, field):
+        # the elements of the section are not needed any longer once its
+        # values have been extracted
+        if self._xml is not None:
+            root = self._xml.getroot()
+            tags = XMLReport._section_tags([field])
+            for child in list(root):
+                if child.tag in tags:
+                    root.remove(child)
+            for tag in tags:
+                self._tree_sizes.pop(tag, None)
+        self._section_sizes[field] = XMLReport._value_size(getattr(self, '_' + field), set())
+        if self.size_changed is not None:
+            self.size_changed(self.size)
+
+    @property
+    def size(self):
+        """
+        Estimated memory in bytes used by the report, that is by the parsed
+        XML elements of the sections which have not been loaded yet and by
+        the loaded sections. Memory blocks count with the size of their
+        decoded data.
+        """
+        return sum(self._tree_sizes.values()) + sum(self._section_sizes.values())
+
+    @staticmethod
+    def _value_size(value, seen):
+        # estimated memory used by a section value, long lists are sampled
+        if value is None or isinstance(value, (bool, int)) and -5 <= value <= 256:
+            # shared objects
+            return 0
+        if id(value) in seen:
+            return 0
+        if isinstance(value, HexDumpMemoryBlock):
+            return sys.getsizeof(value) + (value.size if value.is_loaded or value._size is not None else 0)
+        elif isinstance(value, XMLReport.StackDumpList):
+            return sys.getsizeof(value) + XMLReport._value_size(value._list, seen)
+        elif isinstance(value, XMLReport.XMLReportEntity):
+            seen.add(id(value))
+            ret = sys.getsizeof(value)
+            if hasattr(value, '__dict__'):
+                ret += sys.getsizeof(value.__dict__)
+            for (k, v) in value._attributes():
+                if k[0] != '_':
+                    ret += XMLReport._value_size(v, seen)
+            return ret
+        elif isinstance(value, list):
+            ret = sys.getsizeof(value)
+            if value:
+                sample = value[::max(1, len(value) // XMLReport.SIZE_SAMPLE)]
+                ret += sum([XMLReport._value_size(v, seen) for v in sample]) * len(value) // len(sample)
+            return ret
+        elif isinstance(value, dict):
+            return sys.getsizeof(value) + sum([XMLReport._value_size(k, seen) + XMLReport._value_size(v, seen) for (k, v) in value.items()])
+        return sys.getsizeof(value)
+
+    def _get_section_node(self, field, child):
+        # sections which have not been selected when the report has been
+        # opened are parsed on first access
+        self._load_section(field)
+        return XMLReport._get_first_node(self._xml, child)
 
     @property
     def is_platform_windows(self):
         return self.platform_type == 'Win32' or self.platform_type == 'Windows NT'
 
-    class XMLReportEntity(object):
+    class XMLReportEntity(object, metaclass=_EntityType):
+        __slots__ = ('_owner',)
+
         def __init__(self, owner):
             self._owner = owner
 
+        def _attributes(self):
+            # all attributes with a value, whether stored in slots or in
+            # the __dict__
+            for cls in reversed(type(self).__mro__):
+                for k in cls.__dict__.get('__slots__', ()):
+                    if hasattr(self, k):
+                        yield (k, getattr(self, k))
+            if hasattr(self, '__dict__'):
+                for item in self.__dict__.items():
+                    yield item
+
         def __str__(self):
             ret = ''
-            for (k,v) in self.__dict__.items():
+            for (k,v) in self._attributes():
                 if k[0] != '_':
                     if ret:
                         ret += ', '
@@ -569,7 +764,7 @@ class XMLReport(object):
         def __init__(self, owner):
             super(XMLReport.SystemInfo, self).__init__(owner)
 
-    class FileInfoLogMessage(XMLReportEntity):
+    class FileInfoLogMessage(XMLReportEntity, fields=_file_info_log_message_fields):
         def __init__(self, owner):
             super(XMLReport.FileInfoLogMessage, self).__init__(owner)
 
@@ -584,12 +779,7 @@ class XMLReport(object):
 
         @property
         def thread(self):
-            ret = None
-            for thread in self._owner.threads:
-                if thread.id == self.threadid:
-                    ret = thread
-                    break
-            return ret
+            return self._owner._get_thread(self.threadid)
 
         @property
         def involved_modules(self):
@@ -634,7 +824,7 @@ class XMLReport(object):
         def __init__(self, owner):
             super(XMLReport.Assertion, self).__init__(owner)
 
-    class Module(XMLReportEntity):
+    class Module(XMLReportEntity, fields=_module_fields, extra=('_basename',)):
         def __init__(self, owner):
             super(XMLReport.Module, self).__init__(owner)
             self._basename = None
@@ -654,7 +844,7 @@ class XMLReport(object):
                     self._basename = name
             return self._basename
 
-    class Thread(XMLReportEntity):
+    class Thread(XMLReportEntity, fields=_thread_fields, extra=('_teb_memory_block', '_teb_memory_region', '_teb', '_tls_slots', '_thread_name')):
         def __init__(self, owner):
             super(XMLReport.Thread, self).__init__(owner)
             self._teb_memory_block = None
@@ -665,21 +855,13 @@ class XMLReport(object):
 
         @property
         def stackdump(self):
-            ret = None
-            for st in self._owner.stackdumps:
-                if st.threadid == self.id and not st.simplified:
-                    ret = st
-                    break
-            return ret
+            stackdumps = self._owner.stackdumps
+            return stackdumps.get(self.id) if stackdumps is not None else None
 
         @property
         def simplified_stackdump(self):
-            ret = None
-            for st in self._owner.stackdumps:
-                if st.threadid == self.id and st.simplified:
-                    ret = st
-                    break
-            return ret
+            stackdumps = self._owner.stackdumps
+            return stackdumps.get(self.id, simplified=True) if stackdumps is not None else None
 
         @property
         def teb_memory_block(self):
@@ -738,7 +920,7 @@ class XMLReport(object):
             else:
                 return None
 
-    class MemoryRegion(XMLReportEntity):
+    class MemoryRegion(XMLReportEntity, fields=_memory_region_fields, extra=('usage',)):
         def __init__(self, owner):
             super(XMLReport.MemoryRegion, self).__init__(owner)
 
@@ -756,19 +938,14 @@ class XMLReport(object):
             else:
                 return 'base=0x%x, size=%i, end=0x%x, type=%i, protect=%x, state=%x, usage=%s' % (self.base_addr, self.size, self.end_addr, self.type, self.protect, self.state, self.usage)
 
-    class MemoryRegionUsage(XMLReportEntity):
+    class MemoryRegionUsage(XMLReportEntity, fields=_memory_region_usage_fields, extra=('_region',)):
         def __init__(self, owner, region):
             super(XMLReport.MemoryRegionUsage, self).__init__(owner)
             self._region = region
 
         @property
         def thread(self):
-            ret = None
-            for thread in self._owner.threads:
-                if thread.id == self.threadid:
-                    ret = thread
-                    break
-            return ret
+            return self._owner._get_thread(self.threadid)
 
         def __str__(self):
             return '(0x%x, %s)' % (self.threadid, format_memory_usagetype(self.usagetype))
@@ -776,7 +953,7 @@ class XMLReport(object):
         def __repr__(self):
             return str(self)
 
-    class MemoryBlock(XMLReportEntity):
+    class MemoryBlock(XMLReportEntity, fields=_memory_block_fields, extra=('_thread_id',)):
         def __init__(self, owner):
             super(XMLReport.MemoryBlock, self).__init__(owner)
             self._thread_id = None
@@ -788,10 +965,7 @@ class XMLReport(object):
         @property
         def threadid(self):
             if self._thread_id is None:
-                for thread in self._owner.threads:
-                    if thread.memory == self.base:
-                        self._thread_id = thread.id
-                        break
+                self._thread_id = self._owner._get_thread_id_by_memory(self.base)
             return self._thread_id
 
         @property
@@ -820,7 +994,7 @@ class XMLReport(object):
         def __str__(self):
             return 'num=%i, base=0x%x, size=%i, end=0x%x' % (self.num, self.base, self.size, self.end_addr)
 
-    class Handle(XMLReportEntity):
+    class Handle(XMLReportEntity, fields=_handle_fields):
         def __init__(self, owner):
             super(XMLReport.Handle, self).__init__(owner)
 
@@ -828,9 +1002,23 @@ class XMLReport(object):
         def __init__(self, owner):
             super(XMLReport.StackDumpList, self).__init__(owner)
             self._list = []
+            # first stack dump per (thread id, simplified)
+            self._by_thread = {}
+            self._simplified = None
+            self._exception = None
 
         def append(self, dump):
             self._list.append(dump)
+            key = (dump.threadid, bool(dump.simplified))
+            if key not in self._by_thread:
+                self._by_thread[key] = dump
+            if dump.simplified and self._simplified is None:
+                self._simplified = dump
+            if dump.exception and self._exception is None:
+                self._exception = dump
+
+        def get(self, threadid, simplified=False, default=None):
+            return self._by_thread.get((threadid, simplified), default)
 
         def __iter__(self):
             return iter(self._list)
@@ -838,39 +1026,26 @@ class XMLReport(object):
         def __len__(self):
             return len(self._list)
 
-        def __contains__(self, key):
+        def _lookup(self, key):
             if isinstance(key, int):
-                for d in self._list:
-                    if d.threadid == key and d.simplified == False:
-                        return True
+                return self._by_thread.get((key, False))
             elif isinstance(key, str):
                 if key == 'simplified':
-                    for d in self._list:
-                        if d.simplified:
-                            return True
+                    return self._simplified
                 elif key == 'exception':
-                    for d in self._list:
-                        if d.exception:
-                            return True
-            return False
+                    return self._exception
+            return None
+
+        def __contains__(self, key):
+            return self._lookup(key) is not None
 
         def __getitem__(self, key):
-            if isinstance(key, int):
-                for d in self._list:
-                    if d.threadid == key and d.simplified == False:
-                        return d
-            elif isinstance(key, str):
-                if key == 'simplified':
-                    for d in self._list:
-                        if d.simplified:
-                            return d
-                elif key == 'exception':
-                    for d in self._list:
-                        if d.exception:
-                            return d
-            raise KeyError(key)
+            ret = self._lookup(key)
+            if ret is None:
+                raise KeyError(key)
+            return ret
 
-    class StackDump(XMLReportEntity):
+    class StackDump(XMLReportEntity, fields=_stackdump_fields, extra=('callstack', '_thread')):
         def __init__(self, owner):
             super(XMLReport.StackDump, self).__init__(owner)
             self._thread = None
@@ -878,10 +1053,7 @@ class XMLReport(object):
         @property
         def thread(self):
             if self._thread is None:
-                for thread in self._owner.threads:
-                    if thread.id == self.threadid:
-                        self._thread = thread
-                        break
+                self._thread = self._owner._get_thread(self.threadid)
             return self._thread
 
         @property
@@ -899,7 +1071,7 @@ class XMLReport(object):
             else:
                 return None
 
-    class StackFrame(XMLReportEntity):
+    class StackFrame(XMLReportEntity, fields=_stack_frame_fields, extra=('_dump',)):
         def __init__(self, owner, dump):
             super(XMLReport.StackFrame, self).__init__(owner)
             self._dump = dump
@@ -963,6 +1135,150 @@ class XMLReport(object):
         def __init__(self, owner):
             super(XMLReport.ProcessMemoryInfoWin32, self).__init__(owner)
 
+    # increment when the parsing of a section or the layout of the cache
+    # changes, the sidecar caches written by an older version are ignored
+    CACHE_VERSION = 2
+
+    # approximate memory used by an element of the parsed XML, without its
+    # text (measured with lxml 5 on the reports of the crash handler)
+    XML_ELEMENT_SIZE = 600
+    # number of entities of a list section used to estimate its size
+    SIZE_SAMPLE = 32
+
+    # entity class, fields, list section and nested list (attribute, entity
+    # class, fields, child gets the parent) of the sections in the cache
+    _cache_layout = {
+        'crash_info': (CrashInfo, _crash_dump_fields, False, None),
+        'system_info': (SystemInfo, _system_info_fields, False, None),
+        'file_info': (FileInfo, [f for f in _file_info_fields if f != 'log'], False, ('log', FileInfoLogMessage, _file_info_log_message_fields, False)),
+        'exception': (Exception, _exception_fields, False, None),
+        'assertion': (Assertion, _assertion_fields, False, None),
+        'modules': (Module, _module_fields, True, None),
+        'threads': (Thread, _thread_fields, True, None),
+        'memory_regions': (MemoryRegion, _memory_region_fields, True, ('usage', MemoryRegionUsage, _memory_region_usage_fields, True)),
+        'memory_blocks': (MemoryBlock, _memory_block_fields, True, None),
+        'handles': (Handle, _handle_fields, True, None),
+        'stackdumps': (StackDump, _stackdump_fields, True, ('callstack', StackFrame, _stack_frame_fields, True)),
+        'simplified_info': (SimplifiedInfo, _simplified_info_fields, False, None),
+        'processstatuslinux': (ProcessStatusLinux, _processstatuslinux_fields, False, None),
+        'processstatuswin32': (ProcessStatusWin32, _processstatuswin32_fields, False, None),
+        'processmemoryinfowin32': (ProcessMemoryInfoWin32, _processmemoryinfowin32_fields, False, None),
+        'misc_info': (MiscInfo, _processstatuslinux_fields, False, None),
+        'fast_protect_version_info': (FastProtectVersionInfo, _fast_protect_version_info_fields, False, None),
+        'fast_protect_system_info': (FastProtectSystemInfo, _fast_protect_system_info_fields, False, None),
+    }
+
+    @staticmethod
+    def _field_names(fields):
+        return [f[1] if isinstance(f, tuple) else f for f in fields]
+
+    @staticmethod
+    def _cache_encode(value, blobs):
+        # marshal only supports the builtin types, all other values of
+        # the report are stored as (tag, data) tuples. The data of memory
+        # blocks is appended to blobs and stored as (tag, blob, size), so
+        # it is only read from the cache when it is accessed.
+        if isinstance(value, datetime):
+            return (0, value.year, value.month, value.day, value.hour, value.minute, value.second, value.microsecond, value.tzinfo is not None)
+        elif isinstance(value, UUID):
+            return (1, value.bytes)
+        elif isinstance(value, HexDumpMemoryBlock):
+            raw = value.raw
+            if not isinstance(raw, (bytes, bytearray)):
+                return (3, raw)
+            blobs.append(raw)
+            return (2, len(blobs) - 1, len(raw))
+        elif isinstance(value, list):
+            return [XMLReport._cache_encode(v, blobs) for v in value]
+        elif isinstance(value, dict):
+            return dict([(k, XMLReport._cache_encode(v, blobs)) for (k, v) in value.items()])
+        return value
+
+    @staticmethod
+    def _cache_decode(value, cache):
+        if isinstance(value, tuple):
+            if value[0] == 0:
+                return datetime(*value[1:8], tzinfo=UTC() if value[8] else None)
+            elif value[0] == 1:
+                return UUID(bytes=value[1])
+            elif value[0] == 2:
+                num = value[1]
+                return HexDumpMemoryBlock(loader=lambda: cache.load_blob(num), size=value[2])
+            elif value[0] == 3:
+                return HexDumpMemoryBlock(value[1])
+        elif isinstance(value, list):
+            return [XMLReport._cache_decode(v, cache) for v in value]
+        elif isinstance(value, dict):
+            return dict([(k, XMLReport._cache_decode(v, cache)) for (k, v) in value.items()])
+        return value
+
+    @staticmethod
+    def _entity_to_values(entity, fields, child, blobs):
+        ret = [XMLReport._cache_encode(getattr(entity, f), blobs) for f in XMLReport._field_names(fields)]
+        if child is not None:
+            attr, child_cls, child_fields, with_parent = child
+            ret.append([XMLReport._entity_to_values(c, child_fields, None, blobs) for c in getattr(entity, attr)])
+        return tuple(ret)
+
+    def _entity_from_values(self, cls, fields, child, values, parent=None):
+        entity = cls(self, parent) if parent is not None else cls(self)
+        for (f, v) in zip(XMLReport._field_names(fields), values):
+            v = XMLReport._cache_decode(v, self._cache)
+            setattr(entity, f, intern(v) if type(v) is str else v)
+        if child is not None:
+            attr, child_cls, child_fields, with_parent = child
+            setattr(entity, attr, [self._entity_from_values(child_cls, child_fields, None, v, entity if with_parent else None) for v in values[-1]])
+        return entity
+
+    def _restore_section(self, field):
+        """
+        Restore the section from the sidecar cache instead of the XML.
+        Returns False if the report has no cache.
+        """
+        if self._cache is None:
+            return False
+        if field in self._restored_sections:
+            return True
+        try:
+            values = self._cache.load(field)
+        except (KeyError, ValueError):
+            # damaged cache, use the XML for this and all following sections
+            self._cache = None
+            self._open_xml([field])
+            return False
+        self._restored_sections.add(field)
+        cls, fields, is_list, child = XMLReport._cache_layout[field]
+        if values is None:
+            value = None
+        elif is_list:
+            value = XMLReport.StackDumpList(self) if field == 'stackdumps' else []
+            for v in values:
+                value.append(self._entity_from_values(cls, fields, child, v))
+        else:
+            value = self._entity_from_values(cls, fields, child, values)
+        setattr(self, '_' + field, value)
+        return True
+
+    def write_cache(self):
+        """
+        Write the sidecar cache with all sections of the report next to the
+        XML file. XMLReport instances for the same (unchanged) file load the
+        sections from the cache instead of parsing the XML.
+        """
+        if self._cache is not None or not self._filename:
+            return
+        sections = {}
+        blobs = []
+        for (field, (cls, fields, is_list, child)) in XMLReport._cache_layout.items():
+            value = getattr(self, field)
+            if value is None:
+                sections[field] = None
+            elif is_list:
+                sections[field] = [XMLReport._entity_to_values(e, fields, child, blobs) for e in value]
+            else:
+                sections[field] = XMLReport._entity_to_values(value, fields, child, blobs)
+        write_report_cache(self._filename, XMLReport.CACHE_VERSION, sections, blobs)
+
     @staticmethod
     def _value_convert(value_str, data_type):
         if data_type == 'uuid':
@@ -999,58 +1315,180 @@ class XMLReport(object):
             return str(value_str)
 
     @staticmethod
-    def _get_node_value(node, child, default_value=None):
-        if node is None:
-            return default_value
-        r = node.xpath(child + '/@type')
-        data_type = r[0] if r else None
+    def _convert_node(node, default_value=None, report=None):
+        data_type = node.get('type')
 
         if data_type == 'QStringList':
-            all_subitems = node.xpath(child + '/item/text()')
             ret = []
-            for c in all_subitems:
-                ret.append(str(c))
+            for item in node.iterchildren('item'):
+                if item.text is not None:
+                    ret.append(str(item.text))
         elif data_type == 'QVariantMap':
-            all_subitems = node.xpath(child + '/item')
             ret = {}
-            for item in all_subitems:
-                r = item.xpath('@key')
-                item_key = str(r[0]) if r else None
-
-                r = item.xpath('@type')
-                item_data_type = str(r[0]) if r else None
-
-                r = item.xpath('text()')
-                item_value = r[0] if r else None
-
-                ret[item_key] = XMLReport._value_convert(item_value, item_data_type)
+            for item in node.iterchildren('item'):
+                ret[item.get('key')] = XMLReport._value_convert(item.text, item.get('type'))
         elif data_type == 'QByteArray':
-            r = node.xpath(child + '/@encoding-type')
-            encoding_type = r[0] if r else None
-
-            r = node.xpath(child + '/text()')
-            value = r[0] if r else None
-            if r:
-                if encoding_type == 'base64':
-                    ret = HexDumpMemoryBlock(base64.b64decode(r[0]))
+            value = node.text
+            if value is not None:
+                if node.get('encoding-type') == 'base64':
+                    # neither the element nor its text is kept, the data is
+                    # read from the file and decoded on first access
+                    loader = report._element_text_loader(node) if report is not None else None
+                    if loader is not None:
+                        ret = HexDumpMemoryBlock(loader=loader, size=XMLReport._base64_size(value))
+                    else:
+                        ret = HexDumpMemoryBlock(base64.b64decode(value))
                 else:
-                    ret = HexDumpMemoryBlock(str(r[0]))
+                    ret = HexDumpMemoryBlock(str(value))
             else:
                 ret = default_value
         else:
-            r = node.xpath(child + '/text()')
-            if r:
-                ret = XMLReport._value_convert(r[0], data_type)
+            value = node.text
+            if value is not None:
+                ret = XMLReport._value_convert(value, data_type)
             else:
                 ret = default_value
         return ret
 
+    @staticmethod
+    def _base64_size(value):
+        # size of the decoded data, the decoder skips the whitespace (line
+        # breaks) within the text
+        n = len(value)
+        for c in ' \t\r\n':
+            n -= value.count(c)
+        if n % 4 != 0:
+            return None
+        value = value.rstrip()
+        return n // 4 * 3 - (len(value) - len(value.rstrip('=')))
+
+    def _element_text_loader(self, node):
+        """
+        Returns a function which reads the text of the given element from
+        the report file and decodes it as base64. The element is found by
+        its line, so None is returned if another element starts before it
+        on the same line.
+        """
+        line = node.sourceline
+        if not self._filename or line is None:
+            return None
+        prev = node.getprevious()
+        if prev is None:
+            prev = node.getparent()
+        else:
+            while len(prev):
+                prev = prev[-1]
+        if prev is not None and (prev.sourceline is None or prev.sourceline >= line):
+            return None
+        if self._file_key is None:
+            self._file_key = _file_key(self._filename)
+        self._text_lines.add(line)
+        tag = node.tag
+        return lambda: base64.b64decode(self._read_element_text(tag, line))
+
+    def _line_offsets(self, lines):
+        # byte offsets of the given line numbers (starting at 1) in a single
+        # pass over the report file
+        ret = {}
+        pending = sorted(lines)
+        i = 0
+        line = 1
+        pos = 0
+        with open(self._filename, 'rb') as f:
+            while i < len(pending):
+                chunk = f.read(1 << 20)
+                if not chunk:
+                    break
+                start = 0
+                while i < len(pending):
+                    if pending[i] == line:
+                        ret[line] = pos + start
+                        i += 1
+                    elif chunk.count(b'\n', start) < pending[i] - line:
+                        # the line begins in one of the following chunks
+                        line += chunk.count(b'\n', start)
+                        break
+                    else:
+                        start = chunk.index(b'\n', start) + 1
+                        line += 1
+                pos += len(chunk)
+        return ret
+
+    def _read_element_text(self, tag, line):
+        if _file_key(self._filename) != self._file_key:
+            raise XMLReport.XMLReportIOError(self, 'File has been changed since it has been parsed')
+        with self._lock:
+            offset = self._text_line_offsets.get(line)
+            if offset is None:
+                # the offsets of all elements loaded so far are determined at once
+                self._text_line_offsets.update(self._line_offsets(self._text_lines - set(self._text_line_offsets)))
+                offset = self._text_line_offsets.get(line)
+        data = bytearray()
+        start_tag = re.compile(b'<' + re.escape(tag.encode('utf8')) + br'[\s/>]')
+        begin = None
+        end = -1
+        if offset is not None:
+            with open(self._filename, 'rb') as f:
+                f.seek(offset)
+                while end < 0:
+                    chunk = f.read(1 << 16)
+                    if not chunk:
+                        break
+                    data += chunk
+                    if begin is None:
+                        m = start_tag.search(data)
+                        i = data.find(b'>', m.start()) if m is not None else -1
+                        if i < 0:
+                            continue
+                        begin = i + 1
+                    end = data.find(b'<', begin)
+        if end < 0:
+            raise XMLReport.XMLReportParserError(self, 'Element %s at line %i not found' % (tag, line))
+        text = bytes(data[begin:end])
+        if b'&' in text:
+            # let the parser resolve character references
+            text = etree.fromstring(b'<t>' + text + b'</t>').text.encode('ascii')
+        return text
+
+    @staticmethod
+    def _get_node_value(node, child, default_value=None, report=None):
+        if node is None:
+            return default_value
+        c = node.find(child)
+        if c is None:
+            return default_value
+        return XMLReport._convert_node(c, default_value, report=report)
+
+    @staticmethod
+    def _set_fields(obj, node, fields):
+        """
+        Set the given fields of the entity obj from the child elements of
+        node. The children are visited only once, the first element with
+        a given name is used.
+        """
+        children = {}
+        for c in node.iterchildren(tag=etree.Element):
+            if c.tag not in children:
+                children[c.tag] = c
+        report = getattr(obj, '_owner', None)
+        for f in fields:
+            if isinstance(f, tuple):
+                f_xml, f_prop = f
+            else:
+                f_xml = f_prop = f
+            c = children.get(f_xml)
+            value = XMLReport._convert_node(c, report=report) if c is not None else None
+            # module names, source files and function names repeat across
+            # many entities, keep only a single copy of each string
+            if type(value) is str:
+                value = intern(value)
+            setattr(obj, f_prop, value)
+
     @staticmethod
     def _get_attribute(node, attr_name, default_value=None):
         if node is None:
             return default_value
-        r = node.xpath('@' + attr_name)
-        attr_value = r[0] if r else None
+        attr_value = node.get(attr_name)
 
         ok = False
         ret = None
@@ -1092,18 +1530,50 @@ class XMLReport(object):
         return self._filename
 
     def _get_memory_block(self, addr):
-        for m in self.memory_blocks:
-            if addr >= m.base and addr < m.end_addr:
-                #print('got %x >= %x < %x' % (m.base, addr, m.end_addr))
+        self.memory_blocks
+        return self._memory_block_map.find(addr)
+
+    def find_memory_block(self, addr):
+        """
+        Returns the memory block containing addr or None.
+        """
+        return self._get_memory_block(addr)
+
+    def memory_block_at(self, base):
+        """
+        Returns the memory block starting at base or None, a block nested in
+        another one is found as well.
+        """
+        self.memory_blocks
+        for m in self._memory_block_map.overlapping(base, base + 1):
+            if m.base == base:
                 return m
         return None
 
     def _get_memory_region(self, addr):
-        for m in self.memory_regions:
-            if addr >= m.base and addr < m.end_addr:
-                #print('got %x >= %x < %x' % (m.base, addr, m.end_addr))
-                return m
-        return None
+        self.memory_regions
+        return self._memory_region_map.find(addr)
+
+    def read(self, addr, size):
+        """
+        Returns up to size bytes of memory starting at addr. The read may
+        span adjacent memory blocks and stops at the first address which
+        is not included in the report. Returns None if addr itself is not
+        available.
+        """
+        self.memory_blocks
+        ret = []
+        end = addr + size
+        for m in self._memory_block_map.overlapping(addr, end):
+            if m.base > addr:
+                break
+            if m.end_addr <= addr:
+                # nested in a block which has already been read
+                continue
+            data = m.get_addr(addr, end - addr)
+            ret.append(bytes(data))
+            addr += len(data)
+        return b''.join(ret) if ret else None
 
     def _read_memory(self, addr, max_len=None):
         m = self._get_memory_block(addr)
@@ -1121,14 +1591,13 @@ class XMLReport(object):
                 ret.append( (m, index) )
         return ret
 
-    @property
+    @_report_section('crash_info')
     def crash_info(self):
         if self._crash_info is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump')
+            i = self._get_section_node('crash_info', 'crash_dump')
             self._crash_info = XMLReport.CrashInfo(self) if i is not None else None
             if i is not None:
-                for f in XMLReport._crash_dump_fields:
-                    setattr(self._crash_info, f, XMLReport._get_node_value(i, f))
+                XMLReport._set_fields(self._crash_info, i, XMLReport._crash_dump_fields)
         return self._crash_info
     
     @property
@@ -1180,14 +1649,13 @@ class XMLReport(object):
                 self._is_64_bit = False
         return self._is_64_bit
 
-    @property
+    @_report_section('system_info')
     def system_info(self):
         if self._system_info is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/system_info')
+            i = self._get_section_node('system_info', 'crash_dump/system_info')
             self._system_info = XMLReport.SystemInfo(self) if i is not None else None
             if i is not None:
-                for f in XMLReport._system_info_fields:
-                    setattr(self._system_info, f, XMLReport._get_node_value(i, f))
+                XMLReport._set_fields(self._system_info, i, XMLReport._system_info_fields)
                 if self._system_info.os_version_number is not None and ((self._system_info.os_version_number >> 48) & 0xffff) == 0:
                     # convert old OS version number with two 32-bit integers
                     # to the new format using four 16-bit integers
@@ -1198,57 +1666,51 @@ class XMLReport(object):
                     self._system_info.os_version_number = major << 48 | minor << 32 | patch << 16 | build
         return self._system_info
 
-    @property
+    @_report_section('file_info')
     def file_info(self):
         if self._file_info is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/file_info')
+            i = self._get_section_node('file_info', 'crash_dump/file_info')
             self._file_info = XMLReport.FileInfo(self) if i is not None else None
             if i is not None:
-                for f in XMLReport._file_info_fields:
-                    if f != 'log':
-                        setattr(self._file_info, f, XMLReport._get_node_value(i, f))
-                i = XMLReport._get_first_node(self._xml, 'crash_dump/file_info/log')
-                all_subitems = i.xpath('message') if i is not None else None
+                XMLReport._set_fields(self._file_info, i, [f for f in XMLReport._file_info_fields if f != 'log'])
+                i = self._get_section_node('file_info', 'crash_dump/file_info/log')
+                all_subitems = i.findall('message') if i is not None else None
                 if all_subitems is not None:
                     for item in all_subitems:
                         m = XMLReport.FileInfoLogMessage(self)
-                        for f in XMLReport._file_info_log_message_fields:
-                            setattr(m, f, XMLReport._get_node_value(item, f))
+                        XMLReport._set_fields(m, item, XMLReport._file_info_log_message_fields)
                         self._file_info.log.append(m)
 
         return self._file_info
 
-    @property
+    @_report_section('exception')
     def exception(self):
         if self._exception is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/exception')
+            i = self._get_section_node('exception', 'crash_dump/exception')
             self._exception = XMLReport.Exception(self) if i is not None else None
             if i is not None:
-                for f in XMLReport._exception_fields:
-                    setattr(self._exception, f, XMLReport._get_node_value(i, f))
+                XMLReport._set_fields(self._exception, i, XMLReport._exception_fields)
         return self._exception
 
-    @property
+    @_report_section('assertion')
     def assertion(self):
         if self._assertion is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/assertion')
+            i = self._get_section_node('assertion', 'crash_dump/assertion')
             self._assertion = XMLReport.Assertion(self) if i is not None else None
             if i is not None:
-                for f in XMLReport._assertion_fields:
-                    setattr(self._assertion, f, XMLReport._get_node_value(i, f))
+                XMLReport._set_fields(self._assertion, i, XMLReport._assertion_fields)
         return self._assertion
 
-    @property
+    @_report_section('modules')
     def modules(self):
         if self._modules is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/modules')
+            i = self._get_section_node('modules', 'crash_dump/modules')
             self._modules = []
-            all_subitems = i.xpath('module') if i is not None else None
+            all_subitems = i.findall('module') if i is not None else None
             if all_subitems is not None:
                 for item in all_subitems:
                     m = XMLReport.Module(self)
-                    for f in XMLReport._module_fields:
-                        setattr(m, f, XMLReport._get_node_value(item, f))
+                    XMLReport._set_fields(m, item, XMLReport._module_fields)
                     if m.file_version is None:
                         m.file_version = format_version_number(m.file_version_number)
                     if m.product_version is None:
@@ -1257,25 +1719,47 @@ class XMLReport(object):
         return self._modules
 
     @property
+    def module_index(self):
+        if self._module_index is None:
+            self._module_index = ModuleIndex(self.modules)
+        return self._module_index
+
+    def resolve_address(self, addr):
+        """
+        Returns the module containing addr and the offset of addr within
+        the module or (None, None).
+        """
+        return self.module_index.resolve(addr)
+
+    @_report_section('threads')
     def threads(self):
         if self._threads is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/threads')
+            i = self._get_section_node('threads', 'crash_dump/threads')
             self._threads = []
-            all_subitems = i.xpath('thread') if i is not None else None
+            all_subitems = i.findall('thread') if i is not None else None
             if all_subitems is not None:
                 for item in all_subitems:
                     m = XMLReport.Thread(self)
-                    for f in XMLReport._thread_fields:
-                        if isinstance(f, tuple):
-                            f_xml, f_prop = f
-                            setattr(m, f_prop, XMLReport._get_node_value(item, f_xml))
-                        else:
-                            setattr(m, f, XMLReport._get_node_value(item, f))
+                    XMLReport._set_fields(m, item, XMLReport._thread_fields)
                     if not self._threads:
                         m.main_thread = True
                     self._threads.append(m)
+        if self._threads_by_id is None:
+            self._threads_by_id = {}
+            self._thread_ids_by_memory = {}
+            for m in self._threads:
+                self._threads_by_id.setdefault(m.id, m)
+                self._thread_ids_by_memory.setdefault(m.memory, m.id)
         return self._threads
 
+    def _get_thread(self, threadid):
+        self.threads
+        return self._threads_by_id.get(threadid)
+
+    def _get_thread_id_by_memory(self, addr):
+        self.threads
+        return self._thread_ids_by_memory.get(addr)
+
     @property
     def peb_address(self):
         if self._peb_address is None:
@@ -1301,65 +1785,65 @@ class XMLReport(object):
                 self._peb = Win32_PEB(self, data, self.is_64_bit)
         return self._peb
 
-    @property
+    @_report_section('memory_regions')
     def memory_regions(self):
         if self._memory_regions is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/memory_info')
+            i = self._get_section_node('memory_regions', 'crash_dump/memory_info')
             self._memory_regions = []
-            all_subitems = i.xpath('memory') if i is not None else None
+            all_subitems = i.findall('memory') if i is not None else None
             if all_subitems is not None:
                 for item in all_subitems:
                     m = XMLReport.MemoryRegion(self)
-                    for f in XMLReport._memory_region_fields:
-                        setattr(m, f, XMLReport._get_node_value(item, f))
+                    XMLReport._set_fields(m, item, XMLReport._memory_region_fields)
 
                     m.usage = []
-                    all_subitems = item.xpath('usage')
+                    all_subitems = item.findall('usage')
                     if all_subitems is not None:
                         for item in all_subitems:
                             usage = XMLReport.MemoryRegionUsage(self, m)
-                            for f in XMLReport._memory_region_usage_fields:
-                                setattr(usage, f, XMLReport._get_node_value(item, f))
+                            XMLReport._set_fields(usage, item, XMLReport._memory_region_usage_fields)
                             m.usage.append(usage)
 
                     self._memory_regions.append(m)
                 self._memory_regions = sorted(self._memory_regions, key=lambda region: region.base_addr)
+        if self._memory_region_map is None:
+            self._memory_region_map = AddressMap([(m.base, m.end_addr, m) for m in self._memory_regions])
         return self._memory_regions
 
-    @property
+    @_report_section('memory_blocks')
     def memory_blocks(self):
         if self._memory_blocks is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/memory_blocks')
+            i = self._get_section_node('memory_blocks', 'crash_dump/memory_blocks')
             self._memory_blocks = []
-            all_subitems = i.xpath('memory_block') if i is not None else None
+            all_subitems = i.findall('memory_block') if i is not None else None
             if all_subitems is not None:
                 for item in all_subitems:
                     m = XMLReport.MemoryBlock(self)
-                    for f in XMLReport._memory_block_fields:
-                        setattr(m, f, XMLReport._get_node_value(item, f))
+                    XMLReport._set_fields(m, item, XMLReport._memory_block_fields)
                     self._memory_blocks.append(m)
                 self._memory_blocks = sorted(self._memory_blocks, key=lambda block: block.base)
+        if self._memory_block_map is None:
+            self._memory_block_map = AddressMap([(m.base, m.end_addr, m) for m in self._memory_blocks])
         return self._memory_blocks
 
-    @property
+    @_report_section('handles')
     def handles(self):
         if self._handles is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/handle')
+            i = self._get_section_node('handles', 'crash_dump/handle')
             self._handles = []
-            all_subitems = i.xpath('handle') if i is not None else None
+            all_subitems = i.findall('handle') if i is not None else None
             if all_subitems is not None:
                 for item in all_subitems:
                     m = XMLReport.Handle(self)
-                    for f in XMLReport._handle_fields:
-                        setattr(m, f, XMLReport._get_node_value(item, f))
+                    XMLReport._set_fields(m, item, XMLReport._handle_fields)
                     self._handles.append(m)
         return self._handles
 
-    @property
+    @_report_section('stackdumps')
     def stackdumps(self):
         if self._stackdumps is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/stackdumps')
-            all_subitems = i.xpath('stackdump') if i is not None else None
+            i = self._get_section_node('stackdumps', 'crash_dump/stackdumps')
+            all_subitems = i.findall('stackdump') if i is not None else None
             if all_subitems is not None:
                 self._stackdumps = XMLReport.StackDumpList(self)
                 for item in all_subitems:
@@ -1368,75 +1852,68 @@ class XMLReport(object):
                         setattr(dump, f, XMLReport._get_attribute(item, f))
 
                     dump.callstack = []
-                    all_subitems = item.xpath('frame')
+                    all_subitems = item.findall('frame')
                     if all_subitems is not None:
                         for item in all_subitems:
                             frame = XMLReport.StackFrame(self, dump)
-                            for f in XMLReport._stack_frame_fields:
-                                setattr(frame, f, XMLReport._get_node_value(item, f))
+                            XMLReport._set_fields(frame, item, XMLReport._stack_frame_fields)
                             dump.callstack.append(frame)
 
                     self._stackdumps.append(dump)
         return self._stackdumps
 
-    @property
+    @_report_section('simplified_info')
     def simplified_info(self):
         if self._simplified_info is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/simplified_info')
+            i = self._get_section_node('simplified_info', 'crash_dump/simplified_info')
             self._simplified_info = XMLReport.SimplifiedInfo(self) if i is not None else None
             if i is not None:
-                for f in XMLReport._simplified_info_fields:
-                    setattr(self._simplified_info, f, XMLReport._get_node_value(i, f))
+                XMLReport._set_fields(self._simplified_info, i, XMLReport._simplified_info_fields)
         return self._simplified_info
 
-    @property
+    @_report_section('processstatuslinux')
     def processstatuslinux(self):
         if self._processstatuslinux is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/processstatuslinux')
+            i = self._get_section_node('processstatuslinux', 'crash_dump/processstatuslinux')
             self._processstatuslinux = XMLReport.ProcessStatusLinux(self) if i is not None else None
             if i is not None:
-                for f in XMLReport._processstatuslinux_fields:
-                    setattr(self._processstatuslinux, f, XMLReport._get_node_value(i, f))
+                XMLReport._set_fields(self._processstatuslinux, i, XMLReport._processstatuslinux_fields)
         return self._processstatuslinux
 
-    @property
+    @_report_section('processstatuswin32')
     def processstatuswin32(self):
         if self._processstatuswin32 is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/processstatuswin32')
+            i = self._get_section_node('processstatuswin32', 'crash_dump/processstatuswin32')
             self._processstatuswin32 = XMLReport.ProcessStatusWin32(self) if i is not None else None
             if i is not None:
-                for f in XMLReport._processstatuswin32_fields:
-                    setattr(self._processstatuswin32, f, XMLReport._get_node_value(i, f))
+                XMLReport._set_fields(self._processstatuswin32, i, XMLReport._processstatuswin32_fields)
         return self._processstatuswin32
 
-    @property
+    @_report_section('processmemoryinfowin32')
     def processmemoryinfowin32(self):
         if self._processmemoryinfowin32 is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/processmemoryinfowin32')
+            i = self._get_section_node('processmemoryinfowin32', 'crash_dump/processmemoryinfowin32')
             self._processmemoryinfowin32 = XMLReport.ProcessMemoryInfoWin32(self) if i is not None else None
             if i is not None:
-                for f in XMLReport._processmemoryinfowin32_fields:
-                    setattr(self._processmemoryinfowin32, f, XMLReport._get_node_value(i, f))
+                XMLReport._set_fields(self._processmemoryinfowin32, i, XMLReport._processmemoryinfowin32_fields)
         return self._processmemoryinfowin32
 
-    @property
+    @_report_section('misc_info')
     def misc_info(self):
         if self._misc_info is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/misc_info')
+            i = self._get_section_node('misc_info', 'crash_dump/misc_info')
             self._misc_info = XMLReport.MiscInfo(self) if i is not None else None
             if i is not None:
-                for f in XMLReport._processstatuslinux_fields:
-                    setattr(self._misc_info, f, XMLReport._get_node_value(i, f))
+                XMLReport._set_fields(self._misc_info, i, XMLReport._processstatuslinux_fields)
         return self._misc_info
 
-    @property
+    @_report_section('fast_protect_version_info')
     def fast_protect_version_info(self):
         if self._fast_protect_version_info is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/fast_protect_version_info')
+            i = self._get_section_node('fast_protect_version_info', 'crash_dump/fast_protect_version_info')
             self._fast_protect_version_info = XMLReport.FastProtectVersionInfo(self) if i is not None else None
             if i is not None:
-                for f in XMLReport._fast_protect_version_info_fields:
-                    setattr(self._fast_protect_version_info, f, XMLReport._get_node_value(i, f))
+                XMLReport._set_fields(self._fast_protect_version_info, i, XMLReport._fast_protect_version_info_fields)
         return self._fast_protect_version_info
 
     @property
@@ -1446,14 +1923,13 @@ class XMLReport(object):
             return None
         return s.thread_name_tls_slot
 
-    @property
+    @_report_section('fast_protect_system_info')
     def fast_protect_system_info(self):
         if self._fast_protect_system_info is None:
-            i = XMLReport._get_first_node(self._xml, 'crash_dump/fast_protect_system_info')
+            i = self._get_section_node('fast_protect_system_info', 'crash_dump/fast_protect_system_info')
             self._fast_protect_system_info = XMLReport.FastProtectSystemInfo(self) if i is not None else None
             if i is not None:
-                for f in XMLReport._fast_protect_system_info_fields:
-                    setattr(self._fast_protect_system_info, f, XMLReport._get_node_value(i, f))
+                XMLReport._set_fields(self._fast_protect_system_info, i, XMLReport._fast_protect_system_info_fields)
         return self._fast_protect_system_info
 
     @property
@@ -1502,7 +1978,7 @@ if __name__ == '__main__':
         #print(type(m.id))
         
     def dump_report_entity(entity, indent=0):
-        for (k,v) in entity.__dict__.items():
+        for (k,v) in entity._attributes():
             if k[0] != '_':
                 if isinstance(v, list):
                     dump_report_list(v, indent+2)
@@ -1571,13 +2047,6 @@ if __name__ == '__main__':
 
     #dump_report(xmlreport, 'processmemoryinfowin32')
 
-    #pp = XMLReport.ProxyObject(xmlreport, 'memory_regions')
-    #print(len(pp))
-
-    #pp = XMLReport.ProxyObject(xmlreport, 'memory_blocks')
-    #print(len(pp))
-    #for m in pp:
-        #print(m)
     #dump_report(xmlreport, 'memory_regions')
 
     #print(xmlreport.crash_info.path)